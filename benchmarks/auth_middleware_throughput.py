@@ -0,0 +1,78 @@
+"""BaseHTTPMiddleware 기반 인증(기존) vs ASGI 인증 미들웨어 처리량 비교
+
+실행: python -m benchmarks.auth_middleware_throughput
+"""
+
+import asyncio
+
+import httpx
+from fastapi import FastAPI, HTTPException
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+
+from benchmarks.auth_route_matching import legacy_requires_auth
+from benchmarks.utils import close_bench_db, init_bench_db, run_concurrently
+from main import app
+from src.models.movies import Movie
+from src.models.users import GenderEnum, User
+from src.routers.like_router import like_router
+from src.routers.movie_router import movie_router
+from src.routers.review_router import review_router
+from src.routers.user_router import user_router
+from src.services.auth import AuthService
+from src.services.jwt import JWTService
+
+TOTAL_REQUESTS = 2000
+CONCURRENCY = 50
+
+
+class LegacyAuthMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        try:
+            if legacy_requires_auth(request.scope):
+                request = await AuthService().get_current_user(request)
+            response: Response = await call_next(request)
+            return response
+        except HTTPException as e:
+            return JSONResponse({"detail": e.detail}, status_code=e.status_code)
+        except Exception as e:
+            return JSONResponse({"detail": str(e)}, status_code=500)
+
+
+def create_legacy_app() -> FastAPI:
+    legacy_app = FastAPI()
+    for router in (user_router, movie_router, review_router, like_router):
+        legacy_app.include_router(router)
+    legacy_app.add_middleware(LegacyAuthMiddleware)
+    return legacy_app
+
+
+async def main() -> None:
+    await init_bench_db()
+    user = await User.create(username="bench", hashed_password="-", age=20, gender=GenderEnum.MALE)
+    movie = await Movie.create(title="bench", overview="bench", cast="bench", runtime=100, release_date="2021-02-01")
+    access_token = JWTService().create_access_token({"user_id": user.id})
+
+    print(f"{TOTAL_REQUESTS} requests, concurrency {CONCURRENCY}")
+    print(f"{'request':<20} {'legacy(req/s)':>14} {'asgi(req/s)':>14}")
+    for path in (f"/movies/{movie.id}", "/users/me"):
+        results = []
+        for target in (create_legacy_app(), app):
+            transport = httpx.ASGITransport(app=target)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://bench", cookies={"access_token": access_token}
+            ) as client:
+
+                async def request() -> None:
+                    response = await client.get(path)
+                    assert response.status_code == 200
+
+                results.append(await run_concurrently(request, TOTAL_REQUESTS, CONCURRENCY))
+        print(f"{'GET ' + path:<20} {results[0]:>14.0f} {results[1]:>14.0f}")
+
+    await close_bench_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
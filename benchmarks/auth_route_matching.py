@@ -0,0 +1,62 @@
+"""인증 대상 라우트 판별 비용 비교: 정규식 순회(기존) vs 라우트 테이블 조회
+
+실행: python -m benchmarks.auth_route_matching
+"""
+
+import re
+import timeit
+
+from starlette.requests import Request
+from starlette.types import Scope
+
+from main import app
+from src.middleware.auth import AuthRouteTable
+
+# 기존 AuthMiddleware 가 요청마다 순회하던 정규식 목록
+LEGACY_NEED_AUTH_REGEX_URL = [
+    r"^/users/me$",
+    r"^/users/me/profile_image$",
+    r"^/users/me/reviews$",
+    r"^/reviews$",
+    r"^/reviews/\d+$",
+    r"^/reviews/\d+/is_liked$",
+    r"^/likes/reviews/\d+/like$",
+    r"^/likes/reviews/\d+/unlike$",
+]
+
+CASES = [
+    ("public", "GET", "/movies"),
+    ("public", "GET", "/movies/1"),
+    ("public", "GET", "/reviews/1/like_count"),
+    ("protected", "GET", "/users/me"),
+    ("protected", "POST", "/likes/reviews/1/like"),
+]
+
+NUMBER = 200_000
+
+
+def legacy_requires_auth(scope: Scope) -> bool:
+    # 기존 미들웨어는 BaseHTTPMiddleware 가 만든 Request 의 url.path 를 사용했다
+    request = Request(scope)
+    for url in LEGACY_NEED_AUTH_REGEX_URL:
+        if re.match(url, request.url.path):
+            return True
+    return False
+
+
+def make_scope(method: str, path: str) -> Scope:
+    return {"type": "http", "method": method, "path": path, "root_path": "", "query_string": b"", "headers": []}
+
+
+def main() -> None:
+    table = AuthRouteTable(app.routes)
+    print(f"{'kind':<10} {'request':<32} {'legacy(ns)':>12} {'table(ns)':>12}")
+    for kind, method, path in CASES:
+        legacy = timeit.timeit(lambda: legacy_requires_auth(make_scope(method, path)), number=NUMBER)
+        routed = timeit.timeit(lambda: table.requires_auth(make_scope(method, path)), number=NUMBER)
+        assert legacy_requires_auth(make_scope(method, path)) == table.requires_auth(make_scope(method, path))
+        print(f"{kind:<10} {method + ' ' + path:<32} {legacy / NUMBER * 1e9:>12.0f} {routed / NUMBER * 1e9:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""access token 검증 비용 비교: 매 요청 jwt.decode(기존) vs 검증된 claims 캐시
+
+실행: python -m benchmarks.jwt_decode_cache
+"""
+
+import timeit
+
+import jwt
+
+from src.services.jwt import JWTService, decoded_token_cache
+
+NUMBER = 100_000
+
+
+def main() -> None:
+    jwt_service = JWTService()
+    access_token = jwt_service.create_access_token({"user_id": 1})
+
+    uncached = timeit.timeit(
+        lambda: jwt.decode(access_token, jwt_service._secret_key, algorithms=jwt_service.algorithm), number=NUMBER
+    )
+    decoded_token_cache.clear()
+    cached = timeit.timeit(lambda: jwt_service._decode(access_token), number=NUMBER)
+
+    print(f"jwt.decode per request : {uncached / NUMBER * 1e6:.2f} us")
+    print(f"cached _decode         : {cached / NUMBER * 1e6:.2f} us")
+    print(f"cache stats            : {decoded_token_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
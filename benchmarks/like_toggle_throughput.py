@@ -0,0 +1,107 @@
+"""좋아요 토글(like/unlike 반복) 처리량 비교: get_or_create + save(기존) vs 한 문장 upsert
+
+기본은 인메모리 sqlite 이고, 실제 MySQL 로 측정하려면 BENCH_DB_URL=mysql://... 를 지정한다.
+실행: python -m benchmarks.like_toggle_throughput
+"""
+
+import asyncio
+import itertools
+import statistics
+from typing import Awaitable, Callable
+
+from benchmarks.utils import close_bench_db, init_bench_db, run_concurrently
+from src.models.likes import ReviewLike
+from src.models.movies import Movie
+from src.models.reviews import Review
+from src.models.users import GenderEnum, User
+from src.services.review_likes import cancel_review_like, upsert_review_like
+
+USERS = 50
+REVIEWS = 20
+TOGGLES = 5_000
+CONCURRENCY = 20
+# 실행마다 편차가 커서 방식을 번갈아 REPEAT 번씩 재고 중앙값을 비교한다
+REPEAT = 5
+
+
+async def legacy_like(user_id: int, review_id: int) -> None:
+    review_like, _ = await ReviewLike.get_or_create(user_id=user_id, review_id=review_id)
+    if not review_like.is_liked:
+        review_like.is_liked = True
+        await review_like.save()
+
+
+async def legacy_unlike(user_id: int, review_id: int) -> None:
+    review_like = await ReviewLike.get_or_none(user_id=user_id, review_id=review_id)
+    if review_like is not None and review_like.is_liked:
+        review_like.is_liked = False
+        await review_like.save()
+
+
+async def upsert_like(user_id: int, review_id: int) -> None:
+    await upsert_review_like(user_id, review_id)
+
+
+async def upsert_unlike(user_id: int, review_id: int) -> None:
+    await cancel_review_like(user_id, review_id)
+
+
+async def measure(
+    user_ids: list[int],
+    review_ids: list[int],
+    like: Callable[[int, int], Awaitable[None]],
+    unlike: Callable[[int, int], Awaitable[None]],
+) -> float:
+    await ReviewLike.all().delete()
+    # 같은 (user, review) 를 번갈아 like / unlike 한다
+    pairs = itertools.cycle(itertools.product(user_ids, review_ids))
+    toggles = itertools.count()
+
+    async def toggle() -> None:
+        user_id, review_id = next(pairs)
+        await (like if next(toggles) // (USERS * REVIEWS) % 2 == 0 else unlike)(user_id, review_id)
+
+    return await run_concurrently(toggle, total=TOGGLES, concurrency=CONCURRENCY)
+
+
+async def main() -> None:
+    await init_bench_db()
+    try:
+        await User.bulk_create(
+            [User(username=f"bench{i}", hashed_password="-", age=20, gender=GenderEnum.MALE) for i in range(USERS)]
+        )
+        user_ids = [user.id for user in await User.all()]
+        await Movie.bulk_create(
+            [
+                Movie(title="bench", overview="bench", cast="bench", runtime=100, release_date="2021-02-01")
+                for _ in range(REVIEWS)
+            ]
+        )
+        await Review.bulk_create(
+            [
+                Review(user_id=user_ids[0], movie_id=movie.id, title="bench", content="bench")
+                for movie in await Movie.all()
+            ]
+        )
+        review_ids = [review.id for review in await Review.all()]
+
+        legacy_runs: list[float] = []
+        upsert_runs: list[float] = []
+        for _ in range(REPEAT):
+            legacy_runs.append(await measure(user_ids, review_ids, legacy_like, legacy_unlike))
+            upsert_runs.append(await measure(user_ids, review_ids, upsert_like, upsert_unlike))
+        legacy = statistics.median(legacy_runs)
+        upsert = statistics.median(upsert_runs)
+
+        print(f"{TOGGLES} toggles, concurrency {CONCURRENCY}, median of {REPEAT} runs")
+        print(f"get_or_create + save : {legacy:>10.0f} toggles/s ({min(legacy_runs):.0f}-{max(legacy_runs):.0f})")
+        print(
+            f"single-statement     : {upsert:>10.0f} toggles/s ({min(upsert_runs):.0f}-{max(upsert_runs):.0f}, "
+            f"{upsert / legacy:.2f}x)"
+        )
+    finally:
+        await close_bench_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
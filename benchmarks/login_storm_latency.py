@@ -0,0 +1,77 @@
+"""로그인 폭주 중 다른 엔드포인트(GET /movies/{id})의 지연 시간 비교: 이벤트 루프에서 bcrypt 실행(기존) vs 전용 스레드 풀
+
+실행: python -m benchmarks.login_storm_latency
+"""
+
+import asyncio
+import statistics
+import time
+from unittest.mock import patch
+
+import httpx
+
+from benchmarks.utils import close_bench_db, init_bench_db
+from main import app
+from src.models.movies import Movie
+from src.models.users import GenderEnum, User
+from src.services.auth import AuthService
+
+LOGIN_STORM_SIZE = 20
+PROBE_INTERVAL_SECONDS = 0.01
+
+
+async def verify_password_on_event_loop(self: AuthService, plain_password: str, hashed_password: str) -> bool:
+    return self.verify_password(plain_password, hashed_password)
+
+
+async def measure(client: httpx.AsyncClient, movie_id: int, username: str, password: str) -> list[float]:
+    latencies: list[float] = []
+    storm = asyncio.gather(
+        *(
+            client.post("/users/login", json={"username": username, "password": password})
+            for _ in range(LOGIN_STORM_SIZE)
+        )
+    )
+
+    async def probe() -> None:
+        while not storm.done():
+            started = time.perf_counter()
+            response = await client.get(f"/movies/{movie_id}")
+            latencies.append(time.perf_counter() - started)
+            assert response.status_code == 200
+            await asyncio.sleep(PROBE_INTERVAL_SECONDS)
+
+    await asyncio.gather(storm, probe())
+    return latencies
+
+
+def percentile(values: list[float], q: int) -> float:
+    return statistics.quantiles(values, n=100, method="inclusive")[q - 1] if len(values) > 1 else values[0]
+
+
+async def main() -> None:
+    await init_bench_db()
+    await User.create(
+        username=(username := "bench"),
+        hashed_password=AuthService.hash_password((password := "password1234")),
+        age=20,
+        gender=GenderEnum.MALE,
+    )
+    movie = await Movie.create(title="bench", overview="bench", cast="bench", runtime=100, release_date="2021-02-01")
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        with patch.object(AuthService, "verify_password_in_pool", verify_password_on_event_loop):
+            blocking = await measure(client, movie.id, username, password)
+        pooled = await measure(client, movie.id, username, password)
+
+    print(f"{LOGIN_STORM_SIZE} concurrent logins, GET /movies/{{id}} latency (ms)")
+    print(f"{'mode':<16} {'probes':>8} {'p50':>10} {'p99':>10} {'max':>10}")
+    for mode, latencies in (("event loop", blocking), ("worker pool", pooled)):
+        ms = [latency * 1000 for latency in latencies]
+        print(f"{mode:<16} {len(ms):>8} {percentile(ms, 50):>10.1f} {percentile(ms, 99):>10.1f} {max(ms):>10.1f}")
+
+    await close_bench_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
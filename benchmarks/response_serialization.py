@@ -0,0 +1,104 @@
+"""영화 목록 응답 생성 비용 비교
+
+- model  : ORM 객체 조회 -> MovieResponse 생성 -> FastAPI 응답 모델 검증/직렬화 -> JSONResponse (기존)
+- values : values() dict 조회 -> FastJSONResponse (pydantic-core 인코더로 한 번에 직렬화)
+
+장르 조회는 두 경로가 같으므로 제외하고 1k / 10k 건 목록을 측정한다.
+실행: python -m benchmarks.response_serialization
+"""
+
+import asyncio
+import statistics
+import time
+from datetime import date, timedelta
+from typing import Awaitable, Callable
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from benchmarks.utils import close_bench_db, init_bench_db
+from src.models.movies import Movie
+from src.schemas.movies import MovieResponse
+from src.utils.response import FastJSONResponse
+
+SIZES = (1_000, 10_000)
+REPEAT = 7
+
+response_field = create_model_field(name="Response", type_=list[MovieResponse], mode="serialization")
+
+
+async def populate(size: int) -> None:
+    await Movie.all().delete()
+    await Movie.bulk_create(
+        [
+            Movie(
+                title=f"synthetic movie {i}",
+                overview="synthetic overview " * 20,
+                cast="lee byeong heon, choi min sik",
+                runtime=100 + i % 60,
+                release_date=date(2000, 1, 1) + timedelta(days=i % 9000),
+                poster_image_url=f"movies/poster_images/{i}.png",
+            )
+            for i in range(size)
+        ],
+        batch_size=1_000,
+    )
+
+
+async def model_path() -> bytes:
+    movies = await Movie.all().order_by("id")
+    content = [
+        MovieResponse(
+            id=movie.id,
+            title=movie.title,
+            overview=movie.overview,
+            cast=movie.cast,
+            runtime=movie.runtime,
+            release_date=movie.release_date,
+            genres=[],
+            genres_str=[],
+            poster_image_url=movie.poster_image_url,
+        )
+        for movie in movies
+    ]
+    return JSONResponse(await serialize_response(field=response_field, response_content=content)).body
+
+
+async def values_path() -> bytes:
+    rows = (
+        await Movie.all()
+        .order_by("id")
+        .values(*(field for field in MovieResponse.model_fields if "genres" not in field))
+    )
+    return FastJSONResponse([{**row, "genres": [], "genres_str": []} for row in rows]).body
+
+
+async def timed(path: Callable[[], Awaitable[bytes]]) -> float:
+    """워밍업 한 번 뒤 REPEAT 번 실행한 시간의 중앙값 (ms). GC 등으로 튀는 실행의 영향을 줄인다"""
+    await path()
+    elapsed = []
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        await path()
+        elapsed.append((time.perf_counter() - started) * 1000)
+    return statistics.median(elapsed)
+
+
+async def main() -> None:
+    await init_bench_db()
+    try:
+        print(f"median of {REPEAT} runs (ms)")
+        print(f"{'items':>8} {'model':>10} {'values':>10} {'speedup':>8}")
+        for size in SIZES:
+            await populate(size)
+            model_ms = await timed(model_path)
+            values_ms = await timed(values_path)
+            print(f"{size:>8} {model_ms:>10.2f} {values_ms:>10.2f} {model_ms / values_ms:>7.2f}x")
+    finally:
+        # 측정 중 예외가 나도 연결을 닫아야 aiosqlite 스레드가 남지 않아 프로세스가 종료된다
+        await close_bench_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
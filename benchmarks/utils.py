@@ -0,0 +1,43 @@
+import asyncio
+import os
+import time
+from typing import Awaitable, Callable
+
+from tortoise import Tortoise
+from tortoise.backends.base.config_generator import generate_config
+
+from src.configs.database import MYSQL_INIT_COMMAND, TORTOISE_APP_MODELS
+
+# 기본은 인메모리 sqlite, 실제 MySQL 로 측정하려면 BENCH_DB_URL 을 지정한다
+BENCH_DB_URL = os.environ.get("BENCH_DB_URL", "sqlite://:memory:")
+
+
+async def init_bench_db() -> None:
+    tortoise_config = generate_config(BENCH_DB_URL, app_modules={"models": TORTOISE_APP_MODELS})
+    if BENCH_DB_URL.startswith("mysql"):
+        # 운영과 같이 stopword 없이 FULLTEXT 인덱스를 만든다
+        tortoise_config["connections"]["default"]["credentials"]["init_command"] = MYSQL_INIT_COMMAND
+    await Tortoise.init(config=tortoise_config)
+    try:
+        await Tortoise.generate_schemas()
+    except Exception:
+        # 연결을 닫지 않으면 aiosqlite 스레드가 남아 프로세스가 종료되지 않는다
+        await Tortoise.close_connections()
+        raise
+
+
+async def close_bench_db() -> None:
+    await Tortoise.close_connections()
+
+
+async def run_concurrently(func: Callable[[], Awaitable[object]], total: int, concurrency: int) -> float:
+    """func 를 concurrency 개씩 동시에 total 번 실행하고 초당 처리량을 반환"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def worker() -> None:
+        async with semaphore:
+            await func()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(total)))
+    return total / (time.perf_counter() - started)
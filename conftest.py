@@ -8,7 +8,14 @@ from tortoise.backends.base.config_generator import generate_config
 from tortoise.contrib.test import finalizer, initializer
 
 from src.configs import config
-from src.configs.database import TORTOISE_APP_MODELS
+from src.configs.database import MYSQL_INIT_COMMAND, TORTOISE_APP_MODELS
+from src.middleware.compression import compression_stats
+from src.services.genre_catalog import genre_catalog
+from src.services.like_buffer import review_like_buffer
+from src.services.movie_genre_index import movie_genre_index
+from src.services.token_revocation import token_revocation_store
+from src.services.top_reviews import top_review_index
+from src.utils.cache import CACHE_REGISTRY
 
 TEST_BASE_URL = "http://test"
 TEST_DB_LABEL = "models"
@@ -23,6 +30,7 @@ def get_test_db_config() -> dict[str, Any]:
         testing=True,
     )
     tortoise_config["timezone"] = TEST_DB_TZ
+    tortoise_config["connections"][TEST_DB_LABEL]["credentials"]["init_command"] = MYSQL_INIT_COMMAND
 
     return tortoise_config
 
@@ -41,3 +49,20 @@ def initialize(request: FixtureRequest) -> Generator[None, None, None]:
 @pytest.fixture(scope="session", autouse=True)
 def event_loop() -> None:
     pass
+
+
+@pytest.fixture(autouse=True)
+def clear_caches() -> Generator[None, None, None]:
+    yield
+    for cache in CACHE_REGISTRY.values():
+        cache.clear()
+    compression_stats.clear()
+    genre_catalog.clear()
+    review_like_buffer.clear()
+    movie_genre_index.clear()
+    top_review_index.clear()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def token_revocation_file(tmp_path_factory: pytest.TempPathFactory) -> None:
+    token_revocation_store.file_path = str(tmp_path_factory.mktemp("auth") / "revoked_tokens.log")
@@ -2,25 +2,51 @@ from fastapi import FastAPI
 
 from src.configs.database import initialize_tortoise
 from src.middleware.auth import AuthMiddleware
+from src.middleware.compression import CompressionMiddleware
 from src.routers.like_router import like_router
+from src.routers.metrics_router import metrics_router
 from src.routers.movie_router import movie_router
 from src.routers.review_router import review_router
 from src.routers.user_router import user_router
+from src.services.auth import password_hash_pool
+from src.services.engagement_counters import engagement_counter_reconciler
+from src.services.genre_catalog import genre_catalog
+from src.services.like_buffer import review_like_buffer
+from src.services.movie_genre_index import movie_genre_index
+from src.services.token_revocation import token_revocation_store
+from src.services.top_reviews import top_review_index
 
 app = FastAPI()
 
-# include custom middleware
-app.add_middleware(AuthMiddleware)
-
 # include router in app
 app.include_router(user_router)
 app.include_router(movie_router)
 app.include_router(review_router)
 app.include_router(like_router)
+app.include_router(metrics_router)
+
+# include custom middleware (인증 라우트 테이블은 미들웨어 스택 생성 시 app.routes 로부터 만들어진다)
+app.add_middleware(AuthMiddleware, routes=app.routes)
+# 나중에 추가한 미들웨어가 바깥쪽에서 실행되므로 압축은 모든 응답에 적용된다
+app.add_middleware(CompressionMiddleware)
+
+# shutdown 핸들러는 등록 순서대로 실행되므로 DB 연결이 닫히기 전에 좋아요 버퍼를 비우도록 tortoise 보다 먼저 등록한다
+app.add_event_handler("shutdown", review_like_buffer.stop)
 
 # initialize_tortoise-orm
 initialize_tortoise(app=app)
 
+app.add_event_handler("startup", token_revocation_store.load)
+app.add_event_handler("startup", token_revocation_store.start)
+app.add_event_handler("startup", genre_catalog.load)
+app.add_event_handler("startup", movie_genre_index.build)
+app.add_event_handler("startup", top_review_index.build)
+app.add_event_handler("startup", engagement_counter_reconciler.start)
+app.add_event_handler("startup", review_like_buffer.start)
+app.add_event_handler("shutdown", password_hash_pool.shutdown)
+app.add_event_handler("shutdown", engagement_counter_reconciler.stop)
+app.add_event_handler("shutdown", token_revocation_store.stop)
+
 if __name__ == "__main__":
     import uvicorn
 
@@ -0,0 +1,11 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE `reviews` ADD INDEX `idx_reviews_movie_like_count_id` (`movie_id`, `like_count`, `id`);"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE `reviews` DROP INDEX `idx_reviews_movie_like_count_id`;"""
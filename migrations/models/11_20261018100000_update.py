@@ -0,0 +1,17 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    # ft_movies_title 은 기본 stopword 목록("a", "i" 등)으로 만들어져 ngram 파서가 ta, an, it 같은 토큰을 버렸다.
+    # stopword 목록은 인덱스를 만들 때 정해지므로 stopword 를 끄고 다시 만든다 (MYSQL_INIT_COMMAND 참고)
+    return """
+        SET SESSION innodb_ft_enable_stopword = OFF;
+        ALTER TABLE `movies` DROP INDEX `ft_movies_title`;
+        ALTER TABLE `movies` ADD FULLTEXT INDEX `ft_movies_title` (`title`) WITH PARSER ngram;"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        SET SESSION innodb_ft_enable_stopword = ON;
+        ALTER TABLE `movies` DROP INDEX `ft_movies_title`;
+        ALTER TABLE `movies` ADD FULLTEXT INDEX `ft_movies_title` (`title`) WITH PARSER ngram;"""
@@ -0,0 +1,21 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE `movies` ADD `review_count` INT NOT NULL DEFAULT 0;
+        ALTER TABLE `reviews` ADD `like_count` INT NOT NULL DEFAULT 0;
+        UPDATE `movies` m
+        JOIN (SELECT `movie_id`, COUNT(*) AS `cnt` FROM `reviews` GROUP BY `movie_id`) r ON r.`movie_id` = m.`id`
+        SET m.`review_count` = r.`cnt`;
+        UPDATE `reviews` r
+        JOIN (
+            SELECT `review_id`, COUNT(*) AS `cnt` FROM `review_likes` WHERE `is_liked` = 1 GROUP BY `review_id`
+        ) l ON l.`review_id` = r.`id`
+        SET r.`like_count` = l.`cnt`;"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE `movies` DROP COLUMN `review_count`;
+        ALTER TABLE `reviews` DROP COLUMN `like_count`;"""
@@ -10,6 +10,55 @@ class Config(BaseSettings):
     JWT_ALGORITHM: str = "HS256"
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     JWT_REFRESH_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7
+    JWT_DECODE_CACHE_MAXSIZE: int = 4096
+    # 토큰 갱신 시 refresh token 도 새로 발급할지 여부
+    JWT_REFRESH_TOKEN_ROTATION: bool = False
+
+    # bcrypt 해싱/검증 전용 스레드 풀 크기와 대기열 한도 (한도를 넘으면 503)
+    PASSWORD_HASH_MAX_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32
+
+    USER_CACHE_MAXSIZE: int = 1024
+    USER_CACHE_TTL_SECONDS: int = 60
+
+    # GET /movies/{movie_id} 응답 본문 캐시
+    MOVIE_DETAIL_CACHE_MAXSIZE: int = 4096
+    MOVIE_DETAIL_CACHE_TTL_SECONDS: int = 300
+
+    # ETag 버전 카운터를 초기화하는 주기 (다른 프로세스의 쓰기가 반영되기까지의 최대 시간)
+    ETAG_EPOCH_SECONDS: int = 300
+
+    # POST /movies/bulk 한 번에 처리할 수 있는 최대 항목 수
+    MOVIE_BULK_MAX_ITEMS: int = 1000
+    # GET /movies/export 에서 한 번에 조회하는 영화 수
+    MOVIE_EXPORT_CHUNK_SIZE: int = 500
+
+    # 장르 비트맵 인덱스를 DB 에서 다시 만드는 주기 (크롤러 등 다른 프로세스의 변경 반영)
+    MOVIE_GENRE_INDEX_REFRESH_SECONDS: int = 300
+    # 장르 카탈로그(id -> 이름)를 DB 에서 다시 읽는 주기
+    GENRE_CATALOG_REFRESH_SECONDS: int = 300
+
+    # 이 크기(bytes) 이상인 응답 본문만 압축한다
+    COMPRESSION_MIN_BYTES: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 5
+    COMPRESSION_ZSTD_LEVEL: int = 3
+    # ETag 가 있는 응답의 압축본 캐시 크기
+    COMPRESSION_CACHE_MAXSIZE: int = 1024
+
+    # 리뷰 like_count / 영화 review_count 를 실제 행 수로 다시 맞추는 주기
+    ENGAGEMENT_COUNTER_RECONCILE_INTERVAL_SECONDS: int = 60 * 60
+
+    # 좋아요 write-behind 모드: 좋아요/취소를 메모리에 모아 두었다가 주기적으로 한 번에 DB 에 쓴다
+    REVIEW_LIKE_WRITE_BEHIND: bool = False
+    REVIEW_LIKE_FLUSH_INTERVAL_SECONDS: float = 1.0
+    # 버퍼에 쌓인 (user, review) 가 이 수에 도달하면 주기를 기다리지 않고 바로 flush 한다
+    REVIEW_LIKE_BUFFER_MAX_SIZE: int = 1000
+
+    # GET /movies/{movie_id}/reviews/top 으로 제공하는 영화별 좋아요 상위 리뷰 수
+    TOP_REVIEWS_PER_MOVIE: int = 10
+    # 영화별 상위 리뷰 인덱스를 DB 에서 다시 만드는 주기 (다른 프로세스의 변경 반영)
+    TOP_REVIEWS_REFRESH_SECONDS: int = 600
 
     MYSQL_HOST: str = "localhost"
     MYSQL_PORT: int = 3306
@@ -21,3 +70,10 @@ class Config(BaseSettings):
 
     BASE_DIR: Path = Path(__file__).resolve().parent.parent.parent
     MEDIA_DIR: str = os.path.join(BASE_DIR, "media")
+
+    # 로그아웃 등으로 폐기된 토큰(jti) 목록
+    TOKEN_REVOCATION_FILE: str = os.path.join(BASE_DIR, "revoked_tokens.log")
+    TOKEN_REVOCATION_BLOOM_CAPACITY: int = 100_000
+    TOKEN_REVOCATION_BLOOM_ERROR_RATE: float = 0.001
+    # 다른 워커가 폐기 파일에 추가한 토큰을 읽어 반영하는 주기
+    TOKEN_REVOCATION_SYNC_INTERVAL_SECONDS: float = 1.0
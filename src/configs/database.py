@@ -12,6 +12,11 @@ TORTOISE_APP_MODELS = [
     "aerich.models",
 ]
 
+# InnoDB 기본 stopword 목록에는 "a", "i" 등이 있고 ngram 파서는 stopword 가 들어간 토큰(ta, an, it ...)을 모두 버려
+# "Titanic", "Parasite" 같은 제목이 FULLTEXT 인덱스에서 검색되지 않는다. stopword 목록은 인덱스를 만들 때 정해지므로
+# 인덱스를 만드는 모든 연결(aerich 마이그레이션, generate_schemas)에서 stopword 를 끈다
+MYSQL_INIT_COMMAND = "SET SESSION innodb_ft_enable_stopword = OFF"
+
 TORTOISE_ORM = {
     "connections": {
         "default": {
@@ -24,6 +29,7 @@ TORTOISE_ORM = {
                 "database": config.MYSQL_DB,
                 "connect_timeout": config.MYSQL_CONNECT_TIMEOUT,
                 "maxsize": config.CONNECTION_POOL_MAXSIZE,
+                "init_command": MYSQL_INIT_COMMAND,
             },
         },
     },
@@ -0,0 +1,12 @@
+from fastapi import HTTPException, Request
+
+from src.models.users import User
+
+
+def login_required(request: Request) -> User:
+    """인증이 필요한 라우트에 선언하는 의존성. 실제 인증은 AuthMiddleware 가 라우트 테이블을 보고 수행한다."""
+    # 미들웨어가 인증하지 않은 요청(라우트 테이블 누락 등)은 500 대신 401 로 막는다
+    user: User | None = getattr(request.state, "user", None)
+    if user is None:
+        raise HTTPException(status_code=401, detail="This Request requires an access token.")
+    return user
@@ -1,34 +1,94 @@
-import re
+from typing import Sequence
 
 from fastapi import HTTPException
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
-from starlette.requests import Request
-from starlette.responses import JSONResponse, Response
+from fastapi.dependencies.models import Dependant
+from fastapi.routing import APIRoute
+from starlette.datastructures import Headers
+from starlette.requests import cookie_parser
+from starlette.responses import JSONResponse
+from starlette.routing import BaseRoute, Match
+from starlette.types import ASGIApp, Receive, Scope, Send
 
+from src.dependencies.auth import login_required
 from src.services.auth import AuthService
 
-NEED_AUTH_REGEX_URL = [
-    r"^/users/me$",
-    r"^/users/me/profile_image$",
-    r"^/users/me/reviews$",
-    r"^/reviews$",
-    r"^/reviews/\d+$",
-    r"^/reviews/\d+/is_liked$",
-    r"^/likes/reviews/\d+/like$",
-    r"^/likes/reviews/\d+/unlike$",
-]
 
+def _requires_auth(dependant: Dependant) -> bool:
+    return any(dep.call is login_required or _requires_auth(dep) for dep in dependant.dependencies)
+
+
+class AuthRouteTable:
+    """login_required 의존성을 선언한 라우트만 모아둔 조회 테이블 (앱 시작 시 한 번 생성)"""
+
+    def __init__(self, routes: Sequence[BaseRoute]) -> None:
+        # path parameter 가 없는 라우트는 경로 문자열로 바로 조회
+        self.static: dict[str, APIRoute] = {}
+        # path parameter 가 있는 라우트는 첫 번째 경로 세그먼트로 후보를 좁힌다 (등록 순서, 라우트)
+        self.dynamic: dict[str, list[tuple[int, APIRoute]]] = {}
+        # 인증이 필요 없는 고정 경로 -> 메서드 -> 등록 순서 (/reviews/like_counts 처럼 /reviews/{review_id} 와 겹치는 라우트)
+        self.public_static: dict[str, dict[str, int]] = {}
+
+        for index, route in enumerate(routes):
+            if not isinstance(route, APIRoute):
+                continue
+            if not _requires_auth(route.dependant):
+                if not route.param_convertors:
+                    methods = self.public_static.setdefault(route.path_format, {})
+                    for method in route.methods:
+                        methods.setdefault(method, index)
+                continue
+            if route.param_convertors:
+                self.dynamic.setdefault(self._first_segment(route.path_format), []).append((index, route))
+            else:
+                self.static[route.path_format] = route
+
+    @staticmethod
+    def _first_segment(path: str) -> str:
+        return path.split("/", 2)[1] if path.startswith("/") else ""
+
+    def requires_auth(self, scope: Scope) -> bool:
+        path = scope["path"]
+        public_index = self.public_static.get(path, {}).get(scope["method"])
+        if public_index is None and path in self.static:
+            return True
+
+        candidates = self.dynamic.get(self._first_segment(path))
+        if not candidates:
+            return False
+
+        if public_index is not None:
+            # 라우터는 등록 순서대로 처음 완전히 매칭되는 라우트를 고르므로 공개 고정 경로보다 먼저 등록된 라우트만 가로챈다
+            return any(index < public_index and route.matches(scope)[0] == Match.FULL for index, route in candidates)
+        # 메서드가 다른 경우(Match.PARTIAL)도 인증 대상에 포함한다
+        return any(route.matches(scope)[0] != Match.NONE for _, route in candidates)
+
+
+def get_access_token(scope: Scope) -> str | None:
+    cookie_header = Headers(scope=scope).get("cookie")
+    if not cookie_header:
+        return None
+    return cookie_parser(cookie_header).get("access_token")
+
+
+class AuthMiddleware:
+    """인증이 필요한 라우트에 한해 쿠키의 access_token 으로 유저를 조회하여 request.state.user 에 담는 ASGI 미들웨어"""
+
+    def __init__(self, app: ASGIApp, routes: Sequence[BaseRoute]) -> None:
+        self.app = app
+        self.auth_route_table = AuthRouteTable(routes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.auth_route_table.requires_auth(scope):
+            await self.app(scope, receive, send)
+            return
 
-class AuthMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
         try:
-            for url in NEED_AUTH_REGEX_URL:
-                if re.match(url, request.url.path):
-                    request = await AuthService().get_current_user(request)
-                    break
-            response: Response = await call_next(request)
-            return response
+            user = await AuthService().get_user_by_access_token(get_access_token(scope))
         except HTTPException as e:
-            return JSONResponse({"detail": e.detail}, status_code=e.status_code)
-        except Exception as e:
-            return JSONResponse({"detail": str(e)}, status_code=500)
+            response = JSONResponse({"detail": e.detail}, status_code=e.status_code)
+            await response(scope, receive, send)
+            return
+
+        # request.state 는 scope["state"] 를 그대로 사용한다
+        scope.setdefault("state", {})["user"] = user
+        await self.app(scope, receive, send)
@@ -0,0 +1,160 @@
+import gzip
+import time
+from typing import Any, Callable
+
+import brotli
+import zstandard
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.configs import config
+from src.utils.cache import LRUCache
+
+# 같은 q 값이면 앞쪽 인코딩을 우선한다
+ENCODING_PREFERENCE = ("zstd", "br", "gzip")
+COMPRESSIBLE_CONTENT_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+# 인코딩 -> 압축 함수
+CODECS: dict[str, Callable[[bytes], bytes]] = {
+    "zstd": lambda body: zstandard.compress(body, level=config.COMPRESSION_ZSTD_LEVEL),
+    "br": lambda body: brotli.compress(body, quality=config.COMPRESSION_BROTLI_QUALITY),
+    "gzip": lambda body: gzip.compress(body, compresslevel=config.COMPRESSION_GZIP_LEVEL, mtime=0),
+}
+
+# (ETag, 인코딩) -> 압축된 본문. ETag 가 같으면 본문도 같으므로 자주 요청되는 응답은 한 번만 압축한다
+# ETag 는 epoch 마다 바뀌므로 TTL 도 epoch 주기에 맞춘다
+compressed_response_cache: LRUCache[tuple[str, str], bytes] = LRUCache(
+    "compressed_response", maxsize=config.COMPRESSION_CACHE_MAXSIZE, ttl=config.ETAG_EPOCH_SECONDS, sizeof=len
+)
+
+
+def negotiate_encoding(accept_encoding: str) -> str | None:
+    """Accept-Encoding 의 q 값이 가장 높은 인코딩 (없거나 모두 q=0 이면 None)"""
+    qualities: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        param_name, _, value = params.partition("=")
+        if param_name.strip().lower() == "q":
+            try:
+                quality = float(value)
+            except ValueError:
+                quality = 0.0
+        qualities[name] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in ENCODING_PREFERENCE:
+        if encoding not in CODECS:
+            continue
+        quality = qualities.get(encoding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class CompressionStats:
+    """라우트별 압축 통계 (압축에 쓴 CPU 시간, 압축 전후 크기)"""
+
+    def __init__(self) -> None:
+        self._routes: dict[str, dict[str, Any]] = {}
+
+    def record(
+        self, route: str, original_bytes: int, compressed_bytes: int, cpu_seconds: float, cache_hit: bool
+    ) -> None:
+        stats = self._routes.setdefault(
+            route,
+            {"responses": 0, "cache_hits": 0, "original_bytes": 0, "compressed_bytes": 0, "cpu_seconds": 0.0},
+        )
+        stats["responses"] += 1
+        stats["cache_hits"] += cache_hit
+        stats["original_bytes"] += original_bytes
+        stats["compressed_bytes"] += compressed_bytes
+        stats["cpu_seconds"] += cpu_seconds
+
+    def clear(self) -> None:
+        self._routes.clear()
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        return {
+            route: {**stats, "compression_ratio": stats["compressed_bytes"] / stats["original_bytes"]}
+            for route, stats in self._routes.items()
+        }
+
+
+compression_stats = CompressionStats()
+
+
+def _is_compressible(headers: MutableHeaders) -> bool:
+    return "content-encoding" not in headers and headers.get("content-type", "").startswith(COMPRESSIBLE_CONTENT_TYPES)
+
+
+def _get_route_name(scope: Scope) -> str:
+    # 라우팅이 끝나면 FastAPI 가 scope["route"] 에 매칭된 라우트를 담는다
+    return f"{scope['method']} {getattr(scope.get('route'), 'path', scope['path'])}"
+
+
+class CompressionMiddleware:
+    """Accept-Encoding 에 따라 COMPRESSION_MIN_BYTES 이상인 응답 본문을 zstd / br / gzip 으로 압축하는 ASGI 미들웨어.
+
+    본문을 한 번에 보내는 응답만 압축하고, StreamingResponse(GET /movies/export 등)는 그대로 흘려보낸다.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        start_message: Message | None = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            start, start_message = start_message, None
+            headers = MutableHeaders(raw=start["headers"])
+            if message.get("more_body", False) or not _is_compressible(headers):
+                await send(start)
+                await send(message)
+                return
+
+            headers.add_vary_header("Accept-Encoding")
+            body = message.get("body", b"")
+            if encoding is not None and len(body) >= config.COMPRESSION_MIN_BYTES:
+                body = self.compress(scope, encoding, body, headers.get("etag"))
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+                # 인코딩마다 본문 바이트가 다르므로 strong ETag 는 weak 로 바꾼다 (If-None-Match 는 weak 비교)
+                if (etag := headers.get("etag")) is not None and not etag.startswith("W/"):
+                    headers["ETag"] = f"W/{etag}"
+
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_wrapper)
+
+    @staticmethod
+    def compress(scope: Scope, encoding: str, body: bytes, etag: str | None) -> bytes:
+        cache_key = (etag, encoding) if etag is not None else None
+        compressed = compressed_response_cache.get(cache_key) if cache_key is not None else None
+        cache_hit, cpu_seconds = compressed is not None, 0.0
+        if compressed is None:
+            started = time.thread_time()
+            compressed = CODECS[encoding](body)
+            cpu_seconds = time.thread_time() - started
+            if cache_key is not None:
+                compressed_response_cache.set(cache_key, compressed)
+
+        compression_stats.record(_get_route_name(scope), len(body), len(compressed), cpu_seconds, cache_hit)
+        return compressed
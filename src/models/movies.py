@@ -1,6 +1,8 @@
 from tortoise import Model, fields
+from tortoise.indexes import Index
 
 from src.models.base import BaseModel
+from src.utils.search import MySQLFullTextIndex
 
 
 class Genre(BaseModel, Model):
@@ -19,7 +21,15 @@ class Movie(BaseModel, Model):
     release_date = fields.DateField()
     runtime = fields.IntField()
     poster_image_url = fields.CharField(max_length=255, null=True)
+    # 리뷰 생성/삭제 시 함께 갱신하는 리뷰 수 (engagement_counters 의 reconcile 작업이 어긋남을 바로잡는다)
+    review_count = fields.IntField(default=0)
     genres: fields.ManyToManyRelation[Genre] = fields.ManyToManyField("models.Genre", related_name="movies")
 
     class Meta:
         table = "movies"
+        # GET /movies 의 최신 개봉순 keyset pagination 용 인덱스
+        indexes = (
+            Index(fields=("release_date", "id"), name="idx_movies_release_date_id"),
+            # 한국어/영어 제목 부분 검색용 FULLTEXT 인덱스
+            MySQLFullTextIndex(fields=("title",), parser_name="ngram", name="ft_movies_title"),
+        )
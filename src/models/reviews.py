@@ -1,4 +1,5 @@
 from tortoise import Model, fields
+from tortoise.indexes import Index
 
 from src.models.base import BaseModel
 from src.models.movies import Movie
@@ -15,7 +16,11 @@ class Review(BaseModel, Model):
     title = fields.CharField(max_length=50)
     content = fields.CharField(max_length=255)
     review_image_url = fields.CharField(max_length=255, null=True)
+    # is_liked=True 인 좋아요 수 (좋아요/취소 시 함께 갱신)
+    like_count = fields.IntField(default=0)
 
     class Meta:
         table = "reviews"
         unique_together = (("user", "movie"),)
+        # GET /movies/{movie_id}/reviews 의 좋아요 많은 순 keyset pagination 용 인덱스
+        indexes = (Index(fields=("movie_id", "like_count", "id"), name="idx_reviews_movie_like_count_id"),)
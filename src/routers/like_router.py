@@ -1,57 +1,74 @@
-from fastapi import APIRouter, Path, Request
+from fastapi import APIRouter, Depends, HTTPException, Path, Request
+from tortoise.transactions import in_transaction
 
+from src.configs import config
+from src.dependencies.auth import login_required
 from src.models.likes import ReviewLike
+from src.models.reviews import Review
 from src.routers.review_router import review_router
 from src.schemas.likes import (
     ReviewIsLikedResponse,
     ReviewLikeCountResponse,
     ReviewLikeResponse,
 )
+from src.services.engagement_counters import adjust_review_like_count
+from src.services.entity_versions import entity_versions, user_likes_key
+from src.services.like_buffer import review_like_buffer
+from src.services.review_likes import (
+    cancel_review_like,
+    propagate_like_counts,
+    upsert_review_like,
+)
 
 like_router = APIRouter(prefix="/likes", tags=["likes"])
 
 
-@like_router.post("/reviews/{review_id}/like", status_code=200)
-async def like_review(request: Request, review_id: int = Path(gt=0)) -> ReviewLikeResponse:
-    review_like, _ = await ReviewLike.get_or_create(user_id=request.state.user.id, review_id=review_id)
-
-    if not review_like.is_liked:
-        review_like.is_liked = True
-        await review_like.save()
-
-    assert hasattr(review_like, "user_id") and hasattr(review_like, "review_id")
+async def _set_review_like(user_id: int, review_id: int, is_liked: bool) -> ReviewLikeResponse:
+    if config.REVIEW_LIKE_WRITE_BEHIND and not await Review.exists(id=review_id):
+        # 없는 리뷰는 버퍼에 넣기 전에 거른다 (유저는 login_required 가 이미 확인했다)
+        raise HTTPException(status_code=404, detail="Review does not exist")
 
-    return ReviewLikeResponse(
-        id=review_like.id, user_id=review_like.user_id, review_id=review_like.review_id, is_liked=review_like.is_liked
-    )
+    entity_versions.bump(user_likes_key(user_id))
+    if config.REVIEW_LIKE_WRITE_BEHIND:
+        # 좋아요 행은 flush 때 만들어지므로 id 는 아직 알 수 없다
+        await review_like_buffer.set(user_id, review_id, is_liked)
+        return ReviewLikeResponse(user_id=user_id, review_id=review_id, is_liked=is_liked)
 
+    async with in_transaction():
+        if is_liked:
+            state = await upsert_review_like(user_id, review_id)
+        else:
+            state = await cancel_review_like(user_id, review_id)
+        if state.like_count_delta:
+            await adjust_review_like_count(review_id, state.like_count_delta)
+    if state.like_count_delta:
+        await propagate_like_counts([review_id])
 
-@like_router.post("/reviews/{review_id}/unlike", status_code=200)
-async def unlike_review(request: Request, review_id: int = Path(gt=0)) -> ReviewLikeResponse:
-    review_like = await ReviewLike.get_or_none(user_id=request.state.user.id, review_id=review_id)
+    return ReviewLikeResponse(id=state.id, user_id=user_id, review_id=review_id, is_liked=state.is_liked)
 
-    if review_like is None:
-        return ReviewLikeResponse(user_id=request.state.user.id, review_id=review_id, is_liked=False)
 
-    if review_like.is_liked:
-        review_like.is_liked = False
-        await review_like.save()
+@like_router.post("/reviews/{review_id}/like", status_code=200, dependencies=[Depends(login_required)])
+async def like_review(request: Request, review_id: int = Path(gt=0)) -> ReviewLikeResponse:
+    return await _set_review_like(request.state.user.id, review_id, is_liked=True)
 
-    assert hasattr(review_like, "user_id") and hasattr(review_like, "review_id")
 
-    return ReviewLikeResponse(
-        id=review_like.id, user_id=review_like.user_id, review_id=review_like.review_id, is_liked=review_like.is_liked
-    )
+@like_router.post("/reviews/{review_id}/unlike", status_code=200, dependencies=[Depends(login_required)])
+async def unlike_review(request: Request, review_id: int = Path(gt=0)) -> ReviewLikeResponse:
+    return await _set_review_like(request.state.user.id, review_id, is_liked=False)
 
 
 @review_router.get("/{review_id}/like_count", status_code=200)
 async def get_review_like_count(review_id: int = Path(gt=0)) -> ReviewLikeCountResponse:
-    like_count = await ReviewLike.filter(review_id=review_id).count()
-    return ReviewLikeCountResponse(review_id=review_id, like_count=like_count)
+    review = await Review.get_or_none(id=review_id).only("id", "like_count")
+    return ReviewLikeCountResponse(review_id=review_id, like_count=review.like_count if review else 0)
 
 
-@review_router.get("/{review_id}/is_liked", status_code=200)
+@review_router.get("/{review_id}/is_liked", status_code=200, dependencies=[Depends(login_required)])
 async def get_user_review_is_liked(request: Request, review_id: int = Path(gt=0)) -> ReviewIsLikedResponse:
+    buffered = review_like_buffer.get(request.state.user.id, review_id)
+    if buffered is not None:
+        return ReviewIsLikedResponse(review_id=review_id, is_liked=buffered)
+
     like = await ReviewLike.get_or_none(review_id=review_id, user_id=request.state.user.id)
     if like is None:
         return ReviewIsLikedResponse(review_id=review_id, is_liked=False)
@@ -0,0 +1,34 @@
+from fastapi import APIRouter
+
+from src.middleware.compression import compression_stats
+from src.schemas.metrics import (
+    CacheStatsResponse,
+    CompressionStatsResponse,
+    ReviewLikeBufferStatsResponse,
+    TokenRevocationStatsResponse,
+)
+from src.services.like_buffer import review_like_buffer
+from src.services.token_revocation import token_revocation_store
+from src.utils.cache import CACHE_REGISTRY
+
+metrics_router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@metrics_router.get("/caches", status_code=200)
+async def get_cache_stats() -> dict[str, CacheStatsResponse]:
+    return {name: CacheStatsResponse(**cache.stats()) for name, cache in CACHE_REGISTRY.items()}
+
+
+@metrics_router.get("/token_revocation", status_code=200)
+async def get_token_revocation_stats() -> TokenRevocationStatsResponse:
+    return TokenRevocationStatsResponse(**token_revocation_store.stats())
+
+
+@metrics_router.get("/compression", status_code=200)
+async def get_compression_stats() -> dict[str, CompressionStatsResponse]:
+    return {route: CompressionStatsResponse(**stats) for route, stats in compression_stats.stats().items()}
+
+
+@metrics_router.get("/review_like_buffer", status_code=200)
+async def get_review_like_buffer_stats() -> ReviewLikeBufferStatsResponse:
+    return ReviewLikeBufferStatsResponse(**review_like_buffer.stats())
@@ -1,18 +1,140 @@
-from typing import Annotated
+import time
+from collections import Counter
+from datetime import date
+from typing import Annotated, Any, AsyncIterator, Callable, Mapping
 
-from fastapi import APIRouter, Depends, HTTPException, Path, Query, UploadFile
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    HTTPException,
+    Path,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+)
+from fastapi.responses import StreamingResponse
+from tortoise.expressions import Q
+from tortoise.queryset import QuerySet
+from tortoise.transactions import in_transaction
 
+from src.configs import config
 from src.models.movies import Genre, Movie
+from src.models.reviews import Review
 from src.schemas.movies import (
+    BulkMovieCreateItem,
+    BulkMovieItem,
+    BulkMovieItemResult,
+    BulkMovieResponse,
+    BulkMovieUpdateItem,
     CreateMovieRequest,
     MovieResponse,
     MovieSearchParams,
     MovieUpdateRequest,
 )
+from src.services.entity_versions import (
+    MOVIES_KEY,
+    entity_versions,
+    movie_key,
+    movie_reviews_key,
+    review_key,
+)
 from src.services.file import FileUploadService
+from src.services.genre_catalog import genre_catalog
+from src.services.movie_cache import invalidate_movie, movie_detail_cache
+from src.services.movie_genre_index import movie_genre_index
+from src.services.movie_genres import get_genre_ids_by_movie, sync_movie_genres
+from src.services.top_reviews import top_review_index
+from src.utils.cursor import InvalidCursor, decode_cursor, encode_cursor
+from src.utils.etag import raise_if_not_modified
+from src.utils.response import FastJSONResponse, encode_json
+from src.utils.search import FullTextMatch, FullTextPhraseMatch
 
 movie_router = APIRouter(prefix="/movies", tags=["movies"])
 
+# MySQL ngram 파서의 기본 토큰 크기 (ngram_token_size)
+NGRAM_TOKEN_SIZE = 2
+
+# 장르 필터 후보가 이 수 이하이면 id IN (...) 으로 조회하고, 넘으면 정렬 순서대로 청크 단위로 훑으며 인덱스로 거른다
+GENRE_FILTER_MAX_IN_IDS = 1000
+GENRE_FILTER_SCAN_CHUNK_SIZE = 500
+
+MOVIE_ORDERINGS = {
+    "id": ("id",),
+    "-release_date": ("-release_date", "-id"),
+    "relevance": ("-relevance", "-id"),
+}
+
+
+async def _to_movie_responses(movies: list[Movie]) -> list[MovieResponse]:
+    """장르는 연결 테이블에서 id 만 조회하고, 이름은 메모리의 장르 카탈로그에서 채운다"""
+    genre_ids_by_movie = await get_genre_ids_by_movie(movie.id for movie in movies)
+    genre_names = await genre_catalog.get_names(
+        [genre_id for genre_ids in genre_ids_by_movie.values() for genre_id in genre_ids]
+    )
+    return [
+        MovieResponse(
+            id=movie.id,
+            title=movie.title,
+            overview=movie.overview,
+            cast=movie.cast,
+            runtime=movie.runtime,
+            release_date=movie.release_date,
+            genres=genre_ids_by_movie[movie.id],
+            genres_str=[genre_names[genre_id] for genre_id in genre_ids_by_movie[movie.id]],
+            poster_image_url=movie.poster_image_url,
+            review_count=movie.review_count,
+        )
+        for movie in movies
+    ]
+
+
+def _parse_fields(fields: str | None) -> list[str]:
+    """?fields=title,genres 형태의 sparse fieldset 을 MovieResponse 필드 목록으로 바꾼다 (id 는 항상 포함, 없으면 전체)"""
+    if fields is None:
+        return list(MovieResponse.model_fields)
+
+    selected = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown_fields = selected - MovieResponse.model_fields.keys()
+    if unknown_fields:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown_fields))}")
+    return [field for field in MovieResponse.model_fields if field in selected or field == "id"]
+
+
+def _get_movie_columns(fields: list[str], order_by: str | None = None) -> list[str]:
+    """응답 필드에 필요한 컬럼만 조회한다 (keyset cursor 를 만드는 데 필요한 컬럼 포함)"""
+    columns = [field for field in fields if field in Movie._meta.db_fields]
+    if order_by == "-release_date" and "release_date" not in columns:
+        columns.append("release_date")
+    elif order_by == "relevance":
+        columns.append("relevance")
+    return columns
+
+
+async def _to_movie_rows(rows: list[dict[str, Any]], fields: list[str]) -> list[dict[str, Any]]:
+    """values() 로 조회한 행을 응답 dict 로 바꾼다 (MovieResponse 를 만들어 다시 검증/직렬화하지 않는다)"""
+    genre_ids_by_movie: dict[int, list[int]] = {}
+    genre_names: Mapping[int, str] = {}
+    if "genres" in fields or "genres_str" in fields:
+        genre_ids_by_movie = await get_genre_ids_by_movie(row["id"] for row in rows)
+        genre_names = await genre_catalog.get_names(
+            [genre_id for genre_ids in genre_ids_by_movie.values() for genre_id in genre_ids]
+        )
+
+    result = []
+    for row in rows:
+        item: dict[str, Any] = {}
+        for field in fields:
+            if field == "genres":
+                item[field] = genre_ids_by_movie[row["id"]]
+            elif field == "genres_str":
+                item[field] = [genre_names[genre_id] for genre_id in genre_ids_by_movie[row["id"]]]
+            else:
+                item[field] = row[field]
+        result.append(item)
+    return result
+
 
 @movie_router.post("", status_code=201)
 async def create_movie(data: CreateMovieRequest) -> MovieResponse:
@@ -23,66 +145,267 @@ async def create_movie(data: CreateMovieRequest) -> MovieResponse:
 
     # 생성된 영화에 장르를 관계로 추가해주기
     await movie.genres.add(*genres)
+    movie_genre_index.set_movie_genres(movie.id, [genre.id for genre in genres])
+    invalidate_movie(movie.id)
+
+    return (await _to_movie_responses([movie]))[0]
+
+
+@movie_router.post("/bulk", status_code=200)
+async def bulk_upsert_movies(
+    items: Annotated[list[BulkMovieItem], Body(min_length=1, max_length=config.MOVIE_BULK_MAX_ITEMS)],
+) -> BulkMovieResponse:
+    """여러 영화를 한 트랜잭션에서 생성(external_id 가 있으면 upsert)/수정하고 장르 연결은 한 번에 동기화한다"""
+    started_at = time.perf_counter()
+    create_items = [(index, item) for index, item in enumerate(items) if isinstance(item, BulkMovieCreateItem)]
+    update_items = [(index, item) for index, item in enumerate(items) if isinstance(item, BulkMovieUpdateItem)]
+
+    # 같은 영화를 두 번 보내면 한 행만 쓰이는데 결과는 두 건으로 집계되므로 받지 않는다
+    duplicated = {
+        key: sorted(value for value, count in Counter(values).items() if count > 1)
+        for key, values in (
+            ("external_id", [item.external_id for _, item in create_items if item.external_id is not None]),
+            ("id", [item.id for _, item in update_items]),
+        )
+    }
+    if any(duplicated.values()):
+        detail = "; ".join(f"Duplicate {key}: {', '.join(map(str, ids))}" for key, ids in duplicated.items() if ids)
+        raise HTTPException(status_code=400, detail=detail)
+
+    # 존재하지 않는 장르는 무시한다 (create_movie 와 동일)
+    genre_names = await genre_catalog.get_names({genre_id for item in items for genre_id in item.genre_ids or ()})
+
+    results: dict[int, BulkMovieItemResult] = {}
+    genre_ids_by_movie: dict[int, list[int]] = {}
+    async with in_transaction():
+        upsert_items = [(index, item) for index, item in create_items if item.external_id is not None]
+        if upsert_items:
+            external_ids = [item.external_id for _, item in upsert_items]
+            existing_ids = dict(await Movie.filter(external_id__in=external_ids).values_list("external_id", "id"))
+            await Movie.bulk_create(
+                [Movie(**item.model_dump(exclude={"genre_ids"})) for _, item in upsert_items],
+                update_fields=[field for field in CreateMovieRequest.model_fields if field != "genre_ids"],
+                on_conflict=["external_id"],
+            )
+            movie_ids = dict(await Movie.filter(external_id__in=external_ids).values_list("external_id", "id"))
+            for index, item in upsert_items:
+                movie_id = movie_ids[item.external_id]
+                if item.external_id in existing_ids:
+                    results[index] = BulkMovieItemResult(index=index, id=movie_id, status="updated")
+                else:
+                    results[index] = BulkMovieItemResult(index=index, id=movie_id, status="created")
+                genre_ids_by_movie[movie_id] = item.genre_ids
+
+        # external_id 가 없으면 생성된 id 를 알 수 없으므로 한 건씩 INSERT 한다
+        for index, item in create_items:
+            if item.external_id is None:
+                created_movie = await Movie.create(**item.model_dump(exclude={"genre_ids", "external_id"}))
+                results[index] = BulkMovieItemResult(index=index, id=created_movie.id, status="created")
+                genre_ids_by_movie[created_movie.id] = item.genre_ids
+
+        if update_items:
+            movies = {movie.id: movie for movie in await Movie.filter(id__in=[item.id for _, item in update_items])}
+            update_fields: set[str] = set()
+            for index, update_item in update_items:
+                movie = movies.get(update_item.id)
+                if movie is None:
+                    results[index] = BulkMovieItemResult(index=index, id=update_item.id, status="not_found")
+                    continue
+
+                update_data = update_item.model_dump(exclude={"id", "genre_ids"}, exclude_none=True)
+                for key, value in update_data.items():
+                    setattr(movie, key, value)
+                update_fields.update(update_data)
+                results[index] = BulkMovieItemResult(index=index, id=movie.id, status="updated")
+                if update_item.genre_ids is not None:
+                    genre_ids_by_movie[movie.id] = update_item.genre_ids
+            if update_fields:
+                await Movie.bulk_update(list(movies.values()), fields=sorted(update_fields))
+
+        genre_ids_by_movie = {
+            movie_id: [genre_id for genre_id in genre_ids if genre_id in genre_names]
+            for movie_id, genre_ids in genre_ids_by_movie.items()
+        }
+        await sync_movie_genres(genre_ids_by_movie)
+
+    for movie_id, genre_ids in genre_ids_by_movie.items():
+        movie_genre_index.set_movie_genres(movie_id, genre_ids)
+    for result in results.values():
+        if result.id is not None and result.status != "not_found":
+            invalidate_movie(result.id)
 
-    # fetch_related를 이용하여 장르를 미리 가져오기
-    await movie.fetch_related("genres")
-
-    return MovieResponse(
-        id=movie.id,
-        title=movie.title,
-        overview=movie.overview,
-        cast=movie.cast,
-        runtime=movie.runtime,
-        release_date=movie.release_date,
-        genres=[genre.id for genre in movie.genres],
-        genres_str=[genre.name for genre in movie.genres],
+    elapsed_seconds = time.perf_counter() - started_at
+    statuses = [result.status for result in results.values()]
+    return BulkMovieResponse(
+        results=[results[index] for index in range(len(items))],
+        created=statuses.count("created"),
+        updated=statuses.count("updated"),
+        not_found=statuses.count("not_found"),
+        elapsed_seconds=elapsed_seconds,
+        rows_per_second=len(items) / elapsed_seconds if elapsed_seconds else 0.0,
     )
 
 
-@movie_router.get("", status_code=200)
-async def get_movies(query_params: Annotated[MovieSearchParams, Query()]) -> list[MovieResponse]:
+@movie_router.get("", status_code=200, response_model=list[MovieResponse])
+async def get_movies(
+    request: Request, query_params: Annotated[MovieSearchParams, Query()], response: Response
+) -> Response:
+    # 목록은 어떤 영화가 바뀌어도 달라질 수 있으므로 목록 전체 버전과 쿼리 문자열로 ETag 를 만든다
+    etag = entity_versions.etag(MOVIES_KEY, variant=request.url.query)
+    raise_if_not_modified(request, etag)
+    response.headers["ETag"] = etag
+
     movie_qs = Movie.filter().all()
-    if query_params.genre_ids:
-        movie_qs = movie_qs.filter(genres__id__in=query_params.genre_ids).distinct()
 
-    if query_params.title:
+    order_by: str = query_params.order_by
+    if query_params.title and len(query_params.title.strip()) >= NGRAM_TOKEN_SIZE:
+        # FULLTEXT(ngram) 인덱스에서 검색어를 구로 포함하는 영화만 찾고, 관련도 순으로 정렬한다
+        order_by = "relevance"
+        movie_qs = movie_qs.annotate(
+            title_match=FullTextPhraseMatch("title", query_params.title),
+            relevance=FullTextMatch("title", query_params.title),
+        ).filter(title_match__gt=0)
+    elif query_params.title:
+        # ngram 토큰보다 짧은 검색어는 FULLTEXT 인덱스로 찾을 수 없다
         movie_qs = movie_qs.filter(title__icontains=query_params.title)
 
-    movies = await movie_qs.prefetch_related("genres")
+    cursor = None
+    if query_params.cursor:
+        try:
+            cursor = decode_cursor(query_params.cursor)
+            movie_qs = movie_qs.filter(_get_keyset_condition(order_by, cursor))
+        except InvalidCursor as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
-    return [
-        MovieResponse(
-            id=movie.id,
-            title=movie.title,
-            overview=movie.overview,
-            cast=movie.cast,
-            runtime=movie.runtime,
-            release_date=movie.release_date,
-            genres=[genre.id for genre in movie.genres],
-            genres_str=[genre.name for genre in movie.genres],
+    fields = _parse_fields(query_params.fields)
+    columns = _get_movie_columns(fields, order_by)
+    # 다음 페이지 존재 여부를 알기 위해 한 건을 더 조회한다
+    page_size = query_params.limit + 1
+    if query_params.genre_ids:
+        # movies_genres 조인 대신 메모리의 장르 비트맵 인덱스로 후보 영화 id 를 구한다
+        await movie_genre_index.ensure_built()
+        matched = movie_genre_index.match(query_params.genre_ids, match_all=query_params.genre_match == "all")
+        if order_by == "id" and not query_params.title:
+            # id 순 조회는 인덱스에서 이번 페이지에 필요한 id 만 잘라낸다
+            candidate_ids = movie_genre_index.movie_ids(
+                matched, after_id=cursor["id"] if cursor else None, limit=page_size
+            )
+            movie_qs = movie_qs.filter(id__in=candidate_ids)
+        elif matched.bit_count() <= GENRE_FILTER_MAX_IN_IDS:
+            movie_qs = movie_qs.filter(id__in=movie_genre_index.movie_ids(matched))
+        else:
+            # 후보가 많으면 id 목록 전체를 IN 으로 보내지 않고, 정렬 순서대로 훑으며 인덱스로 거른다
+            rows = await _scan_movie_rows(movie_qs, order_by, columns, page_size, movie_genre_index.contains(matched))
+            return await _to_movie_page(response, order_by, rows, fields, query_params.limit)
+
+    rows = await movie_qs.order_by(*MOVIE_ORDERINGS[order_by]).limit(page_size).values(*columns)
+    return await _to_movie_page(response, order_by, rows, fields, query_params.limit)
+
+
+async def _scan_movie_rows(
+    movie_qs: QuerySet[Movie], order_by: str, columns: list[str], size: int, is_matched: Callable[[int], bool]
+) -> list[dict[str, Any]]:
+    """정렬 순서대로 GENRE_FILTER_SCAN_CHUNK_SIZE 건씩 조회하여 is_matched 인 행을 size 개까지 모은다"""
+    rows: list[dict[str, Any]] = []
+    chunk_qs = movie_qs
+    while len(rows) < size:
+        chunk = await chunk_qs.order_by(*MOVIE_ORDERINGS[order_by]).limit(GENRE_FILTER_SCAN_CHUNK_SIZE).values(*columns)
+        rows += [row for row in chunk if is_matched(row["id"])]
+        if len(chunk) < GENRE_FILTER_SCAN_CHUNK_SIZE:
+            break
+        last = chunk[-1]
+        chunk_qs = movie_qs.filter(
+            _get_keyset_after(order_by, last["id"], last.get("release_date"), last.get("relevance"))
         )
-        for movie in movies
-    ]
+    return rows[:size]
 
 
-@movie_router.get("/{movie_id}", status_code=200)
-async def get_movie(movie_id: int = Path(gt=0)) -> MovieResponse:
-    movie = await Movie.get_or_none(id=movie_id)
-    if movie is None:
-        raise HTTPException(status_code=404)
-    await movie.fetch_related("genres")
-    return MovieResponse(
-        id=movie.id,
-        title=movie.title,
-        overview=movie.overview,
-        cast=movie.cast,
-        runtime=movie.runtime,
-        release_date=movie.release_date,
-        genres=[genre.id for genre in movie.genres],
-        genres_str=[genre.name for genre in movie.genres],
+async def _to_movie_page(
+    response: Response, order_by: str, rows: list[dict[str, Any]], fields: list[str], limit: int
+) -> Response:
+    if len(rows) > limit:
+        rows = rows[:limit]
+        _set_next_cursor(response, order_by, rows[-1]["id"], rows[-1].get("release_date"), rows[-1].get("relevance"))
+
+    return FastJSONResponse(await _to_movie_rows(rows, fields), headers=dict(response.headers))
+
+
+def _set_next_cursor(
+    response: Response, order_by: str, movie_id: int, release_date: date | None, relevance: float | None
+) -> None:
+    response.headers["X-Next-Cursor"] = encode_cursor(
+        {"order_by": order_by, "id": movie_id, "release_date": release_date, "relevance": relevance}
     )
 
 
+@movie_router.get("/export", status_code=200, response_class=StreamingResponse)
+async def export_movies() -> StreamingResponse:
+    """전체 영화를 NDJSON(한 줄에 영화 하나)으로 스트리밍한다. id 순으로 청크 단위 조회하여 메모리 사용량이 카탈로그 크기와 무관하다"""
+    return StreamingResponse(_iter_movie_export_lines(), media_type="application/x-ndjson")
+
+
+async def _iter_movie_export_lines() -> AsyncIterator[bytes]:
+    fields = list(MovieResponse.model_fields)
+    columns = _get_movie_columns(fields)
+    last_id = 0
+    while True:
+        rows = await Movie.filter(id__gt=last_id).order_by("id").limit(config.MOVIE_EXPORT_CHUNK_SIZE).values(*columns)
+        if not rows:
+            return
+
+        # 장르는 청크마다 연결 테이블에서 한 번에 조회한다
+        items = await _to_movie_rows(rows, fields)
+        yield b"".join(encode_json(item) + b"\n" for item in items)
+        last_id = rows[-1]["id"]
+
+
+def _get_keyset_condition(order_by: str, cursor: dict[str, Any]) -> Q:
+    """cursor 가 가리키는 마지막 행 이후의 행만 조회하는 조건 (offset 과 달리 페이지 깊이와 무관하게 인덱스를 탄다)"""
+    if cursor.get("order_by") != order_by or not isinstance(cursor.get("id"), int):
+        raise InvalidCursor()
+
+    if order_by == "id":
+        return _get_keyset_after(order_by, cursor["id"], None, None)
+
+    if order_by == "relevance":
+        if not isinstance(cursor.get("relevance"), (int, float)):
+            raise InvalidCursor()
+        return _get_keyset_after(order_by, cursor["id"], None, cursor["relevance"])
+
+    try:
+        release_date = date.fromisoformat(cursor["release_date"])
+    except (TypeError, ValueError):
+        raise InvalidCursor()
+    return _get_keyset_after(order_by, cursor["id"], release_date, None)
+
+
+def _get_keyset_after(order_by: str, movie_id: int, release_date: date | None, relevance: float | None) -> Q:
+    if order_by == "id":
+        return Q(id__gt=movie_id)
+    if order_by == "relevance":
+        return Q(relevance__lt=relevance) | Q(relevance=relevance, id__lt=movie_id)
+    return Q(release_date__lt=release_date) | Q(release_date=release_date, id__lt=movie_id)
+
+
+@movie_router.get("/{movie_id}", status_code=200, response_model=MovieResponse)
+async def get_movie(request: Request, movie_id: int = Path(gt=0), fields: str | None = Query(None)) -> Response:
+    etag = entity_versions.etag(movie_key(movie_id), variant=fields or "")
+
+    movie_fields = _parse_fields(fields)
+    # 캐시 적중 시 검증/직렬화 없이 인코딩된 본문을 그대로 응답한다 (sparse fieldset 응답은 캐시하지 않는다)
+    body = movie_detail_cache.get((movie_id, etag)) if fields is None else None
+    if body is None:
+        rows = await Movie.filter(id=movie_id).values(*_get_movie_columns(movie_fields))
+        if not rows:
+            raise HTTPException(status_code=404)
+        body = encode_json((await _to_movie_rows(rows, movie_fields))[0])
+        if fields is None:
+            movie_detail_cache.set((movie_id, etag), body)
+    # 캐시에 있거나 DB 에서 찾은, 존재하는 영화에만 If-None-Match 를 적용한다 (없는 영화는 304 대신 404)
+    raise_if_not_modified(request, etag)
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+
 @movie_router.patch("/{movie_id}", status_code=200)
 async def update_movie(data: MovieUpdateRequest, movie_id: int = Path(gt=0)) -> MovieResponse:
     movie = await Movie.get_or_none(id=movie_id)
@@ -95,24 +418,14 @@ async def update_movie(data: MovieUpdateRequest, movie_id: int = Path(gt=0)) ->
     await movie.save()
 
     if data.genre_ids is not None:
-        genres = await Genre.filter(id__in=data.genre_ids)
-        # 기존 장르 연결 제거
-        await movie.genres.clear()
-        # 새 장르 연결 추가
-        await movie.genres.add(*genres)
-
-    await movie.fetch_related("genres")
-
-    return MovieResponse(
-        id=movie.id,
-        title=movie.title,
-        overview=movie.overview,
-        cast=movie.cast,
-        runtime=movie.runtime,
-        release_date=movie.release_date,
-        genres=[genre.id for genre in movie.genres],
-        genres_str=[genre.name for genre in movie.genres],
-    )
+        # 존재하지 않는 장르는 무시하고, 기존 연결과 달라진 장르만 삭제/추가한다
+        genre_names = await genre_catalog.get_names(data.genre_ids)
+        genre_ids = [genre_id for genre_id in data.genre_ids if genre_id in genre_names]
+        await sync_movie_genres({movie.id: genre_ids})
+        movie_genre_index.set_movie_genres(movie.id, genre_ids)
+    invalidate_movie(movie.id)
+
+    return (await _to_movie_responses([movie]))[0]
 
 
 @movie_router.delete("/{movie_id}", status_code=204)
@@ -120,8 +433,14 @@ async def delete_movie(movie_id: int = Path(gt=0)) -> None:
     movie = await Movie.get_or_none(id=movie_id)
     if movie is None:
         raise HTTPException(status_code=404)
+    # 영화가 지워지면 리뷰도 함께 지워지므로 (on_delete=CASCADE) 지워질 리뷰의 ETag 버전도 올린다
+    review_ids = [review_id for (review_id,) in await Review.filter(movie_id=movie_id).values_list("id")]
     await movie.genres.clear()
     await movie.delete()
+    movie_genre_index.remove_movie(movie_id)
+    invalidate_movie(movie_id)
+    top_review_index.remove_movie(movie_id)
+    entity_versions.bump(movie_reviews_key(movie_id), *(review_key(review_id) for review_id in review_ids))
 
 
 @movie_router.post("/{movie_id}/poster_image")
@@ -134,16 +453,5 @@ async def register_poster_image(
         raise HTTPException(status_code=404)
 
     updated_movie = await file_service.movie_poster_image_upload(movie, image)
-    await updated_movie.fetch_related("genres")
-
-    return MovieResponse(
-        id=updated_movie.id,
-        title=updated_movie.title,
-        overview=updated_movie.overview,
-        cast=updated_movie.cast,
-        runtime=updated_movie.runtime,
-        genres=[genre.id for genre in updated_movie.genres],
-        genres_str=[genre.name for genre in movie.genres],
-        release_date=updated_movie.release_date,
-        poster_image_url=updated_movie.poster_image_url,
-    )
+    invalidate_movie(movie_id)
+    return (await _to_movie_responses([updated_movie]))[0]
@@ -1,3 +1,5 @@
+from typing import Annotated, Any
+
 from fastapi import (
     APIRouter,
     Depends,
@@ -5,20 +7,53 @@ from fastapi import (
     Form,
     HTTPException,
     Path,
+    Query,
     Request,
+    Response,
     UploadFile,
 )
+from tortoise.expressions import Q
+from tortoise.transactions import in_transaction
 
+from src.configs import config
+from src.dependencies.auth import login_required
+from src.models.likes import ReviewLike
+from src.models.movies import Movie
 from src.models.reviews import Review
 from src.routers.movie_router import movie_router
 from src.routers.user_router import user_router
-from src.schemas.reviews import ReviewResponse
+from src.schemas.likes import ReviewIsLikedResponse, ReviewLikeCountResponse
+from src.schemas.reviews import (
+    MovieReviewResponse,
+    MovieReviewSearchParams,
+    ReviewResponse,
+)
+from src.services.auth import AuthService
+from src.services.engagement_counters import adjust_movie_review_count
+from src.services.entity_versions import (
+    entity_versions,
+    movie_reviews_key,
+    review_key,
+    user_likes_key,
+)
 from src.services.file import FileUploadService
+from src.services.like_buffer import review_like_buffer
+from src.services.movie_cache import invalidate_movie
+from src.services.top_reviews import top_review_index
+from src.utils.cursor import InvalidCursor, decode_cursor, encode_cursor
+from src.utils.etag import is_not_modified, raise_if_not_modified
+from src.utils.response import FastJSONResponse
 
 review_router = APIRouter(prefix="/reviews", tags=["reviews"])
 
+# 리뷰 목록 한 페이지 분량을 한 번에 조회하는 batch 조회의 최대 id 수
+REVIEW_BATCH_LOOKUP_MAX_IDS = 100
+
+# 같은 좋아요 수끼리는 id 역순(최신순)으로 정렬해야 keyset 조건이 행 하나를 가리킨다
+REVIEW_ORDERINGS = {"-id": ("-id",), "-like_count": ("-like_count", "-id")}
+
 
-@review_router.post("", status_code=201)
+@review_router.post("", status_code=201, dependencies=[Depends(login_required)])
 async def create_movie_review(
     request: Request,
     movie_id: int = Form(),
@@ -31,28 +66,77 @@ async def create_movie_review(
 
     review = await Review(**data)
 
-    if review_image:
-        review = await file_service.review_image_upload(review, review_image)
-    else:
-        await review.save()
+    async with in_transaction():
+        if review_image:
+            review = await file_service.review_image_upload(review, review_image)
+        else:
+            await review.save()
+        await adjust_movie_review_count(movie_id, 1)
 
     assert hasattr(review, "user_id") and hasattr(review, "movie_id")
+    entity_versions.bump(movie_reviews_key(review.movie_id))
+    # 영화 상세/목록의 review_count 가 바뀌었다
+    invalidate_movie(review.movie_id)
 
-    return ReviewResponse(
+    response = ReviewResponse(
         id=review.id,
         user_id=review.user_id,
         movie_id=review.movie_id,
         title=review.title,
         content=review.content,
         review_image_url=review.review_image_url,
+        like_count=review.like_count,
     )
+    await top_review_index.set_review(response.model_dump())
+    return response
+
 
+# /{review_id} 보다 먼저 등록해야 like_counts / is_liked 가 review_id 로 매칭되지 않는다
+@review_router.get("/like_counts", status_code=200)
+async def get_review_like_counts(
+    ids: list[int] = Query(min_length=1, max_length=REVIEW_BATCH_LOOKUP_MAX_IDS),
+) -> list[ReviewLikeCountResponse]:
+    """?ids=1&ids=2 의 like_count 를 한 번의 IN 조회로 반환한다 (없는 리뷰는 0)"""
+    review_ids = list(dict.fromkeys(ids))
+    like_counts = dict(await Review.filter(id__in=review_ids).values_list("id", "like_count"))
+    return [
+        ReviewLikeCountResponse(review_id=review_id, like_count=like_counts.get(review_id, 0))
+        for review_id in review_ids
+    ]
 
-@review_router.get("/{review_id}")
-async def get_review(review_id: int = Path(gt=0)) -> ReviewResponse:
+
+@review_router.get("/is_liked", status_code=200, dependencies=[Depends(login_required)])
+async def get_user_reviews_is_liked(
+    request: Request,
+    ids: list[int] = Query(min_length=1, max_length=REVIEW_BATCH_LOOKUP_MAX_IDS),
+) -> list[ReviewIsLikedResponse]:
+    """?ids=1&ids=2 에 대한 로그인 유저의 좋아요 여부를 한 번의 IN 조회로 반환한다 (write-behind 버퍼 우선)"""
+    review_ids = list(dict.fromkeys(ids))
+    user_id = request.state.user.id
+    liked_review_ids = {
+        review_id
+        for (review_id,) in await ReviewLike.filter(
+            user_id=user_id, review_id__in=review_ids, is_liked=True
+        ).values_list("review_id")
+    }
+
+    result = []
+    for review_id in review_ids:
+        buffered = review_like_buffer.get(user_id, review_id)
+        is_liked = buffered if buffered is not None else review_id in liked_review_ids
+        result.append(ReviewIsLikedResponse(review_id=review_id, is_liked=is_liked))
+    return result
+
+
+@review_router.get("/{review_id}", dependencies=[Depends(login_required)])
+async def get_review(request: Request, response: Response, review_id: int = Path(gt=0)) -> ReviewResponse:
+    etag = entity_versions.etag(review_key(review_id))
     review = await Review.get_or_none(id=review_id)
     if not review:
         raise HTTPException(status_code=404, detail="Review does not exist")
+    # 존재하는 리뷰에만 If-None-Match 를 적용한다 (없는 리뷰는 304 대신 404)
+    raise_if_not_modified(request, etag)
+    response.headers["ETag"] = etag
 
     assert hasattr(review, "user_id") and hasattr(review, "movie_id")
 
@@ -63,10 +147,11 @@ async def get_review(review_id: int = Path(gt=0)) -> ReviewResponse:
         title=review.title,
         content=review.content,
         review_image_url=review.review_image_url,
+        like_count=review.like_count,
     )
 
 
-@review_router.patch("/{review_id}")
+@review_router.patch("/{review_id}", dependencies=[Depends(login_required)])
 async def update_review(
     request: Request,
     update_title: str | None = Form(None),
@@ -90,68 +175,122 @@ async def update_review(
         review = await file_service.review_image_upload(review, update_image)
     else:
         await review.save()
+    entity_versions.bump(review_key(review.id), movie_reviews_key(review.movie_id))
 
-    return ReviewResponse(
+    response = ReviewResponse(
         id=review.id,
         user_id=review.user_id,
         movie_id=review.movie_id,
         title=review.title,
         content=review.content,
         review_image_url=review.review_image_url,
+        like_count=review.like_count,
     )
+    await top_review_index.set_review(response.model_dump())
+    return response
 
 
-@review_router.delete("/{review_id}", status_code=204)
+@review_router.delete("/{review_id}", status_code=204, dependencies=[Depends(login_required)])
 async def delete_review(request: Request, review_id: int = Path(gt=0)) -> None:
     review = await Review.filter(id=review_id).first()
     if not review:
         raise HTTPException(status_code=404, detail="Review does not exist")
 
-    assert hasattr(review, "user_id")
+    assert hasattr(review, "user_id") and hasattr(review, "movie_id")
 
     if review.user_id != request.state.user.id:
         raise HTTPException(status_code=403, detail="Only the review owner can delete review.")
 
-    await review.delete()
+    async with in_transaction():
+        await review.delete()
+        await adjust_movie_review_count(review.movie_id, -1)
+    entity_versions.bump(review_key(review_id), movie_reviews_key(review.movie_id))
+    invalidate_movie(review.movie_id)
+    await top_review_index.remove_review(review.movie_id, review_id)
 
 
-@movie_router.get("/{movie_id}/reviews")
-async def get_movie_reviews(movie_id: int = Path(gt=0)) -> list[ReviewResponse]:
-    reviews = await Review.filter(movie_id=movie_id).all()
-    result = []
-    for review in reviews:
-        assert hasattr(review, "user_id") and hasattr(review, "movie_id")
-
-        result.append(
-            ReviewResponse(
-                id=review.id,
-                user_id=review.user_id,
-                movie_id=review.movie_id,
-                title=review.title,
-                content=review.content,
-                review_image_url=review.review_image_url,
-            )
-        )
+@movie_router.get("/{movie_id}/reviews", response_model=list[MovieReviewResponse])
+async def get_movie_reviews(
+    request: Request, query_params: Annotated[MovieReviewSearchParams, Query()], movie_id: int = Path(gt=0)
+) -> Response:
+    """영화의 리뷰를 최신순 / 좋아요 많은 순으로 cursor pagination 한다.
 
-    return result
+    한 페이지는 리뷰 조회와 (로그인 유저라면) 좋아요 여부 IN 조회, 페이지 크기와 무관하게 최대 두 번의 쿼리로 만든다.
+    로그인이 필수가 아니므로 access token 이 유효할 때만 is_liked 를 채운다 (아니면 null).
+    """
+    viewer_id = AuthService().get_user_id_by_access_token(request.cookies.get("access_token"))
+    # 로그인 유저마다 is_liked 가 다르므로 유저의 좋아요 버전과 user_id 도 ETag 에 섞는다
+    version_keys = [movie_reviews_key(movie_id)] + ([user_likes_key(viewer_id)] if viewer_id is not None else [])
+    etag = entity_versions.etag(*version_keys, variant=f"{request.url.query}:{viewer_id or ''}")
+    # 304 로 응답할 때만 영화가 있는지 확인한다 (없는 영화의 리뷰 목록은 304 대신 404)
+    if is_not_modified(request, etag) and not await Movie.exists(id=movie_id):
+        raise HTTPException(status_code=404, detail="Movie not found")
+    raise_if_not_modified(request, etag)
+    headers = {"ETag": etag}
 
+    order_by = query_params.order_by
+    review_qs = Review.filter(movie_id=movie_id)
+    if query_params.cursor:
+        try:
+            review_qs = review_qs.filter(_get_review_keyset_condition(order_by, decode_cursor(query_params.cursor)))
+        except InvalidCursor as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
-@user_router.get("/me/reviews")
-async def get_my_reviews(request: Request) -> list[ReviewResponse]:
-    reviews = await Review.filter(user_id=request.state.user.id).all()
-    result = []
-    for review in reviews:
-        assert hasattr(review, "user_id") and hasattr(review, "movie_id")
-
-        result.append(
-            ReviewResponse(
-                id=review.id,
-                user_id=review.user_id,
-                movie_id=review.movie_id,
-                title=review.title,
-                content=review.content,
-                review_image_url=review.review_image_url,
-            )
+    # 다음 페이지 존재 여부를 알기 위해 한 건을 더 조회한다
+    rows = (
+        await review_qs.order_by(*REVIEW_ORDERINGS[order_by])
+        .limit(query_params.limit + 1)
+        .values(*ReviewResponse.model_fields)
+    )
+    if not rows and not await Movie.exists(id=movie_id):
+        # 빈 페이지일 때만 영화가 있는지 확인하므로 리뷰가 있는 페이지는 쿼리가 늘지 않는다
+        raise HTTPException(status_code=404, detail="Movie not found")
+    if len(rows) > query_params.limit:
+        rows = rows[: query_params.limit]
+        headers["X-Next-Cursor"] = encode_cursor(
+            {"order_by": order_by, "id": rows[-1]["id"], "like_count": rows[-1]["like_count"]}
         )
 
-    return result
+    if viewer_id is not None and rows:
+        liked_review_ids = {
+            review_id
+            for (review_id,) in await ReviewLike.filter(
+                user_id=viewer_id, review_id__in=[row["id"] for row in rows], is_liked=True
+            ).values_list("review_id")
+        }
+        for row in rows:
+            buffered = review_like_buffer.get(viewer_id, row["id"])
+            row["is_liked"] = buffered if buffered is not None else row["id"] in liked_review_ids
+    else:
+        for row in rows:
+            row["is_liked"] = None
+
+    return FastJSONResponse(rows, headers=headers)
+
+
+def _get_review_keyset_condition(order_by: str, cursor: dict[str, Any]) -> Q:
+    """cursor 가 가리키는 마지막 리뷰 이후의 리뷰만 조회하는 조건"""
+    if cursor.get("order_by") != order_by or not isinstance(cursor.get("id"), int):
+        raise InvalidCursor()
+
+    if order_by == "-id":
+        return Q(id__lt=cursor["id"])
+
+    if not isinstance(cursor.get("like_count"), int):
+        raise InvalidCursor()
+    return Q(like_count__lt=cursor["like_count"]) | Q(like_count=cursor["like_count"], id__lt=cursor["id"])
+
+
+@movie_router.get("/{movie_id}/reviews/top", response_model=list[ReviewResponse])
+async def get_movie_top_reviews(
+    movie_id: int = Path(gt=0), limit: int = Query(config.TOP_REVIEWS_PER_MOVIE, gt=0, le=config.TOP_REVIEWS_PER_MOVIE)
+) -> Response:
+    """좋아요가 가장 많은 리뷰 limit 개 (같으면 최신순). 메모리의 영화별 상위 리뷰 인덱스에서 바로 읽는다"""
+    await top_review_index.ensure_built()
+    return FastJSONResponse(top_review_index.top(movie_id, limit))
+
+
+@user_router.get("/me/reviews", dependencies=[Depends(login_required)], response_model=list[ReviewResponse])
+async def get_my_reviews(request: Request) -> Response:
+    reviews = await Review.filter(user_id=request.state.user.id).values(*ReviewResponse.model_fields)
+    return FastJSONResponse(reviews)
@@ -1,7 +1,9 @@
+from collections import Counter
 from typing import Annotated
 
 from fastapi import (
     APIRouter,
+    Cookie,
     Depends,
     HTTPException,
     Query,
@@ -9,7 +11,10 @@ from fastapi import (
     Response,
     UploadFile,
 )
+from tortoise.transactions import in_transaction
 
+from src.dependencies.auth import login_required
+from src.models.reviews import Review
 from src.models.users import User
 from src.schemas.users import (
     UserCreateRequest,
@@ -19,7 +24,16 @@ from src.schemas.users import (
     UserUpdateRequest,
 )
 from src.services.auth import AuthService
+from src.services.engagement_counters import (
+    adjust_movie_review_count,
+    adjust_review_like_counts,
+)
+from src.services.entity_versions import entity_versions, movie_reviews_key, review_key
 from src.services.file import FileUploadService
+from src.services.movie_cache import invalidate_movie
+from src.services.review_likes import propagate_like_counts
+from src.services.top_reviews import top_review_index
+from src.utils.response import FastJSONResponse
 
 user_router = APIRouter(prefix="/users", tags=["users"])
 
@@ -27,17 +41,17 @@ user_router = APIRouter(prefix="/users", tags=["users"])
 @user_router.post("")
 async def create_user(data: UserCreateRequest, auth_service: AuthService = Depends()) -> int:
     request_data = data.model_dump()
-    request_data["hashed_password"] = auth_service.hash_password(request_data.pop("password"))
+    request_data["hashed_password"] = await auth_service.hash_password_in_pool(request_data.pop("password"))
     user = await User.create(**request_data)
     return user.id
 
 
-@user_router.get("")
-async def get_all_users() -> list[UserResponse]:
-    result = await User.filter().all()
+@user_router.get("", response_model=list[UserResponse])
+async def get_all_users() -> Response:
+    result = await User.filter().all().values(*UserResponse.model_fields)
     if not result:
         raise HTTPException(status_code=404)
-    return [UserResponse(id=user.id, username=user.username, age=user.age, gender=user.gender) for user in result]
+    return FastJSONResponse(result)
 
 
 @user_router.post("/login", status_code=204)
@@ -45,43 +59,80 @@ async def login(data: UserLoginRequest, auth_service: AuthService = Depends()) -
     return await auth_service.login(data.username, data.password)
 
 
-@user_router.get("/search")
-async def search_users(query_params: Annotated[UserSearchParams, Query()]) -> list[UserResponse]:
+@user_router.post("/logout", status_code=204)
+async def logout(
+    access_token: str | None = Cookie(None),
+    refresh_token: str | None = Cookie(None),
+    auth_service: AuthService = Depends(),
+) -> Response:
+    return await auth_service.logout(access_token, refresh_token)
+
+
+@user_router.post("/token/refresh", status_code=204)
+async def refresh_access_token(
+    refresh_token: str | None = Cookie(None), auth_service: AuthService = Depends()
+) -> Response:
+    return await auth_service.refresh_access_token(refresh_token)
+
+
+@user_router.get("/search", response_model=list[UserResponse])
+async def search_users(query_params: Annotated[UserSearchParams, Query()]) -> Response:
     valid_query = {key: value for key, value in query_params.model_dump().items() if value is not None}
-    filtered_users = await User.filter(**valid_query).all()
+    filtered_users = await User.filter(**valid_query).values(*UserResponse.model_fields)
     if not filtered_users:
         raise HTTPException(status_code=404)
-    return [
-        UserResponse(id=user.id, username=user.username, age=user.age, gender=user.gender) for user in filtered_users
-    ]
+    return FastJSONResponse(filtered_users)
 
 
-@user_router.get("/me")
+@user_router.get("/me", dependencies=[Depends(login_required)])
 async def get_user(request: Request) -> UserResponse:
     user = request.state.user
     return UserResponse(id=user.id, username=user.username, age=user.age, gender=user.gender)
 
 
-@user_router.patch("/me")
+@user_router.patch("/me", dependencies=[Depends(login_required)])
 async def update_user(data: UserUpdateRequest, request: Request, auth_service: AuthService = Depends()) -> UserResponse:
     user = request.state.user
     update_data = {key: value for key, value in data.model_dump().items() if value is not None}
     if "password" in update_data.keys():
-        update_data["hashed_password"] = auth_service.hash_password(update_data.pop("password"))
+        update_data["hashed_password"] = await auth_service.hash_password_in_pool(update_data.pop("password"))
     await user.update_from_dict(update_data)
     await user.save()
+    auth_service.invalidate_user(user.id)
     return UserResponse(id=user.id, username=user.username, age=user.age, gender=user.gender)
 
 
-@user_router.delete("/me")
+@user_router.delete("/me", dependencies=[Depends(login_required)])
 async def delete_user(request: Request) -> dict[str, str]:
     user = request.state.user
-    await user.delete()
+    # 유저가 지워지면 리뷰와 좋아요도 함께 지워지므로 (on_delete=CASCADE) 영화 review_count 와 남는 리뷰의 like_count 를 줄이고
+    # 해당 리뷰들의 ETag 버전을 올린다
+    async with in_transaction():
+        # 유저 행을 먼저 잠가 읽는 동안 이 유저의 리뷰/좋아요가 새로 생기지 않게 한다 (외래 키 검사가 유저 행을 기다린다)
+        await User.filter(id=user.id).select_for_update().values_list("id")
+        reviews = await Review.filter(user_id=user.id).select_for_update().values_list("id", "movie_id")
+        liked_reviews = (
+            await Review.filter(likes__user_id=user.id, likes__is_liked=True)
+            .exclude(user_id=user.id)
+            .select_for_update()
+            .values_list("id", "movie_id")
+        )
+        await user.delete()
+        for movie_id, review_count in Counter(movie_id for _, movie_id in reviews).items():
+            await adjust_movie_review_count(movie_id, -review_count)
+        await adjust_review_like_counts([review_id for review_id, _ in liked_reviews], -1)
+    AuthService.invalidate_user(user.id)
+    for review_id, movie_id in reviews:
+        entity_versions.bump(review_key(review_id), movie_reviews_key(movie_id))
+        await top_review_index.remove_review(movie_id, review_id)
+    await propagate_like_counts(review_id for review_id, _ in liked_reviews)
+    for movie_id in {movie_id for _, movie_id in reviews}:
+        invalidate_movie(movie_id)
 
     return {"detail": "Successfully Deleted."}
 
 
-@user_router.post("/me/profile_image")
+@user_router.post("/me/profile_image", dependencies=[Depends(login_required)])
 async def register_profile_image(
     request: Request, image: UploadFile, file_service: FileUploadService = Depends()
 ) -> UserResponse:
@@ -0,0 +1,40 @@
+from pydantic import BaseModel
+
+
+class CacheStatsResponse(BaseModel):
+    size: int
+    maxsize: int
+    ttl: float | None = None
+    hits: int
+    misses: int
+    hit_ratio: float
+    memory_bytes: int | None = None
+
+
+class TokenRevocationStatsResponse(BaseModel):
+    revoked_tokens: int
+    bloom_filter_bits: int
+    bloom_filter_hashes: int
+    bloom_filter_memory_bytes: int
+    exact_set_memory_bytes: int
+    estimated_false_positive_rate: float
+    bloom_positives: int
+    false_positives: int
+
+
+class ReviewLikeBufferStatsResponse(BaseModel):
+    pending: int
+    max_size: int
+    flush_interval_seconds: float
+    flushes: int
+    flushed_rows: int
+    coalesced: int
+
+
+class CompressionStatsResponse(BaseModel):
+    responses: int
+    cache_hits: int
+    original_bytes: int
+    compressed_bytes: int
+    compression_ratio: float
+    cpu_seconds: float
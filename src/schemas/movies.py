@@ -1,7 +1,7 @@
 from datetime import date
-from typing import Annotated
+from typing import Annotated, Any, Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Discriminator, Field, Tag
 
 
 class CreateMovieRequest(BaseModel):
@@ -23,11 +23,20 @@ class MovieResponse(BaseModel):
     runtime: int
     release_date: date
     poster_image_url: str | None = None
+    review_count: int = 0
 
 
 class MovieSearchParams(BaseModel):
     title: str | None = None
     genre_ids: list[int] | None = None
+    # any: 장르 중 하나라도 포함, all: 모든 장르를 포함
+    genre_match: Literal["any", "all"] = "any"
+    # keyset pagination: 다음 페이지는 응답의 X-Next-Cursor 헤더 값을 cursor 로 넘겨 조회한다
+    order_by: Literal["id", "-release_date"] = "id"
+    limit: Annotated[int, Field(gt=0, le=100)] = 20
+    cursor: str | None = None
+    # sparse fieldset: 응답에 포함할 필드 (예: fields=title,poster_image_url,genres). id 는 항상 포함된다
+    fields: str | None = None
 
 
 class MovieUpdateRequest(BaseModel):
@@ -37,3 +46,39 @@ class MovieUpdateRequest(BaseModel):
     genre_ids: list[int] | None = None
     runtime: Annotated[int, Field(gt=0)] | None = None
     release_date: date | None = None
+
+
+class BulkMovieCreateItem(CreateMovieRequest):
+    # external_id 가 있으면 external_id 기준으로 upsert 한다
+    external_id: int | None = None
+
+
+class BulkMovieUpdateItem(MovieUpdateRequest):
+    id: int
+
+
+def _get_bulk_movie_item_type(value: Any) -> str:
+    has_id = "id" in value if isinstance(value, dict) else getattr(value, "id", None) is not None
+    return "update" if has_id else "create"
+
+
+# id 가 있으면 수정, 없으면 생성
+BulkMovieItem = Annotated[
+    Annotated[BulkMovieCreateItem, Tag("create")] | Annotated[BulkMovieUpdateItem, Tag("update")],
+    Discriminator(_get_bulk_movie_item_type),
+]
+
+
+class BulkMovieItemResult(BaseModel):
+    index: int
+    id: int | None = None
+    status: Literal["created", "updated", "not_found"]
+
+
+class BulkMovieResponse(BaseModel):
+    results: list[BulkMovieItemResult]
+    created: int
+    updated: int
+    not_found: int
+    elapsed_seconds: float
+    rows_per_second: float
@@ -1,4 +1,6 @@
-from pydantic import BaseModel
+from typing import Annotated, Literal
+
+from pydantic import BaseModel, Field
 
 
 class ReviewResponse(BaseModel):
@@ -8,3 +10,17 @@ class ReviewResponse(BaseModel):
     title: str
     content: str
     review_image_url: str | None = None
+    like_count: int = 0
+
+
+class MovieReviewSearchParams(BaseModel):
+    # -id: 최신순 (id 는 작성 순서), -like_count: 좋아요 많은 순
+    order_by: Literal["-id", "-like_count"] = "-id"
+    limit: Annotated[int, Field(gt=0, le=100)] = 20
+    # keyset pagination: 다음 페이지는 응답의 X-Next-Cursor 헤더 값을 cursor 로 넘겨 조회한다
+    cursor: str | None = None
+
+
+class MovieReviewResponse(ReviewResponse):
+    # 로그인한 유저의 좋아요 여부 (비로그인이면 None)
+    is_liked: bool | None = None
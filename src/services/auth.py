@@ -1,11 +1,28 @@
+import copy
+from typing import Any
+
 from fastapi import HTTPException, Request, Response
 from passlib.context import CryptContext
 
+from src.configs import config
 from src.models.users import User
-from src.services.jwt import JWTService
+from src.services.jwt import ACCESS_TOKEN_TYPE, REFRESH_TOKEN_TYPE, JWTService
+from src.services.token_revocation import token_revocation_store
+from src.utils.cache import LRUCache
+from src.utils.worker_pool import BoundedWorkerPool, WorkerPoolSaturated
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt 는 호출당 수백 ms 동안 CPU 를 점유하므로 이벤트 루프가 아닌 전용 스레드 풀에서 실행한다
+password_hash_pool = BoundedWorkerPool(
+    "password_hash", max_workers=config.PASSWORD_HASH_MAX_WORKERS, max_pending=config.PASSWORD_HASH_MAX_PENDING
+)
+
+# 인증 요청마다 조회하는 유저 레코드 캐시 (user_id -> User)
+user_cache: LRUCache[int, User] = LRUCache(
+    "users", maxsize=config.USER_CACHE_MAXSIZE, ttl=config.USER_CACHE_TTL_SECONDS
+)
+
 
 class AuthService:
     def __init__(self) -> None:
@@ -26,20 +43,102 @@ class AuthService:
         self.jwt_service.attach_jwt_token_in_response_cookie(access_token, refresh_token, response)
         return response
 
+    async def refresh_access_token(self, refresh_token: str | None) -> Response:
+        """refresh token 으로 access token 을 재발급 (비밀번호 검증 없이 서명 검증만 수행)"""
+        if not refresh_token:
+            raise HTTPException(status_code=401, detail="This Request requires a refresh token.")
+
+        decoded = self.jwt_service._decode(refresh_token)
+        if decoded.get("token_type") != REFRESH_TOKEN_TYPE:
+            raise HTTPException(status_code=401, detail="Invalid Refresh Token.")
+        if token_revocation_store.is_revoked(decoded.get("jti")):
+            raise HTTPException(status_code=401, detail="Revoked Refresh Token.")
+
+        user = await self.get_user(decoded["user_id"])
+        if not user:
+            raise HTTPException(status_code=401, detail="Invalid Refresh Token.")
+
+        response = Response(status_code=204)
+        access_token = self.jwt_service.create_access_token(data={"user_id": user.id})
+        self.jwt_service.attach_access_token_in_response_cookie(access_token, response)
+
+        if config.JWT_REFRESH_TOKEN_ROTATION:
+            new_refresh_token = self.jwt_service.create_refresh_token(data={"user_id": user.id})
+            self.jwt_service.attach_refresh_token_in_response_cookie(new_refresh_token, response)
+            # 교체된 refresh token 은 다시 사용할 수 없도록 폐기한다
+            await self._revoke(decoded)
+
+        return response
+
+    async def logout(self, access_token: str | None, refresh_token: str | None) -> Response:
+        for token in (access_token, refresh_token):
+            if not token:
+                continue
+            try:
+                await self._revoke(self.jwt_service._decode(token))
+            except HTTPException:
+                # 이미 만료되었거나 위조된 토큰은 폐기할 필요가 없다
+                continue
+
+        response = Response(status_code=204)
+        response.delete_cookie("access_token")
+        response.delete_cookie("refresh_token")
+        return response
+
+    @staticmethod
+    async def _revoke(decoded: dict[str, Any]) -> None:
+        if "jti" in decoded:
+            await token_revocation_store.revoke(decoded["jti"], decoded["exp"])
+
     async def get_current_user(self, request: Request) -> Request:
-        access_token = request.cookies.get("access_token")
+        request.state.user = await self.get_user_by_access_token(request.cookies.get("access_token"))
+
+        return request
+
+    def _decode_access_token(self, access_token: str | None) -> dict[str, Any]:
         if not access_token:
             raise HTTPException(status_code=401, detail="This Request requires an access token.")
 
-        decoded = self.jwt_service._decode(access_token)
+        decoded: dict[str, Any] = self.jwt_service._decode(access_token)
+        # token_type 이 없는 토큰은 이전 버전에서 발급된 access token 으로 간주한다
+        if decoded.get("token_type", ACCESS_TOKEN_TYPE) != ACCESS_TOKEN_TYPE:
+            raise HTTPException(status_code=401, detail="Invalid Access Token.")
+        if token_revocation_store.is_revoked(decoded.get("jti")):
+            raise HTTPException(status_code=401, detail="Revoked Access Token.")
+        return decoded
+
+    async def get_user_by_access_token(self, access_token: str | None) -> User:
+        decoded = self._decode_access_token(access_token)
 
-        user = await User.get_or_none(id=decoded["user_id"])
+        user = await self.get_user(decoded["user_id"])
         if not user:
             raise HTTPException(status_code=401, detail="Invalid Access Token.")
 
-        request.state.user = user
+        return user
+
+    def get_user_id_by_access_token(self, access_token: str | None) -> int | None:
+        """로그인이 선택인 라우트용. 유효한 access token 이면 user_id, 아니면 None (DB 를 조회하지 않는다)"""
+        try:
+            user_id: int = self._decode_access_token(access_token)["user_id"]
+        except HTTPException:
+            return None
+        return user_id
 
-        return request
+    @staticmethod
+    async def get_user(user_id: int) -> User | None:
+        cached = user_cache.get(user_id)
+        if cached is not None:
+            # 요청 핸들러가 유저 객체를 수정하더라도 캐시된 객체에는 영향이 없도록 복사본을 넘긴다
+            return copy.copy(cached)
+
+        user = await User.get_or_none(id=user_id)
+        if user is not None:
+            user_cache.set(user_id, copy.copy(user))
+        return user
+
+    @staticmethod
+    def invalidate_user(user_id: int) -> None:
+        user_cache.invalidate(user_id)
 
     @staticmethod
     def hash_password(password: str) -> str:
@@ -49,10 +148,22 @@ class AuthService:
     def verify_password(plain_password: str, hashed_password: str) -> bool:
         return pwd_context.verify(plain_password, hashed_password)
 
+    async def hash_password_in_pool(self, password: str) -> str:
+        try:
+            return await password_hash_pool.run(self.hash_password, password)
+        except WorkerPoolSaturated:
+            raise HTTPException(status_code=503, detail="Server is busy. Please try again later.")
+
+    async def verify_password_in_pool(self, plain_password: str, hashed_password: str) -> bool:
+        try:
+            return await password_hash_pool.run(self.verify_password, plain_password, hashed_password)
+        except WorkerPoolSaturated:
+            raise HTTPException(status_code=503, detail="Server is busy. Please try again later.")
+
     async def authenticate(self, username: str, password: str) -> User:
         user = await User.get_or_none(username=username)
         if user is None:
             raise HTTPException(status_code=401, detail=f"username: {username} - not found.")
-        if not self.verify_password(password, user.hashed_password):
+        if not await self.verify_password_in_pool(password, user.hashed_password):
             raise HTTPException(status_code=401, detail="password incorrect.")
         return user
@@ -0,0 +1,77 @@
+import asyncio
+import logging
+
+from tortoise.expressions import F
+
+from src.configs import config
+from src.models.likes import ReviewLike
+from src.models.movies import Movie
+from src.models.reviews import Review
+from src.services.top_reviews import top_review_index
+
+logger = logging.getLogger(__name__)
+
+
+async def adjust_review_like_count(review_id: int, delta: int) -> None:
+    """reviews.like_count 를 읽지 않고 UPDATE ... SET like_count = like_count + delta 한 번으로 바꾼다"""
+    await adjust_review_like_counts([review_id], delta)
+
+
+async def adjust_review_like_counts(review_ids: list[int], delta: int) -> None:
+    if review_ids:
+        await Review.filter(id__in=review_ids).update(like_count=F("like_count") + delta)
+
+
+async def adjust_movie_review_count(movie_id: int, delta: int) -> None:
+    await Movie.filter(id=movie_id).update(review_count=F("review_count") + delta)
+
+
+async def reconcile_engagement_counters() -> dict[str, int]:
+    """실제 행 수와 달라진 like_count / review_count 를 다시 계산하여 고치고, 고친 행 수를 반환한다.
+
+    DB 를 직접 수정하는 등 카운터 갱신 경로를 거치지 않은 쓰기로 생긴 어긋남을 바로잡는 용도다.
+    """
+    reviews, likes, movies = Review._meta.db_table, ReviewLike._meta.db_table, Movie._meta.db_table
+    db = Review._meta.db
+
+    like_count = f"(SELECT COUNT(*) FROM `{likes}` l WHERE l.`review_id` = `{reviews}`.`id` AND l.`is_liked` = 1)"
+    repaired_reviews, _ = await db.execute_query(
+        f"UPDATE `{reviews}` SET `like_count` = {like_count} WHERE `like_count` <> {like_count}"
+    )
+    review_count = f"(SELECT COUNT(*) FROM `{reviews}` r WHERE r.`movie_id` = `{movies}`.`id`)"
+    repaired_movies, _ = await db.execute_query(
+        f"UPDATE `{movies}` SET `review_count` = {review_count} WHERE `review_count` <> {review_count}"
+    )
+    return {"reviews": repaired_reviews, "movies": repaired_movies}
+
+
+class EngagementCounterReconciler:
+    """interval_seconds 마다 reconcile_engagement_counters 를 실행하는 백그라운드 작업"""
+
+    def __init__(self, interval_seconds: int) -> None:
+        self.interval_seconds = interval_seconds
+        self.last_repaired: dict[str, int] = {}
+        self._task: asyncio.Task[None] | None = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                self.last_repaired = await reconcile_engagement_counters()
+                # 고친 like_count 를 한 건씩 알 수 없으므로 상위 리뷰 인덱스는 다시 만든다
+                if self.last_repaired["reviews"] and top_review_index.built_at is not None:
+                    await top_review_index.build()
+            except Exception:
+                logger.exception("Failed to reconcile engagement counters")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+engagement_counter_reconciler = EngagementCounterReconciler(config.ENGAGEMENT_COUNTER_RECONCILE_INTERVAL_SECONDS)
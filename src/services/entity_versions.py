@@ -0,0 +1,24 @@
+from src.configs import config
+from src.utils.etag import EntityVersions
+
+# GET /movies, /movies/{movie_id}, /movies/{movie_id}/reviews, /reviews/{review_id} 의 ETag 용 버전 카운터
+entity_versions = EntityVersions(epoch_seconds=config.ETAG_EPOCH_SECONDS)
+
+MOVIES_KEY = "movies"
+
+
+def movie_key(movie_id: int) -> str:
+    return f"movie:{movie_id}"
+
+
+def movie_reviews_key(movie_id: int) -> str:
+    return f"movie_reviews:{movie_id}"
+
+
+def review_key(review_id: int) -> str:
+    return f"review:{review_id}"
+
+
+def user_likes_key(user_id: int) -> str:
+    """유저의 좋아요 상태. 로그인 유저에게 is_liked 를 담아 주는 응답의 ETag 에 섞는다"""
+    return f"user_likes:{user_id}"
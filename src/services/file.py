@@ -6,6 +6,7 @@ from src.configs import config
 from src.models.movies import Movie
 from src.models.reviews import Review
 from src.models.users import User
+from src.services.auth import AuthService
 from src.utils.file import (
     FileDoesNotExist,
     FileExtensionError,
@@ -43,6 +44,7 @@ class FileUploadService:
         saved_image_url = await self._image_upload(file, upload_dir, user.profile_image_url)
         user.profile_image_url = saved_image_url
         await user.save()
+        AuthService.invalidate_user(user.id)
 
         return user
 
@@ -0,0 +1,41 @@
+import time
+from types import MappingProxyType
+from typing import Iterable, Mapping
+
+from src.configs import config
+from src.models.movies import Genre
+
+
+class GenreCatalog:
+    """장르 id -> 이름 카탈로그.
+
+    장르 테이블은 작고 거의 바뀌지 않으므로 통째로 읽어 불변 매핑으로 들고 있고, 갱신 시에는 매핑 자체를 교체한다.
+    모르는 장르 id 를 만나거나(다른 프로세스에서 추가된 장르) refresh_seconds 가 지나면 다시 읽는다.
+    """
+
+    def __init__(self, refresh_seconds: int) -> None:
+        self.refresh_seconds = refresh_seconds
+        self.loaded_at: float | None = None
+        self._names: Mapping[int, str] = MappingProxyType({})
+
+    async def load(self) -> None:
+        rows = await Genre.all().values_list("id", "name")
+        self._names = MappingProxyType(dict(rows))
+        self.loaded_at = time.monotonic()
+
+    def clear(self) -> None:
+        self.loaded_at = None
+        self._names = MappingProxyType({})
+
+    async def get_names(self, genre_ids: Iterable[int]) -> Mapping[int, str]:
+        """장르 id -> 이름 매핑을 반환한다. 필요하면 먼저 카탈로그를 다시 읽는다"""
+        if (
+            self.loaded_at is None
+            or time.monotonic() - self.loaded_at > self.refresh_seconds
+            or any(genre_id not in self._names for genre_id in genre_ids)
+        ):
+            await self.load()
+        return self._names
+
+
+genre_catalog = GenreCatalog(refresh_seconds=config.GENRE_CATALOG_REFRESH_SECONDS)
@@ -1,3 +1,6 @@
+import hashlib
+import time
+import uuid
 from datetime import datetime, timedelta
 from typing import Any
 from zoneinfo import ZoneInfo
@@ -6,6 +9,13 @@ import jwt
 from fastapi import HTTPException, Response, status
 
 from src.configs import config
+from src.utils.cache import LRUCache
+
+ACCESS_TOKEN_TYPE = "access"
+REFRESH_TOKEN_TYPE = "refresh"
+
+# 서명 검증을 마친 토큰의 claims 캐시 (sha256(token) -> claims). 항목은 토큰의 exp 시각에 만료된다
+decoded_token_cache: LRUCache[bytes, dict[str, Any]] = LRUCache("jwt_claims", maxsize=config.JWT_DECODE_CACHE_MAXSIZE)
 
 
 class JWTService:
@@ -22,23 +32,41 @@ class JWTService:
         return jwt.encode(payload, self._secret_key, algorithm=self.algorithm)
 
     def _decode(self, token: str) -> Any:
+        token_digest = hashlib.sha256(token.encode()).digest()
+        cached = decoded_token_cache.get(token_digest)
+        if cached is not None:
+            # 캐시 항목의 TTL 과 별개로 exp 를 다시 확인하여 만료된 토큰은 항상 거부한다
+            if cached["exp"] <= time.time():
+                decoded_token_cache.invalidate(token_digest)
+                raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Signature has expired")
+            return dict(cached)
+
         try:
-            return jwt.decode(token, self._secret_key, algorithms=self.algorithm)
+            decoded = jwt.decode(token, self._secret_key, algorithms=self.algorithm)
         except Exception as e:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e))
 
-    def _create_token(self, data: dict[str, Any], expires_in: int) -> str:
-        return self._encode(data=data, expires_in=expires_in)
+        if isinstance(decoded.get("exp"), int):
+            decoded_token_cache.set(token_digest, dict(decoded), ttl=decoded["exp"] - time.time())
+        return decoded
+
+    def _create_token(self, data: dict[str, Any], expires_in: int, token_type: str) -> str:
+        return self._encode(data={**data, "token_type": token_type, "jti": uuid.uuid4().hex}, expires_in=expires_in)
 
     def create_access_token(self, data: dict[str, Any]) -> str:
-        return self._create_token(data, self.access_token_expires_in)
+        return self._create_token(data, self.access_token_expires_in, ACCESS_TOKEN_TYPE)
 
     def create_refresh_token(self, data: dict[str, Any]) -> str:
-        return self._create_token(data, self.refresh_token_expires_in)
+        return self._create_token(data, self.refresh_token_expires_in, REFRESH_TOKEN_TYPE)
 
     def attach_jwt_token_in_response_cookie(
         self, access_token: str, refresh_token: str, response: Response
     ) -> Response:
+        self.attach_access_token_in_response_cookie(access_token, response)
+        self.attach_refresh_token_in_response_cookie(refresh_token, response)
+        return response
+
+    def attach_access_token_in_response_cookie(self, access_token: str, response: Response) -> Response:
         response.set_cookie(
             key="access_token",
             value=access_token,
@@ -47,6 +75,9 @@ class JWTService:
             secure=False,
             samesite="lax",
         )
+        return response
+
+    def attach_refresh_token_in_response_cookie(self, refresh_token: str, response: Response) -> Response:
         response.set_cookie(
             key="refresh_token",
             value=refresh_token,
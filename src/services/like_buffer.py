@@ -0,0 +1,100 @@
+import asyncio
+import logging
+from typing import Any
+
+from src.configs import config
+from src.services.review_likes import apply_review_likes
+
+logger = logging.getLogger(__name__)
+
+
+class ReviewLikeBuffer:
+    """좋아요/취소를 메모리에 먼저 반영하고 (user, review) 별 최종 상태만 모아 주기적으로 DB 에 쓰는 write-behind 버퍼.
+
+    같은 (user, review) 를 여러 번 토글해도 마지막 상태 하나만 남으므로 인기 리뷰에 몰리는 토글이 한 번의 multi-row upsert 로 합쳐진다.
+    is_liked 조회는 버퍼를 먼저 보므로 flush 전에도 방금 누른 상태가 보이고, like_count 는 flush 후에 반영된다.
+    """
+
+    def __init__(self, flush_interval_seconds: float, max_size: int) -> None:
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_size = max_size
+        self.flushes = 0
+        self.flushed_rows = 0
+        self.coalesced = 0
+        self._pending: dict[tuple[int, int], bool] = {}
+        # flush 중인 항목 (DB 에 쓰는 동안에도 조회에 보이도록 유지)
+        self._flushing: dict[tuple[int, int], bool] = {}
+        self._flush_lock = asyncio.Lock()
+        self._task: asyncio.Task[None] | None = None
+
+    async def set(self, user_id: int, review_id: int, is_liked: bool) -> None:
+        key = (user_id, review_id)
+        if key in self._pending:
+            self.coalesced += 1
+        self._pending[key] = is_liked
+        if len(self._pending) >= self.max_size:
+            await self.flush()
+
+    def get(self, user_id: int, review_id: int) -> bool | None:
+        """버퍼에 있는 상태 (없으면 None 이므로 DB 를 조회한다)"""
+        key = (user_id, review_id)
+        if key in self._pending:
+            return self._pending[key]
+        return self._flushing.get(key)
+
+    async def flush(self) -> int:
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+
+            self._flushing, self._pending = self._pending, {}
+            try:
+                written = await apply_review_likes(self._flushing)
+            except Exception:
+                # 실패하면 flush 하려던 항목을 되돌린다 (그 사이 들어온 더 최신 상태가 우선)
+                self._pending = {**self._flushing, **self._pending}
+                raise
+            finally:
+                self._flushing = {}
+
+            self.flushes += 1
+            self.flushed_rows += written
+            return written
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval_seconds)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Failed to flush review like buffer")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """주기 작업을 멈추고 남은 항목을 모두 DB 에 쓴다"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+    def clear(self) -> None:
+        self._pending.clear()
+        self.flushes = 0
+        self.flushed_rows = 0
+        self.coalesced = 0
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "pending": len(self._pending),
+            "max_size": self.max_size,
+            "flush_interval_seconds": self.flush_interval_seconds,
+            "flushes": self.flushes,
+            "flushed_rows": self.flushed_rows,
+            "coalesced": self.coalesced,
+        }
+
+
+review_like_buffer = ReviewLikeBuffer(config.REVIEW_LIKE_FLUSH_INTERVAL_SECONDS, config.REVIEW_LIKE_BUFFER_MAX_SIZE)
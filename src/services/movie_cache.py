@@ -0,0 +1,15 @@
+from src.configs import config
+from src.services.entity_versions import MOVIES_KEY, entity_versions, movie_key
+from src.utils.cache import LRUCache
+
+# GET /movies/{movie_id} 의 인코딩된 JSON 응답 본문 캐시 ((movie_id, ETag) -> bytes)
+# DB 를 읽는 동안 영화가 바뀌어도 읽기 전에 만든 ETag 아래에 저장되므로, 버전이 올라간 뒤의 요청은 옛 본문을 받지 않는다
+# 크롤러처럼 다른 프로세스에서 바뀐 영화는 버전을 올릴 수 없으므로 TTL 로 오래된 응답을 정리한다
+movie_detail_cache: LRUCache[tuple[int, str], bytes] = LRUCache(
+    "movie_detail", maxsize=config.MOVIE_DETAIL_CACHE_MAXSIZE, ttl=config.MOVIE_DETAIL_CACHE_TTL_SECONDS, sizeof=len
+)
+
+
+def invalidate_movie(movie_id: int) -> None:
+    """영화가 바뀌면 영화 상세/목록의 ETag 버전을 올린다 (이전 버전의 상세 응답 캐시는 더 이상 조회되지 않는다)"""
+    entity_versions.bump(MOVIES_KEY, movie_key(movie_id))
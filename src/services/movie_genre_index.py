@@ -0,0 +1,170 @@
+import asyncio
+import logging
+import time
+from itertools import islice
+from typing import Callable, Iterable, Iterator
+
+from src.configs import config
+from src.services.movie_genres import get_genre_ids_by_movie
+
+logger = logging.getLogger(__name__)
+
+# 0~255 각 바이트 값에서 켜져 있는 비트 위치
+_BYTE_BIT_POSITIONS = [tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256)]
+
+
+def _bit_positions(bitset: int, start: int = 0) -> Iterator[int]:
+    """bitset 에서 start 이상인 켜진 비트 위치를 오름차순으로 반환"""
+    data = bitset.to_bytes((bitset.bit_length() + 7) // 8, "little")
+    for byte_index in range(start // 8, len(data)):
+        byte = data[byte_index]
+        if not byte:
+            continue
+        for bit in _BYTE_BIT_POSITIONS[byte]:
+            position = byte_index * 8 + bit
+            if position >= start:
+                yield position
+
+
+def _to_bitset(movie_ids: list[int]) -> int:
+    """movie_ids 의 비트를 켠 비트셋. 큰 정수에 한 비트씩 OR 하면 매번 전체를 복사하므로 bytearray 에 모아 한 번에 만든다"""
+    if not movie_ids:
+        return 0
+    data = bytearray(max(movie_ids) // 8 + 1)
+    for movie_id in movie_ids:
+        data[movie_id >> 3] |= 1 << (movie_id & 7)
+    return int.from_bytes(data, "little")
+
+
+class MovieGenreIndex:
+    """영화별 장르 비트마스크(movie_id -> mask)와 장르별 영화 비트셋(genre_id -> 영화 id 비트셋)을 메모리에 유지하는 인덱스.
+
+    장르 필터는 장르별 비트셋의 OR(any)/AND(all) 연산으로 계산되어 movies_genres 조인 없이 후보 영화 id 를 구한다.
+    다른 프로세스(크롤러 등)의 변경은 refresh_seconds 마다 백그라운드에서 DB 로 다시 만들어 반영하며,
+    다시 만드는 동안의 요청은 기존 인덱스를 그대로 쓰고 그 사이에 들어온 변경은 새 인덱스에 다시 적용한다.
+    """
+
+    def __init__(self, refresh_seconds: int) -> None:
+        self.refresh_seconds = refresh_seconds
+        self.built_at: float | None = None
+        self._genre_bits: dict[int, int] = {}
+        self._movie_masks: dict[int, int] = {}
+        self._genre_movies: dict[int, int] = {}
+        self._build_lock = asyncio.Lock()
+        self._refresh_task: asyncio.Task[None] | None = None
+        # 다시 만드는 중에 들어온 변경 (movie_id -> 장르 id, 삭제면 None)
+        self._changes_during_build: dict[int, list[int] | None] | None = None
+
+    async def ensure_built(self) -> None:
+        """처음 한 번만 요청이 만들기를 기다리고, 오래된 인덱스는 백그라운드에서 한 번만 다시 만든다"""
+        if self.built_at is None:
+            async with self._build_lock:
+                if self.built_at is None:
+                    await self._build()
+        elif time.monotonic() - self.built_at > self.refresh_seconds and self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._refresh())
+
+    async def _refresh(self) -> None:
+        try:
+            await self.build()
+        except Exception:
+            logger.exception("Failed to refresh movie genre index")
+        finally:
+            self._refresh_task = None
+
+    async def build(self) -> None:
+        async with self._build_lock:
+            await self._build()
+
+    async def _build(self) -> None:
+        self._changes_during_build = {}
+        try:
+            movie_genres = await get_genre_ids_by_movie()
+        except BaseException:
+            self._changes_during_build = None
+            raise
+
+        genre_bits: dict[int, int] = {}
+        movie_masks: dict[int, int] = {}
+        genre_movie_ids: dict[int, list[int]] = {}
+        for movie_id, genre_ids in movie_genres.items():
+            mask = 0
+            for genre_id in set(genre_ids):
+                mask |= 1 << genre_bits.setdefault(genre_id, len(genre_bits))
+                genre_movie_ids.setdefault(genre_id, []).append(movie_id)
+            if mask:
+                movie_masks[movie_id] = mask
+
+        changes, self._changes_during_build = self._changes_during_build, None
+        self._genre_bits = genre_bits
+        self._movie_masks = movie_masks
+        self._genre_movies = {genre_id: _to_bitset(movie_ids) for genre_id, movie_ids in genre_movie_ids.items()}
+        for movie_id, changed_genre_ids in changes.items():
+            if changed_genre_ids is None:
+                self.remove_movie(movie_id)
+            else:
+                self.set_movie_genres(movie_id, changed_genre_ids)
+        self.built_at = time.monotonic()
+
+    def clear(self) -> None:
+        self.built_at = None
+        self._genre_bits.clear()
+        self._movie_masks.clear()
+        self._genre_movies.clear()
+
+    def _mask(self, genre_ids: Iterable[int]) -> int:
+        mask = 0
+        for genre_id in genre_ids:
+            bit = self._genre_bits.setdefault(genre_id, len(self._genre_bits))
+            mask |= 1 << bit
+        return mask
+
+    def set_movie_genres(self, movie_id: int, genre_ids: Iterable[int]) -> None:
+        genre_ids = set(genre_ids)
+        if self._changes_during_build is not None:
+            self._changes_during_build[movie_id] = list(genre_ids)
+        self._remove_movie(movie_id)
+        if not genre_ids:
+            return
+        self._movie_masks[movie_id] = self._mask(genre_ids)
+        for genre_id in genre_ids:
+            self._genre_movies[genre_id] = self._genre_movies.get(genre_id, 0) | 1 << movie_id
+
+    def remove_movie(self, movie_id: int) -> None:
+        if self._changes_during_build is not None:
+            self._changes_during_build[movie_id] = None
+        self._remove_movie(movie_id)
+
+    def _remove_movie(self, movie_id: int) -> None:
+        mask = self._movie_masks.pop(movie_id, 0)
+        if not mask:
+            return
+        for genre_id, bit in self._genre_bits.items():
+            if mask >> bit & 1:
+                self._genre_movies[genre_id] &= ~(1 << movie_id)
+
+    def match(self, genre_ids: Iterable[int], match_all: bool = False) -> int:
+        """조건에 맞는 영화 id 비트셋. match_all 이면 모든 장르를, 아니면 하나 이상의 장르를 가진 영화"""
+        bitsets = [self._genre_movies.get(genre_id, 0) for genre_id in set(genre_ids)]
+        if not bitsets:
+            return 0
+
+        result = bitsets[0]
+        for bitset in bitsets[1:]:
+            result = result & bitset if match_all else result | bitset
+        return result
+
+    @staticmethod
+    def movie_ids(bitset: int, after_id: int | None = None, limit: int | None = None) -> list[int]:
+        """비트셋에 포함된 영화 id 를 오름차순으로 반환 (after_id 보다 큰 id 부터 limit 개)"""
+        start = after_id + 1 if after_id is not None else 0
+        return list(islice(_bit_positions(bitset, start), limit))
+
+    @staticmethod
+    def contains(bitset: int) -> Callable[[int], bool]:
+        """비트셋의 포함 여부를 O(1) 로 확인하는 함수 (큰 정수의 비트 연산은 매번 전체 길이만큼 걸린다)"""
+        data = bitset.to_bytes((bitset.bit_length() + 7) // 8, "little")
+        return lambda movie_id: movie_id >> 3 < len(data) and bool(data[movie_id >> 3] >> (movie_id & 7) & 1)
+
+
+movie_genre_index = MovieGenreIndex(refresh_seconds=config.MOVIE_GENRE_INDEX_REFRESH_SECONDS)
@@ -0,0 +1,14 @@
+from typing import Iterable, Mapping
+
+from src.models.movies import Movie
+from src.utils.m2m import get_related_ids, sync_related_ids
+
+
+async def get_genre_ids_by_movie(movie_ids: Iterable[int] | None = None) -> dict[int, list[int]]:
+    """movies_genres 연결 테이블만 조회하여 영화 id -> 장르 id 목록(오름차순)을 반환 (movie_ids 가 None 이면 전체)"""
+    return await get_related_ids(Movie, "genres", movie_ids)
+
+
+async def sync_movie_genres(genre_ids_by_movie: Mapping[int, Iterable[int]]) -> tuple[int, int]:
+    """여러 영화의 장르 연결을 목표 상태로 맞춘다 (바뀐 연결만 DELETE/INSERT)"""
+    return await sync_related_ids(Movie, "genres", genre_ids_by_movie)
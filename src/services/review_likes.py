@@ -0,0 +1,168 @@
+import logging
+from collections import defaultdict
+from functools import reduce
+from operator import or_
+from typing import Any, Iterable, Mapping, NamedTuple
+
+from tortoise import timezone
+from tortoise.expressions import Q
+from tortoise.transactions import in_transaction
+
+from src.models.likes import ReviewLike
+from src.models.reviews import Review
+from src.models.users import User
+from src.services.engagement_counters import adjust_review_like_counts
+from src.services.entity_versions import entity_versions, movie_reviews_key, review_key
+from src.services.top_reviews import TOP_REVIEW_COLUMNS, top_review_index
+
+logger = logging.getLogger(__name__)
+
+
+class ReviewLikeState(NamedTuple):
+    # 좋아요 행이 없으면 (한 번도 좋아요하지 않은 리뷰를 unlike) None
+    id: int | None
+    is_liked: bool
+    # reviews.like_count 에 반영할 변화량 (+1 / -1 / 0)
+    like_count_delta: int
+
+
+async def _execute_mysql(query: str, values: list[Any]) -> tuple[int, int]:
+    """(affected rows, lastrowid). CLIENT_FOUND_ROWS 를 쓰지 않으므로 affected rows 는 실제로 값이 바뀐 행 수다"""
+    async with ReviewLike._meta.db.acquire_connection() as connection:
+        async with connection.cursor() as cursor:
+            await cursor.execute(query, values)
+            return cursor.rowcount, cursor.lastrowid
+
+
+async def upsert_review_like(user_id: int, review_id: int) -> ReviewLikeState:
+    """한 번의 INSERT ... ON DUPLICATE KEY UPDATE 로 좋아요 상태를 만들고 최종 상태를 반환한다.
+
+    get_or_create 후 save 하는 방식과 달리 왕복이 한 번이고, unique 제약에서 동시 요청이 경합해도 한 요청만 상태를 바꾼 것으로 집계된다.
+    """
+    db = ReviewLike._meta.db
+    table = ReviewLike._meta.db_table
+    now = timezone.now()
+
+    if db.capabilities.dialect == "mysql":
+        # id = LAST_INSERT_ID(id) 로 기존 행을 갱신한 경우에도 lastrowid 에 그 행의 id 가 담긴다
+        # affected rows 는 1: 새 행, 2: is_liked 가 False -> True, 0: 이미 좋아요
+        rowcount, like_id = await _execute_mysql(
+            f"INSERT INTO `{table}` (`user_id`, `review_id`, `is_liked`, `created_at`) VALUES (%s, %s, 1, %s) "
+            "ON DUPLICATE KEY UPDATE `id` = LAST_INSERT_ID(`id`), `is_liked` = 1",
+            [user_id, review_id, ReviewLike._meta.fields_map["created_at"].to_db_value(now, ReviewLike)],
+        )
+        return ReviewLikeState(id=like_id, is_liked=True, like_count_delta=1 if rowcount else 0)
+
+    # sqlite (벤치마크/로컬 대체 DB): 값이 바뀔 때만 갱신하고, 바뀐 경우에만 RETURNING 으로 행이 돌아온다
+    _, rows = await db.execute_query(
+        f'INSERT INTO "{table}" ("user_id", "review_id", "is_liked", "created_at") VALUES (?, ?, 1, ?) '
+        f'ON CONFLICT ("user_id", "review_id") DO UPDATE SET "is_liked" = 1 WHERE "{table}"."is_liked" = 0 '
+        'RETURNING "id"',
+        [user_id, review_id, now.isoformat(" ")],
+    )
+    if rows:
+        return ReviewLikeState(id=rows[0]["id"], is_liked=True, like_count_delta=1)
+    like = await ReviewLike.get(user_id=user_id, review_id=review_id).only("id")
+    return ReviewLikeState(id=like.id, is_liked=True, like_count_delta=0)
+
+
+async def cancel_review_like(user_id: int, review_id: int) -> ReviewLikeState:
+    """한 번의 UPDATE 로 좋아요를 취소하고 최종 상태를 반환한다 (좋아요 행이 없으면 새로 만들지 않는다)"""
+    db = ReviewLike._meta.db
+    table = ReviewLike._meta.db_table
+
+    if db.capabilities.dialect == "mysql":
+        # affected rows 는 1: True -> False, 0: 이미 취소했거나 행이 없음 (행이 없으면 lastrowid 는 0)
+        rowcount, like_id = await _execute_mysql(
+            f"UPDATE `{table}` SET `id` = LAST_INSERT_ID(`id`), `is_liked` = 0 "
+            "WHERE `user_id` = %s AND `review_id` = %s",
+            [user_id, review_id],
+        )
+        return ReviewLikeState(id=like_id or None, is_liked=False, like_count_delta=-1 if rowcount else 0)
+
+    _, rows = await db.execute_query(
+        f'UPDATE "{table}" SET "is_liked" = 0 WHERE "user_id" = ? AND "review_id" = ? AND "is_liked" = 1 '
+        'RETURNING "id"',
+        [user_id, review_id],
+    )
+    if rows:
+        return ReviewLikeState(id=rows[0]["id"], is_liked=False, like_count_delta=-1)
+    like = await ReviewLike.get_or_none(user_id=user_id, review_id=review_id).only("id")
+    return ReviewLikeState(id=like.id if like else None, is_liked=False, like_count_delta=0)
+
+
+async def apply_review_likes(states: Mapping[tuple[int, int], bool]) -> int:
+    """(user_id, review_id) -> is_liked 를 한 번의 multi-row upsert 로 반영하고 바뀐 행 수를 반환한다.
+
+    현재 상태를 한 번에 잠가 읽은 뒤 실제로 바뀌는 행만 쓰고, like_count 는 리뷰별 순변화량으로 맞춘다.
+    좋아요 행이 없는 (user, review) 의 취소는 단건 경로와 같이 행을 만들지 않는다.
+    그 사이 삭제된 리뷰/유저의 항목은 버린다 (하나의 외래 키 오류로 나머지까지 쓰지 못하는 일이 없도록).
+    """
+    if not states:
+        return 0
+
+    async with in_transaction():
+        # 남은 리뷰/유저를 잠가 쓰는 동안 삭제되지 않게 한다
+        existing_review_ids = {
+            row["id"]
+            for row in await Review.filter(id__in={review_id for _, review_id in states})
+            .select_for_update()
+            .values("id")
+        }
+        existing_user_ids = {
+            row["id"]
+            for row in await User.filter(id__in={user_id for user_id, _ in states}).select_for_update().values("id")
+        }
+        existing = {
+            key: is_liked
+            for key, is_liked in states.items()
+            if key[0] in existing_user_ids and key[1] in existing_review_ids
+        }
+        if len(existing) < len(states):
+            logger.warning("Dropped %d review likes of deleted reviews or users", len(states) - len(existing))
+        states = existing
+        if not states:
+            return 0
+
+        condition = reduce(or_, (Q(user_id=user_id, review_id=review_id) for user_id, review_id in states))
+        current = {
+            (user_id, review_id): is_liked
+            for user_id, review_id, is_liked in await ReviewLike.filter(condition)
+            .select_for_update()
+            .values_list("user_id", "review_id", "is_liked")
+        }
+        changed = {key: is_liked for key, is_liked in states.items() if is_liked != current.get(key, False)}
+        if not changed:
+            return 0
+
+        await ReviewLike.bulk_create(
+            [
+                ReviewLike(user_id=user_id, review_id=review_id, is_liked=is_liked)
+                for (user_id, review_id), is_liked in changed.items()
+            ],
+            update_fields=["is_liked"],
+            on_conflict=["user_id", "review_id"],
+        )
+        like_count_deltas: dict[int, int] = defaultdict(int)
+        for (_, review_id), is_liked in changed.items():
+            like_count_deltas[review_id] += 1 if is_liked else -1
+        # 변화량이 같은 리뷰끼리 묶어 UPDATE 한다
+        review_ids_by_delta: dict[int, list[int]] = defaultdict(list)
+        for review_id, delta in like_count_deltas.items():
+            if delta:
+                review_ids_by_delta[delta].append(review_id)
+        for delta, review_ids in review_ids_by_delta.items():
+            await adjust_review_like_counts(review_ids, delta)
+
+    await propagate_like_counts(review_id for review_ids in review_ids_by_delta.values() for review_id in review_ids)
+    return len(changed)
+
+
+async def propagate_like_counts(review_ids: Iterable[int]) -> None:
+    """like_count 가 바뀐 리뷰의 리뷰 상세/영화 리뷰 목록 ETag 버전을 올리고 영화별 상위 리뷰 인덱스에 반영한다"""
+    review_ids = list(review_ids)
+    if not review_ids:
+        return
+    for row in await Review.filter(id__in=review_ids).values(*TOP_REVIEW_COLUMNS):
+        entity_versions.bump(review_key(row["id"]), movie_reviews_key(row["movie_id"]))
+        await top_review_index.set_review(row)
@@ -0,0 +1,206 @@
+import asyncio
+import fcntl
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from src.configs import config
+from src.utils.bloom_filter import BloomFilter
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_entries(data: bytes, now: float) -> dict[str, float]:
+    """'jti exp' 형식의 줄들에서 만료되지 않은 항목만 골라낸다"""
+    entries: dict[str, float] = {}
+    for line in data.decode("utf-8").splitlines():
+        jti, _, expires_at = line.strip().partition(" ")
+        if jti and expires_at.isdigit() and int(expires_at) > now:
+            entries[jti] = int(expires_at)
+    return entries
+
+
+class TokenRevocationStore:
+    """jti 기반 토큰 폐기 목록.
+
+    대부분의 요청은 폐기되지 않은 토큰이므로 Bloom filter 에서 바로 걸러지고,
+    Bloom filter 가 양성이라고 답한 경우에만 정확한 집합(jti -> exp)으로 확인한다.
+    폐기 내역은 "jti exp" 한 줄씩 append-only 파일에 기록되어 재시작 후에도 유지된다.
+
+    여러 워커가 같은 파일을 공유한다: 각 워커는 sync_interval_seconds 마다 파일에 새로 추가된 줄을 읽어
+    다른 워커의 로그아웃을 반영하고, 파일 쓰기(append / compaction)는 파일 잠금(flock) 아래에서 한다.
+    compaction 은 파일의 현재 내용과 합친 뒤 다시 쓰므로 다른 워커가 추가한 항목을 지우지 않는다.
+    파일 I/O 는 이벤트 루프를 막지 않도록 스레드에서 실행한다.
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        capacity: int,
+        error_rate: float,
+        prune_interval_seconds: int = 60 * 60,
+        sync_interval_seconds: float = 1.0,
+    ) -> None:
+        self.file_path = file_path
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.prune_interval_seconds = prune_interval_seconds
+        self.sync_interval_seconds = sync_interval_seconds
+        self.bloom_filter = BloomFilter(capacity, error_rate)
+        self.bloom_positives = 0
+        self.false_positives = 0
+        self._revoked: dict[str, float] = {}
+        self._last_pruned_at = time.time()
+        # 파일에서 어디까지 읽었는지. compaction 으로 파일이 바뀌면(inode 변경) 처음부터 다시 읽는다
+        self._inode: int | None = None
+        self._offset = 0
+        self._io_lock = asyncio.Lock()
+        self._task: asyncio.Task[None] | None = None
+
+    def is_revoked(self, jti: str | None) -> bool:
+        if jti is None or jti not in self.bloom_filter:
+            return False
+
+        self.bloom_positives += 1
+        expires_at = self._revoked.get(jti)
+        if expires_at is None or expires_at <= time.time():
+            self.false_positives += 1
+            return False
+        return True
+
+    async def revoke(self, jti: str, expires_at: float) -> None:
+        if expires_at <= time.time() or jti in self._revoked:
+            return
+
+        self._add(jti, expires_at)
+        await asyncio.to_thread(self._append, f"{jti} {int(expires_at)}\n")
+
+        if len(self._revoked) > self.bloom_filter.capacity or (
+            time.time() - self._last_pruned_at > self.prune_interval_seconds
+        ):
+            await self.prune()
+
+    def _add(self, jti: str, expires_at: float) -> None:
+        self._revoked[jti] = expires_at
+        self.bloom_filter.add(jti)
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        # 파일 자체는 compaction 때 교체되므로 별도의 잠금 파일을 잠근다
+        with open(f"{self.file_path}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _append(self, line: str) -> None:
+        with self._file_lock(), open(self.file_path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+    def _read_new_entries(self) -> dict[str, float]:
+        """지난번 이후 파일에 추가된 (다른 워커가 쓴 것 포함) 항목. 마지막 줄이 아직 쓰는 중이면 다음에 읽는다"""
+        try:
+            stat = os.stat(self.file_path)
+        except FileNotFoundError:
+            return {}
+        if stat.st_ino != self._inode or stat.st_size < self._offset:
+            self._inode, self._offset = stat.st_ino, 0
+
+        with open(self.file_path, "rb") as f:
+            f.seek(self._offset)
+            data = f.read()
+        end = data.rfind(b"\n") + 1
+        self._offset += end
+        return _parse_entries(data[:end], time.time())
+
+    def _compact(self, revoked: dict[str, float], now: float) -> dict[str, float]:
+        """파일의 현재 내용과 revoked 를 합쳐 만료되지 않은 항목만 다시 쓰고, 합친 결과를 반환한다"""
+        with self._file_lock():
+            try:
+                with open(self.file_path, "rb") as f:
+                    merged = _parse_entries(f.read(), now)
+            except FileNotFoundError:
+                merged = {}
+            merged.update((jti, expires_at) for jti, expires_at in revoked.items() if expires_at > now)
+            if not merged and not os.path.exists(self.file_path):
+                return merged
+
+            tmp_path = f"{self.file_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.writelines(f"{jti} {int(expires_at)}\n" for jti, expires_at in merged.items())
+            os.replace(tmp_path, self.file_path)
+            stat = os.stat(self.file_path)
+            self._inode, self._offset = stat.st_ino, stat.st_size
+        return merged
+
+    async def sync(self) -> None:
+        """다른 워커가 파일에 추가한 폐기 내역을 반영한다"""
+        async with self._io_lock:
+            entries = await asyncio.to_thread(self._read_new_entries)
+        for jti, expires_at in entries.items():
+            if jti not in self._revoked:
+                self._add(jti, expires_at)
+
+    async def load(self) -> None:
+        """append-only 파일을 읽어 폐기 목록을 복구한다 (만료된 항목은 버린다)"""
+        self._revoked.clear()
+        self.bloom_filter = BloomFilter(self.capacity, self.error_rate)
+        self._inode, self._offset = None, 0
+        await self.sync()
+        await self.prune()
+
+    async def prune(self) -> None:
+        """만료된 jti 를 제거하고 Bloom filter 와 파일을 남은 항목으로 다시 만든다 (Bloom filter 는 삭제를 지원하지 않는다)"""
+        now = time.time()
+        async with self._io_lock:
+            merged = await asyncio.to_thread(self._compact, dict(self._revoked), now)
+        # compaction 중에 이 워커에서 추가된 항목도 유지한다
+        merged.update((jti, expires_at) for jti, expires_at in self._revoked.items() if expires_at > now)
+        self._revoked = merged
+        self._last_pruned_at = now
+
+        self.bloom_filter = BloomFilter(max(self.capacity, len(self._revoked) * 2), self.error_rate)
+        for jti in self._revoked:
+            self.bloom_filter.add(jti)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.sync_interval_seconds)
+            try:
+                await self.sync()
+            except Exception:
+                logger.exception("Failed to sync revoked tokens")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def stats(self) -> dict[str, int | float]:
+        exact_set_bytes = sys.getsizeof(self._revoked) + sum(sys.getsizeof(jti) for jti in self._revoked)
+        return {
+            "revoked_tokens": len(self._revoked),
+            "bloom_filter_bits": self.bloom_filter.num_bits,
+            "bloom_filter_hashes": self.bloom_filter.num_hashes,
+            "bloom_filter_memory_bytes": self.bloom_filter.memory_bytes,
+            "exact_set_memory_bytes": exact_set_bytes,
+            "estimated_false_positive_rate": self.bloom_filter.false_positive_rate,
+            "bloom_positives": self.bloom_positives,
+            "false_positives": self.false_positives,
+        }
+
+
+token_revocation_store = TokenRevocationStore(
+    file_path=config.TOKEN_REVOCATION_FILE,
+    capacity=config.TOKEN_REVOCATION_BLOOM_CAPACITY,
+    error_rate=config.TOKEN_REVOCATION_BLOOM_ERROR_RATE,
+    sync_interval_seconds=config.TOKEN_REVOCATION_SYNC_INTERVAL_SECONDS,
+)
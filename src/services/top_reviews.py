@@ -0,0 +1,201 @@
+import asyncio
+import logging
+import time
+from typing import Any
+
+from src.configs import config
+from src.models.reviews import Review
+
+logger = logging.getLogger(__name__)
+
+# 인덱스에 담아 두는 리뷰 컬럼 (ReviewResponse 필드)
+TOP_REVIEW_COLUMNS = ("id", "user_id", "movie_id", "title", "content", "review_image_url", "like_count")
+
+ReviewKey = tuple[int, int]
+
+
+def _key(row: dict[str, Any]) -> ReviewKey:
+    """좋아요 많은 순, 같으면 최신순 (GET /movies/{movie_id}/reviews?order_by=-like_count 와 같은 순서)"""
+    return row["like_count"], row["id"]
+
+
+class TopReviewIndex:
+    """영화별로 좋아요가 가장 많은 리뷰 상위 per_movie 개를 메모리에 유지하는 인덱스.
+
+    영화마다 per_movie 의 두 배까지 정렬된 배열로 들고 있고, 배열 밖의 리뷰는 순위의 상한(floor)만 기억한다.
+    좋아요/취소, 리뷰 작성/수정/삭제 때 바뀐 리뷰 한 건으로 갱신하며, 취소가 이어져 floor 보다 확실히 앞선 리뷰가
+    per_movie 개보다 적어지면 그 영화만 DB 에서 다시 읽는다. 조회는 메모리만 읽으므로 review_likes 를 건드리지 않는다.
+    다른 프로세스의 변경은 refresh_seconds 마다 백그라운드에서 전체를 다시 만들어 반영하며,
+    다시 만드는 동안의 요청은 기존 인덱스를 그대로 쓰고 그 사이에 들어온 변경은 새 인덱스에 다시 적용한다.
+    """
+
+    def __init__(self, per_movie: int, refresh_seconds: int) -> None:
+        self.per_movie = per_movie
+        self.capacity = per_movie * 2
+        self.refresh_seconds = refresh_seconds
+        self.built_at: float | None = None
+        # movie_id -> 정렬된 리뷰 행 (capacity 개 이하)
+        self._rows: dict[int, list[dict[str, Any]]] = {}
+        # movie_id -> 배열 밖 리뷰 순위의 상한. None 이면 그 영화의 리뷰를 모두 들고 있다
+        self._floors: dict[int, ReviewKey | None] = {}
+        self._build_lock = asyncio.Lock()
+        self._refresh_task: asyncio.Task[None] | None = None
+        # 다시 만드는 중에 들어온 변경 ((movie_id, review_id) -> 리뷰 행, 삭제면 None. 영화 삭제는 review_id 가 None)
+        self._changes_during_build: dict[tuple[int, int | None], dict[str, Any] | None] | None = None
+
+    async def ensure_built(self) -> None:
+        """처음 한 번만 요청이 만들기를 기다리고, 오래된 인덱스는 백그라운드에서 한 번만 다시 만든다"""
+        if self.built_at is None:
+            async with self._build_lock:
+                if self.built_at is None:
+                    await self._build()
+        elif time.monotonic() - self.built_at > self.refresh_seconds and self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._refresh())
+
+    async def _refresh(self) -> None:
+        try:
+            await self.build()
+        except Exception:
+            logger.exception("Failed to refresh top review index")
+        finally:
+            self._refresh_task = None
+
+    async def build(self) -> None:
+        async with self._build_lock:
+            await self._build()
+
+    async def _build(self) -> None:
+        """영화별 상위 capacity + 1 개 리뷰를 한 번의 쿼리(ROW_NUMBER)로 읽어 다시 만든다"""
+        self._changes_during_build = {}
+        table = Review._meta.db_table
+        columns = ", ".join(f"`{column}`" for column in TOP_REVIEW_COLUMNS)
+        try:
+            rows = await Review._meta.db.execute_query_dict(
+                f"SELECT {columns} FROM (SELECT {columns}, ROW_NUMBER() OVER "
+                f"(PARTITION BY `movie_id` ORDER BY `like_count` DESC, `id` DESC) AS `review_rank` FROM `{table}`) "
+                f"ranked WHERE `review_rank` <= {self.capacity + 1} ORDER BY `movie_id`, `review_rank`"
+            )
+        except BaseException:
+            self._changes_during_build = None
+            raise
+
+        rows_by_movie: dict[int, list[dict[str, Any]]] = {}
+        for row in rows:
+            rows_by_movie.setdefault(row["movie_id"], []).append(dict(row))
+
+        changes, self._changes_during_build = self._changes_during_build, None
+        self._rows, self._floors = {}, {}
+        for movie_id, movie_rows in rows_by_movie.items():
+            self._set_movie_rows(movie_id, movie_rows)
+
+        # 읽는 동안 들어온 변경을 순서대로 다시 적용하고, 다시 읽어야 하는 영화는 마지막에 한 번씩만 읽는다
+        reload_movie_ids: set[int] = set()
+        for (movie_id, review_id), changed_row in changes.items():
+            if review_id is None:
+                self._remove_movie(movie_id)
+                reload_movie_ids.discard(movie_id)
+            elif changed_row is None:
+                if self._remove_review(movie_id, review_id):
+                    reload_movie_ids.add(movie_id)
+            elif self._set_review(changed_row):
+                reload_movie_ids.add(movie_id)
+        self.built_at = time.monotonic()
+        for movie_id in reload_movie_ids:
+            await self._reload_movie(movie_id)
+
+    def clear(self) -> None:
+        self.built_at = None
+        self._rows.clear()
+        self._floors.clear()
+
+    def top(self, movie_id: int, limit: int) -> list[dict[str, Any]]:
+        """좋아요가 가장 많은 리뷰 limit 개 (limit 은 per_movie 이하)"""
+        floor = self._floors.get(movie_id)
+        rows = self._rows.get(movie_id, [])
+        if floor is not None:
+            rows = [row for row in rows if _key(row) > floor]
+        return rows[:limit]
+
+    def _record_change(self, key: tuple[int, int | None], row: dict[str, Any] | None) -> None:
+        if self._changes_during_build is not None:
+            # 같은 리뷰의 이전 변경은 지우고 마지막 변경만 순서의 끝에 남긴다
+            self._changes_during_build.pop(key, None)
+            self._changes_during_build[key] = row
+
+    async def set_review(self, row: dict[str, Any]) -> None:
+        """작성/수정되었거나 like_count 가 바뀐 리뷰 한 건을 반영한다 (row 는 TOP_REVIEW_COLUMNS 를 모두 담는다)"""
+        self._record_change((row["movie_id"], row["id"]), row)
+        # 아직 만들지 않았다면 build 가 DB 의 최신 상태를 읽는다
+        if self.built_at is not None and self._set_review(row):
+            await self._reload_movie(row["movie_id"])
+
+    def _set_review(self, row: dict[str, Any]) -> bool:
+        """row 를 반영하고 그 영화를 DB 에서 다시 읽어야 하는지 반환한다"""
+        movie_id = row["movie_id"]
+        rows = self._rows.setdefault(movie_id, [])
+        floor = self._floors.get(movie_id)
+        for i, tracked in enumerate(rows):
+            if tracked["id"] == row["id"]:
+                rows[i] = row
+                break
+        else:
+            if floor is not None and _key(row) <= floor:
+                # 배열 밖에 있고 순위도 여전히 floor 아래다
+                return False
+            rows.append(row)
+
+        rows.sort(key=_key, reverse=True)
+        return self._settle(movie_id)
+
+    async def remove_review(self, movie_id: int, review_id: int) -> None:
+        self._record_change((movie_id, review_id), None)
+        if self._remove_review(movie_id, review_id):
+            await self._reload_movie(movie_id)
+
+    def _remove_review(self, movie_id: int, review_id: int) -> bool:
+        rows = self._rows.get(movie_id)
+        if rows is None:
+            return False
+        rows[:] = [row for row in rows if row["id"] != review_id]
+        return self._settle(movie_id)
+
+    def remove_movie(self, movie_id: int) -> None:
+        if self._changes_during_build is not None:
+            for key in [key for key in self._changes_during_build if key[0] == movie_id]:
+                del self._changes_during_build[key]
+        self._record_change((movie_id, None), None)
+        self._remove_movie(movie_id)
+
+    def _remove_movie(self, movie_id: int) -> None:
+        self._rows.pop(movie_id, None)
+        self._floors.pop(movie_id, None)
+
+    def _settle(self, movie_id: int) -> bool:
+        """capacity 를 넘는 리뷰를 잘라내고, floor 보다 확실히 앞선 리뷰가 per_movie 개보다 적어 DB 에서 다시 읽어야 하는지 반환한다"""
+        rows = self._rows[movie_id]
+        floor = self._floors.get(movie_id)
+        while len(rows) > self.capacity:
+            evicted = _key(rows.pop())
+            floor = evicted if floor is None else max(floor, evicted)
+        self._floors[movie_id] = floor
+
+        return floor is not None and sum(_key(row) > floor for row in rows) < self.per_movie
+
+    async def _reload_movie(self, movie_id: int) -> None:
+        rows = (
+            await Review.filter(movie_id=movie_id)
+            .order_by("-like_count", "-id")
+            .limit(self.capacity + 1)
+            .values(*TOP_REVIEW_COLUMNS)
+        )
+        self._set_movie_rows(movie_id, rows)
+
+    def _set_movie_rows(self, movie_id: int, rows: list[dict[str, Any]]) -> None:
+        """rows 는 순위순으로 최대 capacity + 1 개. capacity 개를 넘으면 마지막 행이 배열 밖 리뷰의 상한이 된다"""
+        self._floors[movie_id] = _key(rows[self.capacity]) if len(rows) > self.capacity else None
+        self._rows[movie_id] = list(rows[: self.capacity])
+
+
+top_review_index = TopReviewIndex(
+    per_movie=config.TOP_REVIEWS_PER_MOVIE, refresh_seconds=config.TOP_REVIEWS_REFRESH_SECONDS
+)
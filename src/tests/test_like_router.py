@@ -1,13 +1,18 @@
+import asyncio
+from unittest.mock import patch
+
 import httpx
 from httpx import AsyncClient
-from tortoise.contrib.test import TestCase
+from tortoise.contrib.test import TestCase, TruncationTestCase
 
 from main import app
+from src.configs import config
 from src.models.likes import ReviewLike
 from src.models.movies import Movie
 from src.models.reviews import Review
 from src.models.users import GenderEnum, User
 from src.services.auth import AuthService
+from src.services.like_buffer import review_like_buffer
 
 
 class LikeRouterTestCase(TestCase):
@@ -198,3 +203,203 @@ class LikeRouterTestCase(TestCase):
 
             assert response_json["review_id"] == review.id
             assert response_json["is_liked"]
+
+    async def test_api_like_and_unlike_review_updates_like_count(self) -> None:
+        # given
+        user = await self.create_user(username="testuser", password="password1234")
+        movie = await self.create_movie()
+        review = await self.create_review(movie_id=movie.id, user_id=user.id)
+        await self.create_user(username=(username := "other_user"), password=(password := "password1234"))
+        await self.create_user(username=(third_username := "third_user"), password=password)
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            # when
+            await self.user_login(client, username, password)
+            await client.post(url=f"/likes/reviews/{review.id}/like")
+            await client.post(url=f"/likes/reviews/{review.id}/like")
+            await self.user_login(client, third_username, password)
+            await client.post(url=f"/likes/reviews/{review.id}/like")
+            liked_count_response = await client.get(f"/reviews/{review.id}/like_count")
+            await client.post(url=f"/likes/reviews/{review.id}/unlike")
+            await client.post(url=f"/likes/reviews/{review.id}/unlike")
+            unliked_count_response = await client.get(f"/reviews/{review.id}/like_count")
+            movie_reviews_response = await client.get(f"/movies/{movie.id}/reviews")
+
+        # then
+        assert liked_count_response.json()["like_count"] == 2
+        assert unliked_count_response.json()["like_count"] == 1
+        assert movie_reviews_response.json()[0]["like_count"] == 1
+        assert await ReviewLike.filter(review_id=review.id).count() == 2
+
+    async def test_api_like_and_unlike_review_with_write_behind_buffer(self) -> None:
+        # given
+        author = await self.create_user(username="author", password=(password := "password1234"))
+        movie = await self.create_movie()
+        review = await self.create_review(movie_id=movie.id, user_id=author.id)
+        await self.create_user(username=(username := "testuser"), password=password)
+        await self.create_user(username=(other_username := "other_user"), password=password)
+
+        with patch.object(config, "REVIEW_LIKE_WRITE_BEHIND", True):
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                # when
+                await self.user_login(client, other_username, password)
+                await client.post(url=f"/likes/reviews/{review.id}/like")
+                await client.post(url=f"/likes/reviews/{review.id}/unlike")
+                await self.user_login(client, username, password)
+                for action in ("like", "unlike", "like"):
+                    like_response = await client.post(url=f"/likes/reviews/{review.id}/{action}")
+                buffered_is_liked_response = await client.get(url=f"/reviews/{review.id}/is_liked")
+                rows_before_flush = await ReviewLike.filter(review_id=review.id).count()
+
+                written = await review_like_buffer.flush()
+                is_liked_response = await client.get(url=f"/reviews/{review.id}/is_liked")
+                like_count_response = await client.get(f"/reviews/{review.id}/like_count")
+                stats_response = await client.get("/metrics/review_like_buffer")
+
+        # then
+        assert like_response.json()["is_liked"]
+        assert buffered_is_liked_response.json()["is_liked"]
+        assert rows_before_flush == 0
+        # 다른 유저의 좋아요 -> 취소는 행을 만들지 않는다
+        assert written == 1
+        assert await ReviewLike.filter(review_id=review.id, is_liked=True).count() == 1
+        assert is_liked_response.json()["is_liked"]
+        assert like_count_response.json()["like_count"] == 1
+        assert stats_response.json()["pending"] == 0
+        assert stats_response.json()["coalesced"] == 3
+
+    async def test_write_behind_buffer_flushes_when_full_and_on_stop(self) -> None:
+        # given
+        users = [await self.create_user(username=f"testuser{i}", password="password1234") for i in range(3)]
+        movie = await self.create_movie()
+        review = await self.create_review(movie_id=movie.id, user_id=users[0].id)
+
+        with patch.object(review_like_buffer, "max_size", 2):
+            # when
+            await review_like_buffer.set(users[0].id, review.id, True)
+            await review_like_buffer.set(users[1].id, review.id, True)
+            flushed_when_full = await ReviewLike.filter(review_id=review.id).count()
+            await review_like_buffer.set(users[2].id, review.id, True)
+            await review_like_buffer.stop()
+
+        # then
+        assert flushed_when_full == 2
+        assert await ReviewLike.filter(review_id=review.id).count() == 3
+        assert (await Review.get(id=review.id)).like_count == 3
+        assert review_like_buffer.stats()["pending"] == 0
+
+    async def test_write_behind_buffer_drops_likes_of_deleted_reviews_and_users(self) -> None:
+        # given
+        users = [await self.create_user(username=f"testuser{i}", password="password1234") for i in range(3)]
+        movie = await self.create_movie()
+        review = await self.create_review(movie_id=movie.id, user_id=users[0].id)
+        deleted_review = await self.create_review(movie_id=movie.id, user_id=users[2].id)
+
+        with patch.object(config, "REVIEW_LIKE_WRITE_BEHIND", True):
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                await self.user_login(client, users[0].username, "password1234")
+                not_found_response = await client.post(url=f"/likes/reviews/{deleted_review.id + 1}/like")
+        await review_like_buffer.set(users[0].id, review.id, True)
+        await review_like_buffer.set(users[1].id, review.id, True)
+        await review_like_buffer.set(users[0].id, deleted_review.id, True)
+        await deleted_review.delete()
+        await users[1].delete()
+
+        # when
+        written = await review_like_buffer.flush()
+
+        # then
+        assert not_found_response.status_code == 404
+        assert written == 1
+        assert await ReviewLike.filter(review_id=review.id).values("user_id") == [{"user_id": users[0].id}]
+        assert (await Review.get(id=review.id)).like_count == 1
+        assert review_like_buffer.stats()["pending"] == 0
+
+    async def test_api_get_review_like_counts_and_is_liked_in_batch(self) -> None:
+        # given
+        author = await self.create_user(username="author", password=(password := "password1234"))
+        await self.create_user(username=(username := "testuser"), password=password)
+        await self.create_user(username=(other_username := "other_user"), password=password)
+        movie = await self.create_movie()
+        other_movie = await self.create_movie()
+        reviews = [
+            await self.create_review(movie_id=movie.id, user_id=author.id),
+            await self.create_review(movie_id=other_movie.id, user_id=author.id),
+        ]
+        ids = [reviews[1].id, reviews[0].id, reviews[1].id, 999999]
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            await self.user_login(client, other_username, password)
+            await client.post(url=f"/likes/reviews/{reviews[1].id}/like")
+            await self.user_login(client, username, password)
+            await client.post(url=f"/likes/reviews/{reviews[1].id}/like")
+            await client.post(url=f"/likes/reviews/{reviews[0].id}/like")
+            await client.post(url=f"/likes/reviews/{reviews[0].id}/unlike")
+
+            # when
+            is_liked_response = await client.get("/reviews/is_liked", params={"ids": ids})
+            client.cookies.clear()
+            like_counts_response = await client.get("/reviews/like_counts", params={"ids": ids})
+            anonymous_is_liked_response = await client.get("/reviews/is_liked", params={"ids": ids})
+            empty_ids_response = await client.get("/reviews/like_counts")
+
+        # then
+        assert like_counts_response.status_code == 200
+        assert like_counts_response.json() == [
+            {"review_id": reviews[1].id, "like_count": 2},
+            {"review_id": reviews[0].id, "like_count": 0},
+            {"review_id": 999999, "like_count": 0},
+        ]
+        assert is_liked_response.json() == [
+            {"review_id": reviews[1].id, "is_liked": True},
+            {"review_id": reviews[0].id, "is_liked": False},
+            {"review_id": 999999, "is_liked": False},
+        ]
+        assert anonymous_is_liked_response.status_code == 401
+        assert empty_ids_response.status_code == 422
+
+
+class ConcurrentLikeTestCase(TruncationTestCase):
+    """동시 요청이 각자의 커넥션/트랜잭션을 쓰도록 테스트 트랜잭션 대신 truncate 로 격리한다"""
+
+    async def test_api_concurrent_like_and_unlike_keep_like_count_consistent(self) -> None:
+        # given
+        hashed_password = AuthService().hash_password((password := "password1234"))
+        usernames = ["user1", "user2", "user3"]
+        users = [
+            await User.create(username=username, hashed_password=hashed_password, age=25, gender=GenderEnum.MALE)
+            for username in ["author", *usernames]
+        ]
+        movie = await Movie.create(
+            title="test", overview="test 중 입니다.", cast="lee byeong heon", runtime=240, release_date="2021-02-01"
+        )
+        review = await Review.create(user_id=users[0].id, movie_id=movie.id, title="test review", content="test")
+
+        clients = [httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") for _ in usernames]
+        for client, username in zip(clients, usernames):
+            await client.post("/users/login", json={"username": username, "password": password})
+
+        # when
+        like_responses = await asyncio.gather(
+            *(client.post(f"/likes/reviews/{review.id}/like") for client in clients for _ in range(5))
+        )
+        liked_count = (await Review.get(id=review.id)).like_count
+        await asyncio.gather(
+            *(
+                client.post(f"/likes/reviews/{review.id}/{'unlike' if i % 2 == 0 else 'like'}")
+                for client in clients[:2]
+                for i in range(5)
+            ),
+            *(client.post(f"/likes/reviews/{review.id}/unlike") for client in clients[2:] for _ in range(3)),
+        )
+        for client in clients:
+            await client.aclose()
+
+        # then
+        assert all(response.status_code == 200 for response in like_responses)
+        assert len({response.json()["id"] for response in like_responses}) == len(usernames)
+        assert liked_count == len(usernames)
+        assert await ReviewLike.filter(review_id=review.id).count() == len(usernames)
+        assert (await Review.get(id=review.id)).like_count == await ReviewLike.filter(
+            review_id=review.id, is_liked=True
+        ).count()
@@ -1,12 +1,20 @@
+import json
 import os.path
+from typing import Any
+from unittest.mock import patch
 
 import httpx
 from fastapi import status
-from tortoise.contrib.test import TestCase
+from tortoise.contrib.test import TestCase, TruncationTestCase
 
 from main import app
 from src.configs import config
 from src.models.movies import Genre, Movie
+from src.routers.movie_router import _to_movie_rows
+from src.services.entity_versions import entity_versions, movie_key
+from src.services.movie_cache import invalidate_movie
+from src.services.movie_genre_index import MovieGenreIndex
+from src.services.movie_genres import sync_movie_genres
 from src.tests.utils.fake_file import fake_image
 
 
@@ -40,6 +48,97 @@ class TestMovieRouter(TestCase):
         assert response_json["genres"] == genre_ids
         assert response_json["release_date"] == release_date
 
+    async def test_api_bulk_upsert_movies(self) -> None:
+        # given
+        movie_data: dict[str, Any] = {
+            "title": "test",
+            "overview": "test 중 입니다.",
+            "cast": "lee byeong heon, choi min sik",
+            "runtime": 240,
+            "release_date": "2021-02-01",
+        }
+        upserted_movie = await Movie.create(**movie_data, external_id=10)
+        await upserted_movie.genres.add(self.genres[0])
+        updated_movie = await Movie.create(**movie_data)
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            # when
+            response = await client.post(
+                "/movies/bulk",
+                json=[
+                    {**movie_data, "title": "upserted", "external_id": 10, "genre_ids": [self.genres[1].id]},
+                    {**movie_data, "title": "created", "external_id": 20, "genre_ids": [self.genres[0].id]},
+                    {**movie_data, "title": "created without external_id", "genre_ids": [self.genres[2].id, 9999]},
+                    {"id": updated_movie.id, "runtime": 180, "genre_ids": [self.genres[2].id]},
+                    {"id": 1232131311, "runtime": 180},
+                ],
+            )
+            movie_responses = [
+                (await client.get(f"/movies/{result['id']}")).json() for result in response.json()["results"][:4]
+            ]
+
+        # then
+        assert response.status_code == status.HTTP_200_OK
+        response_json = response.json()
+        assert [result["status"] for result in response_json["results"]] == [
+            "updated",
+            "created",
+            "created",
+            "updated",
+            "not_found",
+        ]
+        assert response_json["results"][0]["id"] == upserted_movie.id
+        assert (response_json["created"], response_json["updated"], response_json["not_found"]) == (2, 2, 1)
+        assert response_json["rows_per_second"] > 0
+        assert [movie["title"] for movie in movie_responses] == [
+            "upserted",
+            "created",
+            "created without external_id",
+            "test",
+        ]
+        assert [movie["genres"] for movie in movie_responses] == [
+            [self.genres[1].id],
+            [self.genres[0].id],
+            [self.genres[2].id],
+            [self.genres[2].id],
+        ]
+        assert movie_responses[3]["runtime"] == 180
+
+    async def test_api_bulk_upsert_movies_with_duplicate_ids(self) -> None:
+        # given
+        movie_data: dict[str, Any] = {
+            "title": "test",
+            "overview": "test 중 입니다.",
+            "cast": "lee byeong heon, choi min sik",
+            "runtime": 240,
+            "release_date": "2021-02-01",
+        }
+        movie = await Movie.create(**movie_data)
+        item_data = {**movie_data, "genre_ids": []}
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            # when
+            duplicate_external_id_response = await client.post(
+                "/movies/bulk",
+                json=[
+                    {**item_data, "title": "first", "external_id": 10},
+                    {**item_data, "title": "second", "external_id": 10},
+                    {**item_data, "title": "other", "external_id": 20},
+                ],
+            )
+            duplicate_id_response = await client.post(
+                "/movies/bulk", json=[{"id": movie.id, "runtime": 180}, {"id": movie.id, "runtime": 200}]
+            )
+
+        # then
+        assert duplicate_external_id_response.status_code == status.HTTP_400_BAD_REQUEST
+        assert duplicate_external_id_response.json()["detail"] == "Duplicate external_id: 10"
+        assert duplicate_id_response.status_code == status.HTTP_400_BAD_REQUEST
+        assert duplicate_id_response.json()["detail"] == f"Duplicate id: {movie.id}"
+        # 아무것도 쓰지 않는다
+        assert await Movie.filter(external_id__in=[10, 20]).count() == 0
+        assert (await Movie.get(id=movie.id)).runtime == 240
+
     async def test_api_get_movies_when_query_param_is_nothing(self) -> None:
         async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
             for i in range(3):
@@ -70,36 +169,162 @@ class TestMovieRouter(TestCase):
         assert response_json[2]["id"] == movies[2].id
         assert response_json[2]["title"] == movies[2].title
 
-    async def test_api_get_movies_when_query_param_is_not_none(self) -> None:
+    async def test_api_get_movies_with_cursor_pagination(self) -> None:
         # given
+        movies = [
+            await Movie.create(
+                title=f"test{i}",
+                overview="test 중 입니다.",
+                cast="lee byeong heon, choi min sik",
+                runtime=240,
+                release_date=f"2021-02-0{i % 3 + 1}",
+            )
+            for i in range(5)
+        ]
+
         async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
-            await client.post(
+            for order_by, expected_movies in (
+                ("id", sorted(movies, key=lambda movie: movie.id)),
+                ("-release_date", sorted(movies, key=lambda movie: (movie.release_date, movie.id), reverse=True)),
+            ):
+                # when
+                received_ids = []
+                params: dict[str, str | int] = {"order_by": order_by, "limit": 2}
+                for _ in range(3):
+                    response = await client.get("/movies", params=params)
+                    assert response.status_code == status.HTTP_200_OK
+                    received_ids += [movie["id"] for movie in response.json()]
+                    if (next_cursor := response.headers.get("X-Next-Cursor")) is None:
+                        break
+                    params["cursor"] = next_cursor
+
+                # then
+                assert received_ids == [movie.id for movie in expected_movies]
+                assert response.headers.get("X-Next-Cursor") is None
+
+    async def test_api_get_movies_when_cursor_is_invalid(self) -> None:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get("/movies", params={"cursor": "invalid"})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    async def test_api_get_movies_with_genre_filter(self) -> None:
+        # given
+        genre_a, genre_b, genre_c = self.genres
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            # 인덱스를 먼저 만들어 두고 이후의 생성/수정/삭제가 인덱스에 반영되는지 확인한다
+            await client.get("/movies", params={"genre_ids": [genre_a.id]})
+            movie_ids = []
+            for genre_ids in ([genre_a.id], [genre_a.id, genre_b.id], [genre_b.id], [genre_a.id, genre_b.id]):
+                create_response = await client.post(
+                    "/movies",
+                    json={
+                        "title": "test",
+                        "overview": "test 중 입니다.",
+                        "cast": "lee byeong heon, choi min sik",
+                        "runtime": 240,
+                        "genre_ids": genre_ids,
+                        "release_date": "2021-02-01",
+                    },
+                )
+                movie_ids.append(create_response.json()["id"])
+            await client.patch(f"/movies/{movie_ids[2]}", json={"genre_ids": [genre_c.id]})
+            await client.delete(f"/movies/{movie_ids[3]}")
+
+            # when
+            any_response = await client.get("/movies", params={"genre_ids": [genre_a.id, genre_b.id], "limit": 1})
+            next_response = await client.get(
                 "/movies",
-                json={
-                    "title": (title := "test"),
-                    "overview": (overview := "test 중 입니다."),
-                    "cast": (cast := "lee byeong heon, choi min sik"),
-                    "runtime": (runtime := 240),
-                    "genre_ids": (genre_ids := [genre.id for genre in self.genres]),
-                    "release_date": (release_date := "2021-02-01"),
+                params={
+                    "genre_ids": [genre_a.id, genre_b.id],
+                    "limit": 1,
+                    "cursor": any_response.headers["X-Next-Cursor"],
                 },
             )
+            all_response = await client.get(
+                "/movies", params={"genre_ids": [genre_a.id, genre_b.id], "genre_match": "all"}
+            )
+            updated_response = await client.get("/movies", params={"genre_ids": [genre_c.id]})
 
-            # when
-            response = await client.get(
-                url="/movies", params={"title": title, "genre_ids": [genre.id for genre in self.genres[:2]]}
+        # then
+        assert [movie["id"] for movie in any_response.json() + next_response.json()] == movie_ids[:2]
+        assert "X-Next-Cursor" not in next_response.headers
+        assert [movie["id"] for movie in all_response.json()] == [movie_ids[1]]
+        assert [movie["id"] for movie in updated_response.json()] == [movie_ids[2]]
+
+    async def test_api_get_movies_with_genre_filter_scans_in_release_date_order(self) -> None:
+        # given
+        genre_a, genre_b, _ = self.genres
+        movie_ids = []
+        for i, genre in enumerate((genre_a, genre_b, genre_a, genre_a, genre_b, genre_a)):
+            movie = await Movie.create(
+                title="test", overview="test", cast="test", runtime=240, release_date=f"2021-02-0{i % 3 + 1}"
             )
+            await movie.genres.add(genre)
+            movie_ids.append(movie.id)
+
+        # when
+        # 후보 id 목록을 IN 으로 보내지 않고 2 건씩 훑는 경로를 타게 한다
+        with (
+            patch("src.routers.movie_router.GENRE_FILTER_MAX_IN_IDS", 0),
+            patch("src.routers.movie_router.GENRE_FILTER_SCAN_CHUNK_SIZE", 2),
+        ):
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                pages = []
+                params: dict[str, Any] = {"genre_ids": [genre_a.id], "order_by": "-release_date", "limit": 2}
+                while True:
+                    response = await client.get("/movies", params=params)
+                    pages.append([movie["id"] for movie in response.json()])
+                    if "X-Next-Cursor" not in response.headers:
+                        break
+                    params["cursor"] = response.headers["X-Next-Cursor"]
+
+        # then
+        # release_date: 02-01, 02-02, 02-03, 02-01, 02-02, 02-03 중 genre_a 인 0, 2, 3, 5 번째 영화
+        assert pages == [[movie_ids[5], movie_ids[2]], [movie_ids[3], movie_ids[0]]]
+
+    async def test_movie_genre_index_reapplies_changes_made_during_build(self) -> None:
+        # given
+        index = MovieGenreIndex(refresh_seconds=300)
+
+        async def get_genre_ids_by_movie_while_movie_is_created() -> dict[int, list[int]]:
+            # DB 를 읽는 동안 다른 요청이 영화를 만든다
+            index.set_movie_genres(7, [self.genres[0].id])
+            return {3: [self.genres[0].id, self.genres[1].id]}
+
+        # when
+        with patch(
+            "src.services.movie_genre_index.get_genre_ids_by_movie", get_genre_ids_by_movie_while_movie_is_created
+        ):
+            await index.build()
+
+        # then
+        assert index.movie_ids(index.match([self.genres[0].id])) == [3, 7]
+        assert index.movie_ids(index.match([self.genres[0].id, self.genres[1].id], match_all=True)) == [3]
+
+    async def test_api_get_movies_when_genre_is_added_after_catalog_loaded(self) -> None:
+        # given
+        movie = await Movie.create(
+            title="test",
+            overview="test 중 입니다.",
+            cast="lee byeong heon, choi min sik",
+            runtime=240,
+            release_date="2021-02-01",
+        )
+        await movie.genres.add(self.genres[0])
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            await client.get("/movies")
+            # 카탈로그를 읽은 뒤 다른 프로세스(크롤러 등)에서 장르가 추가된 경우
+            new_genre = await Genre.create(name="new genre", external_id=100)
+            await movie.genres.add(new_genre)
+
+            # when
+            response = await client.get("/movies")
 
         # then
         assert response.status_code == status.HTTP_200_OK
-        response_json = response.json()
-        assert len(response_json) == 1
-        assert response_json[0]["title"] == title
-        assert response_json[0]["overview"] == overview
-        assert response_json[0]["cast"] == cast
-        assert response_json[0]["genres"] == genre_ids
-        assert response_json[0]["runtime"] == runtime
-        assert response_json[0]["release_date"] == release_date
+        assert response.json()[0]["genres"] == [self.genres[0].id, new_genre.id]
+        assert response.json()[0]["genres_str"] == [self.genres[0].name, new_genre.name]
 
     async def test_api_get_movie(self) -> None:
         # given
@@ -137,6 +362,14 @@ class TestMovieRouter(TestCase):
         # then
         assert response.status_code == status.HTTP_404_NOT_FOUND
 
+    async def test_api_get_movies_ignores_access_token(self) -> None:
+        # 인증이 필요 없는 라우트는 토큰을 검사하지 않는다
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get("/movies", cookies={"access_token": "invalid"})
+
+        # then
+        assert response.status_code == status.HTTP_200_OK
+
     async def test_api_update_movie(self) -> None:
         # given
         async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
@@ -170,6 +403,261 @@ class TestMovieRouter(TestCase):
         assert response_json["runtime"] == updated_runtime
         assert response_json["genres"] == updated_genres
 
+    async def test_api_update_movie_syncs_only_changed_genres(self) -> None:
+        # given
+        movie = await Movie.create(
+            title="test",
+            overview="test 중 입니다.",
+            cast="lee byeong heon, choi min sik",
+            runtime=240,
+            release_date="2021-02-01",
+        )
+        await movie.genres.add(self.genres[0], self.genres[1])
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            # when
+            response = await client.patch(
+                f"/movies/{movie.id}", json={"genre_ids": [self.genres[1].id, self.genres[2].id, 9999]}
+            )
+
+        # then
+        assert response.json()["genres"] == [self.genres[1].id, self.genres[2].id]
+        # 이미 목표 상태이면 연결 테이블을 건드리지 않는다
+        assert await sync_movie_genres({movie.id: [self.genres[1].id, self.genres[2].id]}) == (0, 0)
+        assert await sync_movie_genres({movie.id: [self.genres[2].id, self.genres[0].id]}) == (1, 1)
+
+    async def test_api_export_movies(self) -> None:
+        # given
+        movies = [
+            await Movie.create(
+                title=f"test{i}",
+                overview="test 중 입니다.",
+                cast="lee byeong heon, choi min sik",
+                runtime=240,
+                release_date="2021-02-01",
+            )
+            for i in range(3)
+        ]
+        await movies[2].genres.add(self.genres[1])
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            # when
+            with patch.object(config, "MOVIE_EXPORT_CHUNK_SIZE", 2):
+                response = await client.get("/movies/export")
+
+        # then
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [line["id"] for line in lines] == [movie.id for movie in movies]
+        assert lines[0]["overview"] == "test 중 입니다."
+        assert lines[0]["release_date"] == "2021-02-01"
+        assert lines[2]["genres"] == [self.genres[1].id]
+        assert lines[2]["genres_str"] == [self.genres[1].name]
+
+    async def test_api_get_movie_with_if_none_match_when_movie_does_not_exist(self) -> None:
+        # when
+        etag = entity_versions.etag(movie_key(378912739))
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get("/movies/378912739", headers={"If-None-Match": etag})
+            wildcard_response = await client.get("/movies/378912739", headers={"If-None-Match": "*"})
+
+        # then
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert wildcard_response.status_code == status.HTTP_404_NOT_FOUND
+
+    async def test_api_get_movie_does_not_cache_body_under_newer_version(self) -> None:
+        # given
+        movie = await Movie.create(title="test", overview="test", cast="test", runtime=240, release_date="2021-02-01")
+
+        async def to_movie_rows_while_movie_is_updated(*args: Any) -> list[dict[str, Any]]:
+            # DB 를 읽은 직후 다른 요청이 영화를 수정한다
+            rows = await _to_movie_rows(*args)
+            await Movie.filter(id=movie.id).update(title="updated")
+            invalidate_movie(movie.id)
+            return rows
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            with patch("src.routers.movie_router._to_movie_rows", to_movie_rows_while_movie_is_updated):
+                await client.get(f"/movies/{movie.id}")
+
+            # when
+            response = await client.get(f"/movies/{movie.id}")
+
+        # then
+        assert response.json()["title"] == "updated"
+
+    async def test_api_get_movie_cache_is_invalidated_on_update_and_delete(self) -> None:
+        # given
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            create_response = await client.post(
+                "/movies",
+                json={
+                    "title": "test",
+                    "overview": "test 중 입니다.",
+                    "cast": "lee byeong heon, choi min sik",
+                    "runtime": 240,
+                    "genre_ids": [self.genres[0].id],
+                    "release_date": "2021-02-01",
+                },
+            )
+            movie_id = create_response.json()["id"]
+            first_response = await client.get(f"/movies/{movie_id}")
+            cached_response = await client.get(f"/movies/{movie_id}")
+            stats_response = await client.get("/metrics/caches")
+
+            # when
+            await client.patch(f"/movies/{movie_id}", json={"title": (updated_title := "updated_title")})
+            updated_response = await client.get(f"/movies/{movie_id}")
+            await client.delete(f"/movies/{movie_id}")
+            deleted_response = await client.get(f"/movies/{movie_id}")
+
+        # then
+        assert cached_response.content == first_response.content
+        movie_detail_stats = stats_response.json()["movie_detail"]
+        assert movie_detail_stats["hits"] == 1
+        assert movie_detail_stats["memory_bytes"] == len(first_response.content)
+        assert updated_response.json()["title"] == updated_title
+        assert deleted_response.status_code == status.HTTP_404_NOT_FOUND
+
+    async def test_api_get_movie_and_movies_with_etag(self) -> None:
+        # given
+        movie = await Movie.create(
+            title="test",
+            overview="test 중 입니다.",
+            cast="lee byeong heon, choi min sik",
+            runtime=240,
+            release_date="2021-02-01",
+        )
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            movie_response = await client.get(f"/movies/{movie.id}")
+            movies_response = await client.get("/movies", params={"limit": 10})
+
+            # when
+            not_modified_movie_response = await client.get(
+                f"/movies/{movie.id}", headers={"If-None-Match": movie_response.headers["ETag"]}
+            )
+            not_modified_movies_response = await client.get(
+                "/movies", params={"limit": 10}, headers={"If-None-Match": movies_response.headers["ETag"]}
+            )
+            other_query_response = await client.get(
+                "/movies", params={"limit": 20}, headers={"If-None-Match": movies_response.headers["ETag"]}
+            )
+            await client.patch(f"/movies/{movie.id}", json={"title": "updated_title"})
+            modified_movie_response = await client.get(
+                f"/movies/{movie.id}", headers={"If-None-Match": movie_response.headers["ETag"]}
+            )
+            modified_movies_response = await client.get(
+                "/movies", params={"limit": 10}, headers={"If-None-Match": movies_response.headers["ETag"]}
+            )
+
+        # then
+        assert not_modified_movie_response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert not_modified_movie_response.headers["ETag"] == movie_response.headers["ETag"]
+        assert not_modified_movies_response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert other_query_response.status_code == status.HTTP_200_OK
+        assert modified_movie_response.status_code == status.HTTP_200_OK
+        assert modified_movie_response.json()["title"] == "updated_title"
+        assert modified_movies_response.status_code == status.HTTP_200_OK
+        assert modified_movies_response.json()[0]["title"] == "updated_title"
+
+    async def test_api_get_movies_with_compression(self) -> None:
+        # given
+        await Movie.bulk_create(
+            [
+                Movie(
+                    title=f"test {i}",
+                    overview="test 중 입니다." * 10,
+                    cast="lee byeong heon, choi min sik",
+                    runtime=240,
+                    release_date="2021-02-01",
+                )
+                for i in range(20)
+            ]
+        )
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            # when
+            identity_response = await client.get("/movies", headers={"Accept-Encoding": "identity"})
+            gzip_response = await client.get("/movies", headers={"Accept-Encoding": "gzip"})
+            cached_gzip_response = await client.get("/movies", headers={"Accept-Encoding": "gzip"})
+            not_modified_response = await client.get(
+                "/movies", headers={"Accept-Encoding": "gzip", "If-None-Match": gzip_response.headers["ETag"]}
+            )
+            with patch.object(config, "COMPRESSION_MIN_BYTES", len(identity_response.content) + 1):
+                below_threshold_response = await client.get("/movies", headers={"Accept-Encoding": "gzip"})
+            stats_response = await client.get("/metrics/compression")
+            brotli_response = await client.get("/movies", headers={"Accept-Encoding": "gzip, br"})
+            zstd_response = await client.get("/movies", headers={"Accept-Encoding": "gzip, br, zstd"})
+            preferred_response = await client.get("/movies", headers={"Accept-Encoding": "zstd;q=0.5, br;q=0.8"})
+            unsupported_response = await client.get("/movies", headers={"Accept-Encoding": "deflate"})
+
+        # then
+        assert "content-encoding" not in identity_response.headers
+        # 같은 q 값이면 zstd > br > gzip 순으로 고르고, q 값이 다르면 높은 쪽을 고른다
+        # httpx 는 br / zstd 응답을 brotli / zstandard 로 풀어서 돌려준다
+        for response in (brotli_response, zstd_response):
+            assert int(response.headers["Content-Length"]) < len(identity_response.content)
+            assert response.content == identity_response.content
+        assert brotli_response.headers["Content-Encoding"] == "br"
+        assert zstd_response.headers["Content-Encoding"] == "zstd"
+        assert preferred_response.headers["Content-Encoding"] == "br"
+        assert "content-encoding" not in unsupported_response.headers
+        assert identity_response.headers["Vary"] == "Accept-Encoding"
+        assert gzip_response.headers["Content-Encoding"] == "gzip"
+        assert gzip_response.headers["ETag"] == f"W/{identity_response.headers['ETag']}"
+        assert int(gzip_response.headers["Content-Length"]) < len(identity_response.content)
+        assert gzip_response.json() == identity_response.json()
+        assert cached_gzip_response.json() == identity_response.json()
+        assert not_modified_response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert "content-encoding" not in below_threshold_response.headers
+        route_stats = stats_response.json()["GET /movies"]
+        assert route_stats["responses"] == 2
+        assert route_stats["cache_hits"] == 1
+        assert route_stats["original_bytes"] == 2 * len(identity_response.content)
+        assert route_stats["compression_ratio"] < 1
+
+    async def test_api_get_movies_and_movie_with_sparse_fields(self) -> None:
+        # given
+        movies = [
+            await Movie.create(
+                title=f"test{i}",
+                overview="test 중 입니다.",
+                cast="lee byeong heon, choi min sik",
+                runtime=240,
+                release_date=f"2021-02-0{i + 1}",
+            )
+            for i in range(3)
+        ]
+        await movies[0].genres.add(self.genres[0])
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            # when
+            list_response = await client.get(
+                "/movies", params={"fields": "title,genres_str", "order_by": "-release_date", "limit": 2}
+            )
+            next_response = await client.get(
+                "/movies",
+                params={
+                    "fields": "title,genres_str",
+                    "order_by": "-release_date",
+                    "limit": 2,
+                    "cursor": list_response.headers["X-Next-Cursor"],
+                },
+            )
+            detail_response = await client.get(f"/movies/{movies[0].id}", params={"fields": "poster_image_url,genres"})
+            invalid_response = await client.get("/movies", params={"fields": "title,unknown"})
+
+        # then
+        assert list_response.status_code == status.HTTP_200_OK
+        assert list_response.json() == [
+            {"id": movies[2].id, "title": movies[2].title, "genres_str": []},
+            {"id": movies[1].id, "title": movies[1].title, "genres_str": []},
+        ]
+        assert next_response.json() == [{"id": movies[0].id, "title": movies[0].title, "genres_str": ["test genre0"]}]
+        assert detail_response.json() == {"id": movies[0].id, "genres": [self.genres[0].id], "poster_image_url": None}
+        assert "ETag" in detail_response.headers
+        assert invalid_response.status_code == status.HTTP_400_BAD_REQUEST
+
     async def test_api_update_movie_when_movie_id_is_invalid(self) -> None:
         # when
         async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
@@ -304,3 +792,85 @@ class TestMovieRouter(TestCase):
 
         # 리소스 정리
         os.remove(second_file_path)
+
+
+class TestMovieTitleSearch(TruncationTestCase):
+    """InnoDB FULLTEXT 인덱스는 커밋된 행만 검색하므로 트랜잭션 롤백 대신 truncate 로 격리한다"""
+
+    async def asyncSetUp(self) -> None:
+        await super().asyncSetUp()
+        self.genres = [await Genre.create(name=f"test genre{i}", external_id=i) for i in range(3)]
+
+    async def test_api_get_movies_when_query_param_is_not_none(self) -> None:
+        # given
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            await client.post(
+                "/movies",
+                json={
+                    "title": (title := "test"),
+                    "overview": (overview := "test 중 입니다."),
+                    "cast": (cast := "lee byeong heon, choi min sik"),
+                    "runtime": (runtime := 240),
+                    "genre_ids": (genre_ids := [genre.id for genre in self.genres]),
+                    "release_date": (release_date := "2021-02-01"),
+                },
+            )
+
+            # when
+            response = await client.get(
+                url="/movies", params={"title": title, "genre_ids": [genre.id for genre in self.genres[:2]]}
+            )
+
+        # then
+        assert response.status_code == status.HTTP_200_OK
+        response_json = response.json()
+        assert len(response_json) == 1
+        assert response_json[0]["title"] == title
+        assert response_json[0]["overview"] == overview
+        assert response_json[0]["cast"] == cast
+        assert response_json[0]["genres"] == genre_ids
+        assert response_json[0]["runtime"] == runtime
+        assert response_json[0]["release_date"] == release_date
+
+    async def test_api_get_movies_by_korean_title_ordered_by_relevance(self) -> None:
+        # given
+        # "어벤트" 는 ngram 토큰(어벤) 하나만 겹치므로 검색되지 않아야 한다
+        for title in ("어벤져스: 엔드게임", "기생충", "어벤트", "어벤져스", "어벤져스 대 어벤져스"):
+            await Movie.create(
+                title=title,
+                overview="test 중 입니다.",
+                cast="lee byeong heon, choi min sik",
+                runtime=240,
+                release_date="2021-02-01",
+            )
+
+        # when
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get(url="/movies", params={"title": "어벤져스"})
+
+        # then
+        assert response.status_code == status.HTTP_200_OK
+        # 검색어가 두 번 나오는 제목이 먼저, 관련도가 같으면 최신순
+        titles = [movie["title"] for movie in response.json()]
+        assert titles == ["어벤져스 대 어벤져스", "어벤져스", "어벤져스: 엔드게임"]
+
+    async def test_api_get_movies_by_english_title_containing_stopword_letters(self) -> None:
+        # given
+        # InnoDB 기본 stopword("a", "i")가 켜져 있으면 ngram 토큰 ta, an, ar 등이 인덱스에 없어 검색되지 않는다
+        for title in ("Titanic", "Parasite", "Avatar"):
+            await Movie.create(
+                title=title,
+                overview="test 중 입니다.",
+                cast="lee byeong heon, choi min sik",
+                runtime=240,
+                release_date="2021-02-01",
+            )
+
+        # when
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            titanic_response = await client.get(url="/movies", params={"title": "titan"})
+            parasite_response = await client.get(url="/movies", params={"title": "ARA"})
+
+        # then
+        assert [movie["title"] for movie in titanic_response.json()] == ["Titanic"]
+        assert [movie["title"] for movie in parasite_response.json()] == ["Parasite"]
@@ -1,11 +1,20 @@
+import asyncio
+import time
+from unittest.mock import patch
+
 import httpx
 from fastapi import status
 from tortoise.contrib.test import TestCase
 
 from main import app
+from src.models.likes import ReviewLike
 from src.models.movies import Movie
+from src.models.reviews import Review
 from src.models.users import GenderEnum, User
 from src.services.auth import AuthService
+from src.services.engagement_counters import reconcile_engagement_counters
+from src.services.entity_versions import entity_versions, review_key
+from src.services.top_reviews import TOP_REVIEW_COLUMNS, TopReviewIndex
 from src.tests.utils.cleanup_test_files import remove_test_files
 from src.tests.utils.fake_file import fake_image
 
@@ -176,6 +185,49 @@ class TestReviewRouter(TestCase):
 
         assert delete_response.status_code == status.HTTP_204_NO_CONTENT
 
+    async def test_create_and_delete_review_updates_movie_review_count(self) -> None:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            # given
+            await self._test_user_login(client=client)
+
+            # when
+            create_response = await client.post(
+                "/reviews",
+                data={"movie_id": self.movies[0].id, "title": "test review", "content": "test review content"},
+            )
+            created_movie_response = await client.get(f"/movies/{self.movies[0].id}")
+            await client.delete(f"/reviews/{create_response.json()['id']}")
+            deleted_movie_response = await client.get(f"/movies/{self.movies[0].id}")
+
+        # then
+        assert created_movie_response.json()["review_count"] == 1
+        assert deleted_movie_response.json()["review_count"] == 0
+
+    async def test_reconcile_engagement_counters(self) -> None:
+        # given
+        other_user = await User.create(
+            username="other_user", hashed_password=self.user.hashed_password, age=30, gender=GenderEnum.FEMALE
+        )
+        review = await Review.create(user_id=self.user.id, movie_id=self.movies[0].id, title="test", content="test")
+        other_review = await Review.create(
+            user_id=other_user.id, movie_id=self.movies[0].id, title="test", content="test"
+        )
+        await ReviewLike.create(user_id=other_user.id, review_id=review.id)
+        await ReviewLike.create(user_id=self.user.id, review_id=other_review.id, is_liked=False)
+        # 카운터를 거치지 않고 만든 행이라 like_count / review_count 가 어긋나 있다
+        await Review.filter(id=other_review.id).update(like_count=5)
+
+        # when
+        repaired = await reconcile_engagement_counters()
+        repaired_again = await reconcile_engagement_counters()
+
+        # then
+        assert repaired == {"reviews": 2, "movies": 1}
+        assert repaired_again == {"reviews": 0, "movies": 0}
+        assert (await Review.get(id=review.id)).like_count == 1
+        assert (await Review.get(id=other_review.id)).like_count == 0
+        assert (await Movie.get(id=self.movies[0].id)).review_count == 2
+
     async def test_delete_review_when_review_does_not_exist(self) -> None:
         async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
             # 유저 로그인
@@ -218,7 +270,10 @@ class TestReviewRouter(TestCase):
             response = await client.get(f"/movies/{self.movies[0].id}/reviews")
 
             assert response.status_code == status.HTTP_200_OK
+            # 기본 정렬은 최신순
             response_json = response.json()
+            users.reverse()
+            reviews.reverse()
             for i, review in enumerate(response_json):
                 assert review["movie_id"] == self.movies[0].id
                 assert review["user_id"] == users[i].id
@@ -226,6 +281,268 @@ class TestReviewRouter(TestCase):
                 assert review["content"] == reviews[i]["content"]
                 assert reviews[i]["review_image_url"] == review["review_image_url"]
 
+    async def test_get_movie_reviews_and_review_with_etag(self) -> None:
+        # given
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            await self._test_user_login(client=client)
+            create_response = await client.post(
+                "/reviews",
+                data={"movie_id": self.movies[0].id, "title": "test review", "content": "test review content"},
+            )
+            review_id = create_response.json()["id"]
+            reviews_response = await client.get(f"/movies/{self.movies[0].id}/reviews")
+            review_response = await client.get(f"/reviews/{review_id}")
+
+            # when
+            not_modified_reviews_response = await client.get(
+                f"/movies/{self.movies[0].id}/reviews", headers={"If-None-Match": reviews_response.headers["ETag"]}
+            )
+            not_modified_review_response = await client.get(
+                f"/reviews/{review_id}", headers={"If-None-Match": review_response.headers["ETag"]}
+            )
+            await client.patch(f"/reviews/{review_id}", data={"update_title": "updated title"})
+            modified_reviews_response = await client.get(
+                f"/movies/{self.movies[0].id}/reviews", headers={"If-None-Match": reviews_response.headers["ETag"]}
+            )
+            modified_review_response = await client.get(
+                f"/reviews/{review_id}", headers={"If-None-Match": review_response.headers["ETag"]}
+            )
+
+        # then
+        assert not_modified_reviews_response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert not_modified_reviews_response.content == b""
+        assert not_modified_review_response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert modified_reviews_response.status_code == status.HTTP_200_OK
+        assert modified_reviews_response.json()[0]["title"] == "updated title"
+        assert modified_review_response.status_code == status.HTTP_200_OK
+        assert modified_review_response.headers["ETag"] != review_response.headers["ETag"]
+
+    async def test_get_review_and_movie_reviews_with_if_none_match_when_they_do_not_exist(self) -> None:
+        # given
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            await self._test_user_login(client=client)
+            create_response = await client.post(
+                "/reviews",
+                data={"movie_id": self.movies[0].id, "title": "test review", "content": "test review content"},
+            )
+            review_id = create_response.json()["id"]
+            review_etag = (await client.get(f"/reviews/{review_id}")).headers["ETag"]
+            reviews_etag = (await client.get(f"/movies/{self.movies[0].id}/reviews")).headers["ETag"]
+            # 영화를 지우면 리뷰도 함께 지워진다
+            await client.delete(f"/movies/{self.movies[0].id}")
+
+            # when
+            deleted_review_response = await client.get(f"/reviews/{review_id}", headers={"If-None-Match": review_etag})
+            missing_review_response = await client.get("/reviews/99999", headers={"If-None-Match": "*"})
+            deleted_movie_reviews_response = await client.get(
+                f"/movies/{self.movies[0].id}/reviews", headers={"If-None-Match": reviews_etag}
+            )
+            missing_movie_reviews_response = await client.get("/movies/99999/reviews", headers={"If-None-Match": "*"})
+            unconditional_missing_movie_reviews_response = await client.get("/movies/99999/reviews")
+            empty_movie_reviews_response = await client.get(f"/movies/{self.movies[1].id}/reviews")
+
+        # then
+        assert deleted_review_response.status_code == status.HTTP_404_NOT_FOUND
+        assert missing_review_response.status_code == status.HTTP_404_NOT_FOUND
+        # 같은 프로세스의 리뷰 ETag 버전도 올라갔다
+        assert entity_versions.etag(review_key(review_id)) != review_etag
+        assert deleted_movie_reviews_response.status_code == status.HTTP_404_NOT_FOUND
+        assert missing_movie_reviews_response.status_code == status.HTTP_404_NOT_FOUND
+        assert unconditional_missing_movie_reviews_response.status_code == status.HTTP_404_NOT_FOUND
+        assert empty_movie_reviews_response.status_code == status.HTTP_200_OK
+        assert empty_movie_reviews_response.json() == []
+
+    async def test_get_movie_reviews_with_cursor_pagination(self) -> None:
+        # given
+        users = [
+            await User.create(username=f"pageuser{i}", hashed_password="-", age=20, gender=GenderEnum.MALE)
+            for i in range(5)
+        ]
+        reviews = [
+            await Review.create(
+                user_id=user.id, movie_id=self.movies[0].id, title=f"review {i}", content="content", like_count=i % 3
+            )
+            for i, user in enumerate(users)
+        ]
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            # when
+            pages: dict[str, list[int]] = {}
+            for order_by in ("-id", "-like_count"):
+                params: dict[str, str | int] = {"order_by": order_by, "limit": 2}
+                pages[order_by] = []
+                while True:
+                    response = await client.get(f"/movies/{self.movies[0].id}/reviews", params=params)
+                    assert response.status_code == status.HTTP_200_OK
+                    pages[order_by] += [review["id"] for review in response.json()]
+                    if "X-Next-Cursor" not in response.headers:
+                        break
+                    params["cursor"] = response.headers["X-Next-Cursor"]
+
+            invalid_cursor_response = await client.get(
+                f"/movies/{self.movies[0].id}/reviews", params={"order_by": "-like_count", "cursor": "invalid"}
+            )
+
+        # then
+        assert pages["-id"] == [review.id for review in reversed(reviews)]
+        # like_count: 0, 1, 2, 0, 1 -> 좋아요 수가 같으면 최신순
+        assert pages["-like_count"] == [reviews[i].id for i in (2, 4, 1, 3, 0)]
+        assert invalid_cursor_response.status_code == status.HTTP_400_BAD_REQUEST
+
+    async def test_get_movie_reviews_with_is_liked_in_two_queries(self) -> None:
+        # given
+        reviews = [
+            await Review.create(
+                user_id=(
+                    await User.create(username=f"author{i}", hashed_password="-", age=20, gender=GenderEnum.MALE)
+                ).id,
+                movie_id=self.movies[0].id,
+                title=f"review {i}",
+                content="content",
+            )
+            for i in range(3)
+        ]
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            anonymous_response = await client.get(f"/movies/{self.movies[0].id}/reviews")
+            await self._test_user_login(client=client)
+            await client.post(f"/likes/reviews/{reviews[1].id}/like")
+            etag = (await client.get(f"/movies/{self.movies[0].id}/reviews")).headers["ETag"]
+            await client.post(f"/likes/reviews/{reviews[0].id}/like")
+
+            # when
+            db = Review._meta.db
+            with (
+                patch.object(db, "execute_query", wraps=db.execute_query) as execute_query,
+                patch.object(db, "execute_query_dict", wraps=db.execute_query_dict) as execute_query_dict,
+            ):
+                response = await client.get(f"/movies/{self.movies[0].id}/reviews", headers={"If-None-Match": etag})
+
+        # then
+        assert anonymous_response.status_code == status.HTTP_200_OK
+        assert [review["is_liked"] for review in anonymous_response.json()] == [None, None, None]
+        # 좋아요를 바꾸면 그 유저의 목록 ETag 도 바뀐다
+        assert response.status_code == status.HTTP_200_OK
+        assert execute_query.call_count + execute_query_dict.call_count == 2
+        assert [(review["is_liked"], review["like_count"]) for review in response.json()] == [
+            (False, 0),
+            (True, 1),
+            (True, 1),
+        ]
+
+    async def test_get_movie_top_reviews(self) -> None:
+        # given
+        reviews = [
+            await Review.create(
+                user_id=(
+                    await User.create(username=f"topuser{i}", hashed_password="-", age=20, gender=GenderEnum.MALE)
+                ).id,
+                movie_id=self.movies[0].id,
+                title=f"review {i}",
+                content="content",
+            )
+            for i in range(3)
+        ]
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            initial_response = await client.get(f"/movies/{self.movies[0].id}/reviews/top")
+            await self._test_user_login(client=client)
+            await client.post(f"/likes/reviews/{reviews[0].id}/like")
+
+            # when
+            db = Review._meta.db
+            with (
+                patch.object(db, "execute_query", wraps=db.execute_query) as execute_query,
+                patch.object(db, "execute_query_dict", wraps=db.execute_query_dict) as execute_query_dict,
+            ):
+                liked_response = await client.get(f"/movies/{self.movies[0].id}/reviews/top", params={"limit": 2})
+
+            await client.post(f"/likes/reviews/{reviews[0].id}/unlike")
+            create_response = await client.post(
+                "/reviews", data={"movie_id": self.movies[0].id, "title": "my review", "content": "content"}
+            )
+            created_response = await client.get(f"/movies/{self.movies[0].id}/reviews/top")
+            await client.delete(f"/reviews/{create_response.json()['id']}")
+            deleted_response = await client.get(f"/movies/{self.movies[0].id}/reviews/top")
+
+        # then
+        assert [review["id"] for review in initial_response.json()] == [review.id for review in reversed(reviews)]
+        # 조회는 메모리의 인덱스만 읽는다
+        assert execute_query.call_count + execute_query_dict.call_count == 0
+        assert [(review["id"], review["like_count"]) for review in liked_response.json()] == [
+            (reviews[0].id, 1),
+            (reviews[2].id, 0),
+        ]
+        assert [review["id"] for review in created_response.json()] == [
+            create_response.json()["id"],
+            *[review.id for review in reversed(reviews)],
+        ]
+        assert [review["id"] for review in deleted_response.json()] == [review.id for review in reversed(reviews)]
+
+    async def test_top_review_index_reloads_movie_when_outranked_by_untracked_reviews(self) -> None:
+        # given
+        index = TopReviewIndex(per_movie=1, refresh_seconds=600)
+        reviews = [
+            await Review.create(
+                user_id=(
+                    await User.create(username=f"rankuser{i}", hashed_password="-", age=20, gender=GenderEnum.MALE)
+                ).id,
+                movie_id=self.movies[0].id,
+                title=f"review {i}",
+                content="content",
+                like_count=like_count,
+            )
+            for i, like_count in enumerate((3, 2, 1, 0))
+        ]
+        await index.build()
+        top_before = index.top(self.movies[0].id, 1)
+
+        # when
+        # 상위 두 리뷰의 좋아요가 모두 취소되면 배열 밖에 있던 reviews[2] 가 1위가 된다
+        for review in reviews[:2]:
+            await Review.filter(id=review.id).update(like_count=0)
+            await index.set_review((await Review.filter(id=review.id).values(*TOP_REVIEW_COLUMNS))[0])
+
+        # then
+        assert [row["id"] for row in top_before] == [reviews[0].id]
+        assert [(row["id"], row["like_count"]) for row in index.top(self.movies[0].id, 1)] == [(reviews[2].id, 1)]
+
+    async def test_top_review_index_refreshes_once_and_reapplies_changes_made_during_build(self) -> None:
+        # given
+        index = TopReviewIndex(per_movie=10, refresh_seconds=600)
+        other_user = await User.create(username="otheruser", hashed_password="-", age=20, gender=GenderEnum.MALE)
+        reviews = [
+            await Review.create(user_id=user.id, movie_id=self.movies[0].id, title="title", content="content")
+            for user in (self.user, other_user)
+        ]
+        await index.build()
+        liked_row = {**(await Review.filter(id=reviews[0].id).values(*TOP_REVIEW_COLUMNS))[0], "like_count": 1}
+        execute_query_dict = Review._meta.db.execute_query_dict
+
+        async def execute_query_dict_while_review_is_liked(query: str) -> list[dict[str, object]]:
+            rows = await execute_query_dict(query)
+            # DB 를 읽은 뒤 다른 요청이 좋아요를 누른다
+            await index.set_review(liked_row)
+            return rows
+
+        # when
+        index.built_at = time.monotonic() - 601
+        with patch.object(
+            Review._meta.db, "execute_query_dict", side_effect=execute_query_dict_while_review_is_liked
+        ) as mock_execute_query_dict:
+            await asyncio.gather(index.ensure_built(), index.ensure_built())
+            top_during_refresh = index.top(self.movies[0].id, 10)
+            assert index._refresh_task is not None
+            await index._refresh_task
+
+        # then
+        assert mock_execute_query_dict.call_count == 1
+        assert [row["id"] for row in top_during_refresh] == [reviews[1].id, reviews[0].id]
+        assert [(row["id"], row["like_count"]) for row in index.top(self.movies[0].id, 10)] == [
+            (reviews[0].id, 1),
+            (reviews[1].id, 0),
+        ]
+
     async def test_get_my_reviews(self) -> None:
         # given
         async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
@@ -1,14 +1,20 @@
 import os
+import tempfile
+import time
+from unittest.mock import patch
 
 import httpx
-from fastapi import status
+from fastapi import APIRouter, Depends, status
 from tortoise.contrib.test import TestCase
 
 from main import app
 from src.configs import config
+from src.dependencies.auth import login_required
+from src.middleware.auth import AuthRouteTable
 from src.models.users import GenderEnum, User
-from src.services.auth import AuthService
+from src.services.auth import AuthService, password_hash_pool
 from src.services.jwt import JWTService
+from src.services.token_revocation import TokenRevocationStore
 from src.tests.utils.fake_file import fake_image, fake_txt_file
 from src.utils.file import IMAGE_EXTENSIONS
 
@@ -84,6 +90,149 @@ class TestUserRouter(TestCase):
             assert response.status_code == status.HTTP_401_UNAUTHORIZED
             assert response.json()["detail"] == "password incorrect."
 
+    async def test_api_login_user_when_password_hash_pool_is_saturated(self) -> None:
+        # given
+        await User.create(
+            username=(username := "testuser"),
+            hashed_password=AuthService().hash_password((password := "password123")),
+            age=20,
+            gender=GenderEnum.MALE,
+        )
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            # when
+            with patch.object(password_hash_pool, "max_pending", 0):
+                response = await client.post(url="/users/login", json={"username": username, "password": password})
+
+        # then
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+
+    async def test_api_refresh_access_token(self) -> None:
+        # given
+        user = await User.create(
+            username="testuser",
+            hashed_password=AuthService().hash_password("password123"),
+            age=20,
+            gender=GenderEnum.MALE,
+        )
+        refresh_token = JWTService().create_refresh_token({"user_id": user.id})
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            # when
+            response = await client.post(url="/users/token/refresh", cookies={"refresh_token": refresh_token})
+            access_token = response.cookies.get("access_token")
+            assert access_token is not None
+            me_response = await client.get(url="/users/me", cookies={"access_token": access_token})
+
+        # then
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert response.cookies.get("refresh_token") is None
+        assert me_response.status_code == status.HTTP_200_OK
+        assert me_response.json()["id"] == user.id
+
+    async def test_api_refresh_access_token_with_rotation(self) -> None:
+        # given
+        user = await User.create(
+            username="testuser",
+            hashed_password=AuthService().hash_password("password123"),
+            age=20,
+            gender=GenderEnum.MALE,
+        )
+        refresh_token = JWTService().create_refresh_token({"user_id": user.id})
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            # when
+            with patch.object(config, "JWT_REFRESH_TOKEN_ROTATION", True):
+                response = await client.post(url="/users/token/refresh", cookies={"refresh_token": refresh_token})
+
+        # then
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert response.cookies.get("access_token") is not None
+        assert response.cookies.get("refresh_token") is not None
+
+    async def test_api_refresh_access_token_when_use_access_token(self) -> None:
+        # given
+        user = await User.create(
+            username="testuser",
+            hashed_password=AuthService().hash_password("password123"),
+            age=20,
+            gender=GenderEnum.MALE,
+        )
+        access_token = JWTService().create_access_token({"user_id": user.id})
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            # when
+            response = await client.post(url="/users/token/refresh", cookies={"refresh_token": access_token})
+            me_response = await client.get(
+                url="/users/me", cookies={"access_token": JWTService().create_refresh_token({"user_id": user.id})}
+            )
+
+        # then
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert response.json()["detail"] == "Invalid Refresh Token."
+        assert me_response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    async def test_api_refresh_access_token_when_refresh_token_is_missing(self) -> None:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.post(url="/users/token/refresh")
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    async def test_api_logout(self) -> None:
+        # given
+        await User.create(
+            username=(username := "testuser"),
+            hashed_password=AuthService().hash_password((password := "password123")),
+            age=20,
+            gender=GenderEnum.MALE,
+        )
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            login_response = await client.post(url="/users/login", json={"username": username, "password": password})
+            access_token = login_response.cookies["access_token"]
+            refresh_token = login_response.cookies["refresh_token"]
+
+            # when
+            response = await client.post(url="/users/logout")
+
+            # 로그아웃 이전에 발급된 토큰은 더 이상 사용할 수 없다
+            me_response = await client.get(url="/users/me", cookies={"access_token": access_token})
+            refresh_response = await client.post(url="/users/token/refresh", cookies={"refresh_token": refresh_token})
+            stats_response = await client.get(url="/metrics/token_revocation")
+
+        # then
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert me_response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert me_response.json()["detail"] == "Revoked Access Token."
+        assert refresh_response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert refresh_response.json()["detail"] == "Revoked Refresh Token."
+        assert stats_response.json()["revoked_tokens"] >= 2
+
+    async def test_token_revocation_is_shared_between_workers(self) -> None:
+        # given: 같은 파일을 쓰는 두 워커
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, "revoked_tokens.log")
+            worker_a = TokenRevocationStore(file_path, capacity=100, error_rate=0.01)
+            worker_b = TokenRevocationStore(file_path, capacity=100, error_rate=0.01)
+            await worker_a.load()
+            await worker_b.load()
+            expires_at = time.time() + 60
+
+            # when
+            await worker_a.revoke("jti-a", expires_at)
+            await worker_b.sync()
+            # worker_b 의 compaction 이 worker_a 가 쓴 항목을 지우지 않는다
+            await worker_b.revoke("jti-b", expires_at)
+            await worker_b.prune()
+            await worker_a.revoke("jti-c", expires_at)
+            await worker_b.sync()
+            restarted = TokenRevocationStore(file_path, capacity=100, error_rate=0.01)
+            await restarted.load()
+
+        # then
+        assert all(worker_b.is_revoked(jti) for jti in ("jti-a", "jti-b", "jti-c"))
+        assert all(restarted.is_revoked(jti) for jti in ("jti-a", "jti-b", "jti-c"))
+
     async def test_api_get_all_users(self) -> None:
         # given
         async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
@@ -152,6 +301,40 @@ class TestUserRouter(TestCase):
 
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
 
+    async def test_api_get_user_when_middleware_did_not_authenticate(self) -> None:
+        # 라우트 테이블이 인증 대상으로 보지 못한 요청도 login_required 가 401 로 막는다
+        with patch.object(AuthRouteTable, "requires_auth", return_value=False):
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                response = await client.get(url="/users/me")
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    async def test_auth_route_table_resolves_routes_in_registration_order(self) -> None:
+        # given
+        async def endpoint() -> None:
+            pass
+
+        router = APIRouter()
+        # /items/{item_id} 가 먼저 등록되어 /items/public 을 가로챈다
+        router.add_api_route("/items/{item_id}", endpoint, dependencies=[Depends(login_required)])
+        router.add_api_route("/items/public", endpoint)
+        # /books/public 이 먼저 등록되어 /books/{book_id} 보다 먼저 매칭된다
+        router.add_api_route("/books/public", endpoint)
+        router.add_api_route("/books/{book_id}", endpoint, dependencies=[Depends(login_required)])
+
+        # when
+        table = AuthRouteTable(router.routes)
+
+        # then
+        def requires_auth(method: str, path: str) -> bool:
+            return table.requires_auth({"type": "http", "method": method, "path": path, "root_path": ""})
+
+        assert requires_auth("GET", "/items/public")
+        assert not requires_auth("GET", "/books/public")
+        assert requires_auth("GET", "/books/1")
+        # 공개 라우트가 받지 않는 메서드는 동적 라우트가 받는다
+        assert requires_auth("POST", "/books/public")
+
     async def test_api_get_user_when_token_encoded_using_invalid_user_id(self) -> None:
         access_token = JWTService().create_access_token({"user_id": 31241312312})
         async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
@@ -160,6 +343,30 @@ class TestUserRouter(TestCase):
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
         assert response.json()["detail"] == "Invalid Access Token."
 
+    async def test_api_get_user_when_cached_access_token_is_expired(self) -> None:
+        # given
+        user = await User.create(
+            username="testuser",
+            hashed_password=AuthService().hash_password("password123"),
+            age=20,
+            gender=GenderEnum.MALE,
+        )
+        access_token = JWTService().create_access_token({"user_id": user.id})
+        expires_in = config.JWT_ACCESS_TOKEN_EXPIRE_MINUTES * 60
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            # 첫 요청에서 검증된 토큰이 캐시된다
+            first_response = await client.get(url="/users/me", cookies={"access_token": access_token})
+
+            # when
+            with patch("src.services.jwt.time.time", return_value=time.time() + expires_in + 1):
+                response = await client.get(url="/users/me", cookies={"access_token": access_token})
+
+        # then
+        assert first_response.status_code == status.HTTP_200_OK
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert response.json()["detail"] == "Signature has expired"
+
     async def test_api_get_user_when_user_is_not_logged_in(self) -> None:
         # when
         async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
@@ -213,6 +420,36 @@ class TestUserRouter(TestCase):
         # then
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
 
+    async def test_api_get_user_after_update_user(self) -> None:
+        # given
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            await client.post(
+                url="/users",
+                json={
+                    "username": (username := "testuser"),
+                    "password": (password := "password123"),
+                    "age": 20,
+                    "gender": GenderEnum.MALE,
+                },
+            )
+            await client.post(url="/users/login", json={"username": username, "password": password})
+            # 두번째 요청부터는 캐시된 유저를 사용
+            await client.get(url="/users/me")
+            await client.get(url="/users/me")
+
+            # when
+            await client.patch(url="/users/me", json={"age": (updated_age := 30)})
+            response = await client.get(url="/users/me")
+            stats_response = await client.get(url="/metrics/caches")
+
+        # then
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["age"] == updated_age
+
+        user_cache_stats = stats_response.json()["users"]
+        assert user_cache_stats["hits"] >= 1
+        assert user_cache_stats["misses"] >= 2
+
     async def test_api_delete_user(self) -> None:
         # given
         async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
@@ -0,0 +1,85 @@
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+# 이름 -> 캐시. /metrics/caches 에서 통계를 노출할 때 사용한다
+CACHE_REGISTRY: dict[str, "LRUCache[Any, Any]"] = {}
+
+
+class LRUCache(Generic[K, V]):
+    """크기 제한(LRU)과 선택적인 TTL 을 가지는 프로세스 내 캐시.
+
+    sizeof 를 넘기면 값의 크기(bytes) 합계를 memory_bytes 로 추적한다.
+    """
+
+    def __init__(
+        self, name: str, maxsize: int, ttl: float | None = None, sizeof: Callable[[V], int] | None = None
+    ) -> None:
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.sizeof = sizeof
+        self.hits = 0
+        self.misses = 0
+        self.memory_bytes = 0
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        CACHE_REGISTRY[name] = self
+
+    def get(self, key: K) -> V | None:
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            self._pop(key)
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: K, value: V, ttl: float | None = None) -> None:
+        """ttl 을 넘기면 캐시 기본 TTL 대신 해당 항목에만 적용한다"""
+        ttl = ttl if ttl is not None else self.ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else float("inf")
+        self._pop(key)
+        self._data[key] = (expires_at, value)
+        if self.sizeof is not None:
+            self.memory_bytes += self.sizeof(value)
+        if len(self._data) > self.maxsize:
+            self._pop(next(iter(self._data)))
+
+    def _pop(self, key: K) -> None:
+        item = self._data.pop(key, None)
+        if item is not None and self.sizeof is not None:
+            self.memory_bytes -= self.sizeof(item[1])
+
+    def invalidate(self, key: K) -> None:
+        self._pop(key)
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+        self.memory_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+            "memory_bytes": self.memory_bytes if self.sizeof is not None else None,
+        }
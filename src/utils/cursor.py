@@ -0,0 +1,26 @@
+import base64
+import binascii
+import json
+from typing import Any
+
+
+class InvalidCursor(Exception):
+    def __init__(self) -> None:
+        super().__init__("invalid cursor.")
+
+
+def encode_cursor(values: dict[str, Any]) -> str:
+    """keyset pagination 의 마지막 행 정보를 클라이언트에 넘길 불투명한 문자열로 인코딩"""
+    raw = json.dumps(values, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict[str, Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, ValueError):
+        raise InvalidCursor()
+    if not isinstance(values, dict):
+        raise InvalidCursor()
+    return values
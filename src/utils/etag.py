@@ -0,0 +1,52 @@
+import hashlib
+import secrets
+import time
+
+from fastapi import HTTPException, Request
+
+
+class EntityVersions:
+    """엔티티별 버전 카운터. 쓰기 시 bump 하고, ETag 는 응답 본문 대신 (epoch, 버전) 으로 만든다.
+
+    카운터는 프로세스 메모리에만 있으므로 epoch 를 ETag 에 섞어 재시작 전에 발급한 ETag 와 겹치지 않게 한다.
+    다른 프로세스(크롤러 등)의 쓰기는 bump 할 수 없으므로 epoch_seconds 마다 epoch 를 바꾸고 카운터를 비운다.
+    """
+
+    def __init__(self, epoch_seconds: int) -> None:
+        self.epoch_seconds = epoch_seconds
+        self._versions: dict[str, int] = {}
+        self._rotate()
+
+    def _rotate(self) -> None:
+        self._epoch = secrets.token_hex(8)
+        self._epoch_started_at = time.monotonic()
+        self._versions.clear()
+
+    def bump(self, *keys: str) -> None:
+        for key in keys:
+            self._versions[key] = self._versions.get(key, 0) + 1
+
+    def etag(self, *keys: str, variant: str = "") -> str:
+        """keys 의 버전과 variant(쿼리 문자열 등) 로 만든 strong ETag"""
+        if time.monotonic() - self._epoch_started_at > self.epoch_seconds:
+            self._rotate()
+
+        raw = ":".join([self._epoch, *(f"{key}={self._versions.get(key, 0)}" for key in keys), variant])
+        return f'"{hashlib.sha256(raw.encode()).hexdigest()[:32]}"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """If-None-Match 가 etag 와 일치하는지"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is None:
+        return False
+
+    # If-None-Match 는 weak comparison 을 사용한다
+    candidates = {candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def raise_if_not_modified(request: Request, etag: str) -> None:
+    """If-None-Match 가 etag 와 일치하면 본문 없이 304 Not Modified 로 응답한다"""
+    if is_not_modified(request, etag):
+        raise HTTPException(status_code=304, headers={"ETag": etag})
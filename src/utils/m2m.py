@@ -0,0 +1,72 @@
+from typing import Any, Iterable, Mapping, cast
+
+from pypika.queries import Table
+from pypika.terms import Criterion
+from tortoise.fields.relational import ManyToManyFieldInstance
+from tortoise.models import Model
+
+
+def _get_m2m_field(model: type[Model], field_name: str) -> ManyToManyFieldInstance[Any]:
+    return cast(ManyToManyFieldInstance[Any], model._meta.fields_map[field_name])
+
+
+async def get_related_ids(
+    model: type[Model], field_name: str, pks: Iterable[int] | None = None
+) -> dict[int, list[int]]:
+    """연결 테이블만 조회하여 pk -> 연결된 id 목록(오름차순)을 반환 (pks 가 None 이면 전체)"""
+    field = _get_m2m_field(model, field_name)
+    through_table = Table(field.through)
+    backward_column, forward_column = through_table[field.backward_key], through_table[field.forward_key]
+
+    query = model._meta.db.query_class.from_(through_table).select(backward_column, forward_column)
+    if pks is not None:
+        pks = list(pks)
+        if not pks:
+            return {}
+        query = query.where(backward_column.isin(pks))
+
+    _, rows = await model._meta.db.execute_query(*query.get_parameterized_sql())
+    related_ids_by_pk: dict[int, list[int]] = {pk: [] for pk in pks or ()}
+    for row in rows:
+        related_ids_by_pk.setdefault(row[field.backward_key], []).append(row[field.forward_key])
+    for related_ids in related_ids_by_pk.values():
+        related_ids.sort()
+    return related_ids_by_pk
+
+
+async def sync_related_ids(
+    model: type[Model], field_name: str, related_ids_by_pk: Mapping[int, Iterable[int]]
+) -> tuple[int, int]:
+    """M2M 연결을 목표 상태로 맞춘다.
+
+    clear() 후 add() 하는 대신 현재 연결과의 차집합을 구해 바뀐 행만 한 번의 DELETE 와 한 번의 multi-row INSERT 로 반영한다.
+    (삭제된 행 수, 추가된 행 수) 를 반환한다.
+    """
+    field = _get_m2m_field(model, field_name)
+    through_table = Table(field.through)
+    backward_column, forward_column = through_table[field.backward_key], through_table[field.forward_key]
+    db = model._meta.db
+
+    current_ids_by_pk = await get_related_ids(model, field_name, related_ids_by_pk.keys())
+    removed: list[tuple[int, list[int]]] = []
+    added: list[tuple[int, int]] = []
+    for pk, related_ids in related_ids_by_pk.items():
+        target_ids, current_ids = set(related_ids), set(current_ids_by_pk[pk])
+        if current_ids - target_ids:
+            removed.append((pk, sorted(current_ids - target_ids)))
+        added += [(pk, related_id) for related_id in sorted(target_ids - current_ids)]
+
+    if removed:
+        condition = Criterion.any(
+            [(backward_column == pk) & forward_column.isin(related_ids) for pk, related_ids in removed]
+        )
+        delete_query = db.query_class.from_(through_table).where(condition).delete()
+        await db.execute_query(*delete_query.get_parameterized_sql())
+
+    if added:
+        insert_query = db.query_class.into(through_table).columns(forward_column, backward_column)
+        for pk, related_id in added:
+            insert_query = insert_query.insert(related_id, pk)
+        await db.execute_query(*insert_query.get_parameterized_sql())
+
+    return sum(len(related_ids) for _, related_ids in removed), len(added)
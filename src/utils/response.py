@@ -0,0 +1,20 @@
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+
+
+def encode_json(content: Any) -> bytes:
+    """pydantic-core(Rust) 인코더로 직렬화한다 (date/datetime/Enum 지원)"""
+    return to_json(content)
+
+
+class FastJSONResponse(JSONResponse):
+    """dict/list 를 바로 인코딩하는 JSON 응답.
+
+    핸들러가 이 응답을 직접 반환하면 FastAPI 의 응답 모델 검증과 jsonable_encoder 를 거치지 않으므로,
+    ORM values() 로 만든 행을 한 번만 가공해서 내보낼 수 있다.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return encode_json(content)
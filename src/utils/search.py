@@ -0,0 +1,49 @@
+from typing import TYPE_CHECKING, Any
+
+from pypika.terms import Term
+from tortoise.contrib.mysql.indexes import FullTextIndex
+from tortoise.contrib.mysql.search import Mode, SearchCriterion
+from tortoise.expressions import Function
+
+if TYPE_CHECKING:
+    from tortoise import Model
+    from tortoise.backends.base.schema_generator import BaseSchemaGenerator
+
+
+class MySQLFullTextIndex(FullTextIndex):
+    """MySQL 에서만 만드는 FULLTEXT 인덱스. 다른 DB(벤치마크용 sqlite 등)의 generate_schemas 에서는 건너뛴다"""
+
+    def get_sql(self, schema_generator: "BaseSchemaGenerator", model: "type[Model]", safe: bool) -> str:
+        if schema_generator.DIALECT != "mysql":
+            return ""
+        return super().get_sql(schema_generator, model, safe)
+
+
+class FullTextMatch(Function):
+    """MATCH(field) AGAINST(keyword IN NATURAL LANGUAGE MODE) 로 계산한 관련도 (MySQL FULLTEXT 인덱스가 있는 컬럼에만 사용)
+
+    ngram 토큰 하나만 겹쳐도 0 보다 커지므로 정렬에만 쓰고, 검색 조건은 FullTextPhraseMatch 로 건다.
+    """
+
+    def __init__(self, field: str, keyword: str) -> None:
+        super().__init__(field, keyword)
+
+    def _get_function_field(self, field: Term | str, *default_values: Any) -> Any:
+        assert isinstance(field, Term)
+        return SearchCriterion(field, expr=default_values[0], mode=Mode.NATURAL_LANGUAGE_MODE)
+
+
+class FullTextPhraseMatch(Function):
+    """MATCH(field) AGAINST('"keyword"' IN BOOLEAN MODE). keyword 를 구(phrase)로 포함하는 행만 0 보다 크다
+
+    ngram 토큰이 keyword 와 같은 순서로 이어져야 하므로 title__icontains 와 같은 '포함' 검색이 된다.
+    단, 인덱스가 stopword 없이 만들어져 있어야 한다 (MYSQL_INIT_COMMAND 참고).
+    """
+
+    def __init__(self, field: str, keyword: str) -> None:
+        # BOOLEAN MODE 의 구 안에서는 큰따옴표를 이스케이프할 수 없다
+        super().__init__(field, '"' + keyword.replace('"', " ") + '"')
+
+    def _get_function_field(self, field: Term | str, *default_values: Any) -> Any:
+        assert isinstance(field, Term)
+        return SearchCriterion(field, expr=default_values[0], mode=Mode.BOOL_MODE)
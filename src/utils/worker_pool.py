@@ -0,0 +1,37 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, ParamSpec, TypeVar
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+
+class WorkerPoolSaturated(Exception):
+    def __init__(self, name: str, max_pending: int):
+        super().__init__(f"{name} worker pool is saturated. (max pending: {max_pending})")
+
+
+class BoundedWorkerPool:
+    """CPU 를 오래 쓰는 동기 함수를 이벤트 루프 밖에서 실행하는 스레드 풀.
+
+    실행 중이거나 대기 중인 작업이 max_pending 개에 도달하면 큐에 쌓지 않고 바로 WorkerPoolSaturated 를 발생시킨다.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_pending: int) -> None:
+        self.name = name
+        self.max_pending = max_pending
+        self.pending = 0
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+
+    async def run(self, func: Callable[P, R], *args: P.args, **kwargs: P.kwargs) -> R:
+        if self.pending >= self.max_pending:
+            raise WorkerPoolSaturated(self.name, self.max_pending)
+
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, lambda: func(*args, **kwargs))
+        finally:
+            self.pending -= 1
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
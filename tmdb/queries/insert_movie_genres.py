@@ -1,15 +1,36 @@
 from typing import Any
 
 from src.models.movies import Genre, Movie
+from src.services.movie_cache import invalidate_movie
+from src.services.movie_genre_index import movie_genre_index
+from src.services.movie_genres import sync_movie_genres
 
 
 async def insert_movie_genres(movie_list: list[dict[str, Any]]) -> None:
-    for movie_data in movie_list:
-        movie = await Movie.filter(external_id=movie_data["id"]).first()
-        if movie:
-            genres = await Genre.filter(external_id__in=movie_data["genre_ids"])
-            try:
-                await movie.genres.add(*genres)
-            except Exception as e:
-                print(f"영화의 장르 데이터 삽입중 에러 발생: {str(e)}")
+    # TMDB id(external_id) -> DB id
+    genre_ids = dict(await Genre.all().values_list("external_id", "id"))
+    movie_ids = dict(
+        await Movie.filter(external_id__in=[movie_data["id"] for movie_data in movie_list]).values_list(
+            "external_id", "id"
+        )
+    )
+
+    genre_ids_by_movie = {
+        movie_ids[movie_data["id"]]: [
+            genre_ids[genre_external_id]
+            for genre_external_id in movie_data["genre_ids"]
+            if genre_external_id in genre_ids
+        ]
+        for movie_data in movie_list
+        if movie_data["id"] in movie_ids
+    }
+    try:
+        await sync_movie_genres(genre_ids_by_movie)
+    except Exception as e:
+        print(f"영화의 장르 데이터 삽입중 에러 발생: {str(e)}")
+        return
+
+    for movie_id, movie_genre_ids in genre_ids_by_movie.items():
+        movie_genre_index.set_movie_genres(movie_id, movie_genre_ids)
+        invalidate_movie(movie_id)
     print("MovieGenre DB Insert Completed.")